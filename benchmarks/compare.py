@@ -0,0 +1,89 @@
+# /benchmarks/compare.py
+"""
+두 벤치마크 결과(JSON)를 비교합니다.
+
+사용법:
+    python -m benchmarks.compare <기준 결과.json> <새 결과.json> [--threshold 0.1]
+
+처리량이 threshold 비율 이상 줄거나, 단계별 시간/최대 RSS가 threshold 비율 이상 늘면 회귀로 보고
+종료 코드 1을 반환한다.
+"""
+import sys
+import json
+import argparse
+
+# (지표 경로, 높을수록 좋은지 여부)
+TOTAL_METRICS = [
+    ("docs_per_sec", True),
+    ("chunks_per_sec", True),
+    ("peak_rss_mb", False),
+    ("seconds", False),
+]
+
+
+def load_results(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare_metric(name, base, new, higher_is_better, threshold):
+    """지표 하나를 비교해서 (출력 줄, 회귀 여부)를 반환합니다."""
+    if not base:
+        return f"  {name:<28} {base:>12.3f} -> {new:>12.3f}", False
+
+    change = (new - base) / base
+    regressed = (-change if higher_is_better else change) > threshold
+    marker = "  REGRESSION" if regressed else ""
+    return f"  {name:<28} {base:>12.3f} -> {new:>12.3f} ({change:+.1%}){marker}", regressed
+
+
+def compare(base, new, threshold=0.1):
+    lines = [f"base: {base['meta']['commit']} ({base['meta']['timestamp']})",
+             f"new:  {new['meta']['commit']} ({new['meta']['timestamp']})"]
+    if base["meta"].get("args") != new["meta"].get("args"):
+        lines.append("WARNING: benchmark arguments differ, results may not be comparable.")
+
+    regressions = []
+
+    lines.append("totals")
+    for name, higher_is_better in TOTAL_METRICS:
+        line, regressed = compare_metric(name, base["totals"][name], new["totals"][name], higher_is_better, threshold)
+        lines.append(line)
+        if regressed:
+            regressions.append(name)
+
+    lines.append("stages (seconds)")
+    for stage in base["stages"]:
+        if stage not in new["stages"]:
+            continue
+        line, regressed = compare_metric(stage, base["stages"][stage], new["stages"][stage], False, threshold)
+        lines.append(line)
+        if regressed:
+            regressions.append(stage)
+
+    lines.append("spans (seconds)")
+    for stage, values in base.get("spans", {}).items():
+        if stage in new.get("spans", {}):
+            line, _ = compare_metric(stage, values["seconds"], new["spans"][stage]["seconds"], False, threshold)
+            lines.append(line)
+
+    return lines, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two ingest benchmark results.")
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=0.1, help="회귀로 판단할 변화 비율 (기본 10%%)")
+    args = parser.parse_args(argv)
+
+    lines, regressions = compare(load_results(args.base), load_results(args.new), args.threshold)
+    print("\n".join(lines))
+    if regressions:
+        print(f"\nRegressions: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
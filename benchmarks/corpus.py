@@ -0,0 +1,161 @@
+# /benchmarks/corpus.py
+"""
+벤치마크용 합성 코퍼스 생성기.
+
+같은 seed로 실행하면 항상 같은 파일이 만들어지므로, 커밋 간 결과를 비교할 수 있다.
+생성하는 형식:
+    - text_pdf: 텍스트 레이어가 있는 PDF (한글/영문 혼합)
+    - scanned_pdf: 페이지를 이미지로 렌더링해서 만든 PDF (OCR 경로)
+    - csv: 표 데이터
+    - docx: 단락으로 구성된 Word 문서
+"""
+import os
+import csv
+import random
+import zipfile
+from xml.sax.saxutils import escape
+
+CORPUS_KINDS = ("text_pdf", "scanned_pdf", "csv", "docx")
+
+KOREAN_SENTENCES = [
+    "본 계약은 갑과 을 사이의 업무 위탁에 관한 사항을 정한다.",
+    "을은 계약 기간 동안 성실하게 업무를 수행하여야 한다.",
+    "계약 금액은 부가가치세를 포함하여 월 단위로 지급한다.",
+    "개인정보는 관련 법령에 따라 안전하게 관리되어야 한다.",
+    "분쟁이 발생한 경우 당사자는 상호 협의하여 해결한다.",
+    "보고서는 매월 말일까지 담당 부서에 제출하여야 한다.",
+    "시스템 장애 발생 시 즉시 관리자에게 통보하여야 한다.",
+    "본 문서의 내용은 사전 동의 없이 외부에 공개할 수 없다.",
+]
+
+ENGLISH_SENTENCES = [
+    "The service level agreement defines response times for incidents.",
+    "All invoices must be approved by the finance department.",
+    "Quarterly revenue increased compared to the previous period.",
+    "Access to production systems requires multi-factor authentication.",
+    "The vendor shall provide maintenance updates at no extra cost.",
+    "Data retention follows the policy approved by the board.",
+]
+
+CSV_COLUMNS = ["id", "date", "department", "item", "amount", "memo"]
+DEPARTMENTS = ["영업팀", "개발팀", "재무팀", "인사팀", "Marketing", "Support"]
+
+
+def make_paragraph(rng, sentences=6):
+    """한글/영문 문장을 섞어서 하나의 단락을 만듭니다."""
+    pool = KOREAN_SENTENCES * 2 + ENGLISH_SENTENCES
+    return " ".join(rng.choice(pool) for _ in range(sentences))
+
+
+def make_page_text(rng, doc_no, page_no, paragraphs=4):
+    lines = [f"제{page_no}장 문서 {doc_no} / Section {page_no}"]
+    lines += [make_paragraph(rng) for _ in range(paragraphs)]
+    return "\n\n".join(lines)
+
+
+def _text_pdf(pages_text):
+    import fitz
+    doc = fitz.open()
+    for text in pages_text:
+        page = doc.new_page()
+        page.insert_textbox(page.rect + (50, 50, -50, -50), text, fontname="korea", fontsize=10)
+    return doc
+
+
+def write_text_pdf(path, rng, doc_no, pages):
+    doc = _text_pdf([make_page_text(rng, doc_no, p + 1) for p in range(pages)])
+    doc.save(path)
+    doc.close()
+
+
+def write_scanned_pdf(path, rng, doc_no, pages, dpi=100):
+    """텍스트 PDF를 이미지로 렌더링한 뒤 이미지만 있는 PDF로 다시 저장합니다."""
+    import fitz
+    source = _text_pdf([make_page_text(rng, doc_no, p + 1, paragraphs=2) for p in range(pages)])
+    scanned = fitz.open()
+    for source_page in source:
+        pixmap = source_page.get_pixmap(dpi=dpi)
+        page = scanned.new_page(width=source_page.rect.width, height=source_page.rect.height)
+        page.insert_image(page.rect, pixmap=pixmap)
+    scanned.save(path)
+    scanned.close()
+    source.close()
+
+
+def write_csv(path, rng, doc_no, rows):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_COLUMNS)
+        for i in range(rows):
+            writer.writerow([
+                i + 1,
+                f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                rng.choice(DEPARTMENTS),
+                f"item-{doc_no}-{rng.randint(1, 500)}",
+                f"{rng.randint(1000, 5000000):,}",
+                rng.choice(KOREAN_SENTENCES + ENGLISH_SENTENCES)[:30],
+            ])
+
+
+DOCX_CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>
+</Types>"""
+
+DOCX_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>
+</Relationships>"""
+
+
+def write_docx(path, rng, doc_no, pages):
+    """python-docx 없이 최소한의 OOXML 구조로 docx를 만듭니다."""
+    paragraphs = []
+    for p in range(pages):
+        paragraphs += make_page_text(rng, doc_no, p + 1).split("\n\n")
+    body = "".join(f"<w:p><w:r><w:t>{escape(text)}</w:t></w:r></w:p>" for text in paragraphs)
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f"<w:body>{body}</w:body></w:document>"
+    )
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as docx:
+        docx.writestr("[Content_Types].xml", DOCX_CONTENT_TYPES)
+        docx.writestr("_rels/.rels", DOCX_RELS)
+        docx.writestr("word/document.xml", document)
+
+
+def generate_corpus(out_dir, docs_per_kind=3, pages=5, csv_rows=300, kinds=CORPUS_KINDS, seed=42):
+    """
+    합성 코퍼스를 생성합니다.
+
+    Args:
+        out_dir (str): 파일을 저장할 디렉토리.
+        docs_per_kind (int): 형식별 문서 수.
+        pages (int): PDF/docx 문서의 페이지 수.
+        csv_rows (int): CSV 파일의 행 수.
+        kinds (tuple[str]): 생성할 형식 (CORPUS_KINDS 중).
+        seed (int): 난수 시드.
+
+    Returns:
+        list[tuple[str, str]]: (형식, 파일 경로) 리스트.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    rng = random.Random(seed)
+    writers = {
+        "text_pdf": (".pdf", lambda path, n: write_text_pdf(path, rng, n, pages)),
+        "scanned_pdf": (".pdf", lambda path, n: write_scanned_pdf(path, rng, n, pages)),
+        "csv": (".csv", lambda path, n: write_csv(path, rng, n, csv_rows)),
+        "docx": (".docx", lambda path, n: write_docx(path, rng, n, pages)),
+    }
+
+    files = []
+    for kind in kinds:
+        ext, writer = writers[kind]
+        for n in range(docs_per_kind):
+            path = os.path.join(out_dir, f"{kind}_{n + 1:03d}{ext}")
+            writer(path, n + 1)
+            files.append((kind, path))
+    return files
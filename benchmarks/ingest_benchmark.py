@@ -0,0 +1,218 @@
+# /benchmarks/ingest_benchmark.py
+"""
+문서 적재(load_documents -> preprocess_documents -> save_to_vectorstore) 벤치마크.
+
+외부 API 대신 결정적인 대체 구현(FakeChatLLM, FakeEmbeddings)을 사용하므로 키 없이 반복 실행할 수 있고,
+지연 시간은 --llm-latency, --embedding-latency로 조절한다.
+결과는 JSON으로 저장되며 benchmarks/compare.py로 커밋 간 비교할 수 있다.
+
+사용법:
+    python -m benchmarks.ingest_benchmark --docs 3 --pages 5 --kinds text_pdf csv
+    python -m benchmarks.compare benchmarks/results/base.json benchmarks/results/new.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import resource
+import subprocess
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(BASE_DIR, "benchmarks", "results")
+PIPELINE_STAGES = ("load_documents", "preprocess_documents", "save_to_vectorstore")
+
+
+def parse_args(argv=None):
+    from benchmarks.corpus import CORPUS_KINDS
+
+    parser = argparse.ArgumentParser(description="Ingest pipeline benchmark with local LLM/embedding stand-ins.")
+    parser.add_argument("--docs", type=int, default=3, help="형식별 문서 수")
+    parser.add_argument("--pages", type=int, default=5, help="PDF/docx 문서의 페이지 수")
+    parser.add_argument("--csv-rows", type=int, default=300, help="CSV 파일의 행 수")
+    parser.add_argument("--kinds", nargs="+", default=list(CORPUS_KINDS), choices=CORPUS_KINDS)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="LLM 호출당 지연(초)")
+    parser.add_argument("--embedding-latency", type=float, default=0.0, help="임베딩 호출당 지연(초)")
+    parser.add_argument("--corpus-dir", default=None, help="코퍼스 디렉토리 (없으면 임시 디렉토리에 생성)")
+    parser.add_argument("--output", default=None, help="결과 JSON 경로 (기본: benchmarks/results/<시각>-<커밋>.json)")
+    parser.add_argument("--keep", action="store_true", help="임시 코퍼스/벡터스토어를 삭제하지 않음")
+    return parser.parse_args(argv)
+
+
+def configure_environment(args):
+    """src.config를 import하기 전에 대체 구현과 지연 시간을 환경 변수로 설정합니다."""
+    os.environ["LLM_PROVIDER"] = "fake"
+    os.environ["EMBEDDING_PROVIDER"] = "fake"
+    os.environ["FAKE_LLM_LATENCY"] = str(args.llm_latency)
+    os.environ["FAKE_EMBEDDING_LATENCY"] = str(args.embedding_latency)
+    # 벤치마크 중에는 메트릭 서버를 띄우지 않는다. (span 집계는 그대로 동작)
+    os.environ["METRICS_ENABLED"] = "false"
+    # 이전 실행의 청킹 결과를 재사용하지 않도록 청킹 캐시를 끈다.
+    os.environ["CHUNK_CACHE_ENABLED"] = "false"
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def peak_rss_mb():
+    """프로세스의 최대 RSS(MB). Linux는 KB, macOS는 byte 단위로 반환된다."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def ingest_file(path):
+    """파일 하나를 적재하고 단계별 소요 시간과 청크 수를 반환합니다."""
+    from src.loader.loader import load_documents
+    from src.preprocessing.preprocessor_v1 import preprocess_documents
+    from src.embedding.vectorstore_handler import save_to_vectorstore
+
+    timings = {}
+
+    start = time.perf_counter()
+    documents = load_documents([path])
+    timings["load_documents"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    processed = preprocess_documents(documents)
+    timings["preprocess_documents"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    save_to_vectorstore([d.page_content for d in processed], [d.metadata for d in processed])
+    timings["save_to_vectorstore"] = time.perf_counter() - start
+
+    return timings, len(documents), len(processed)
+
+
+def merge_span_summary(totals, rows):
+    for row in rows:
+        total = totals.setdefault(row["stage"], {"count": 0, "seconds": 0.0})
+        total["count"] += row["count"]
+        total["seconds"] += row["duration"]
+        for key, value in row.items():
+            if key not in ("stage", "count", "duration"):
+                total[key] = total.get(key, 0) + value
+
+
+def run(args):
+    from benchmarks.corpus import generate_corpus
+    from src.metrics import ingest_report, summarize_report
+    from src.embedding.vectorstore_handler import VectorStoreManager
+
+    work_dir = tempfile.mkdtemp(prefix="rag_bench_")
+    corpus_dir = args.corpus_dir or os.path.join(work_dir, "corpus")
+
+    # 실제 벡터스토어를 건드리지 않도록 임시 디렉토리를 먼저 지정한다.
+    VectorStoreManager.get_instance(directory=os.path.join(work_dir, "vectorstore"))
+
+    start = time.perf_counter()
+    files = generate_corpus(
+        corpus_dir, docs_per_kind=args.docs, pages=args.pages,
+        csv_rows=args.csv_rows, kinds=tuple(args.kinds), seed=args.seed,
+    )
+    corpus_seconds = time.perf_counter() - start
+    print(f"Generated {len(files)} files in {corpus_seconds:.2f}s at {corpus_dir}")
+
+    stages = {stage: 0.0 for stage in PIPELINE_STAGES}
+    spans = {}
+    by_kind = {}
+    file_results = []
+    total_pages = total_chunks = failed = 0
+
+    run_start = time.perf_counter()
+    try:
+        for kind, path in files:
+            kind_total = by_kind.setdefault(kind, {"docs": 0, "chunks": 0, "seconds": 0.0, "failed": 0})
+            file_start = time.perf_counter()
+            try:
+                with ingest_report(os.path.basename(path)) as report:
+                    timings, pages, chunks = ingest_file(path)
+            except Exception as e:
+                failed += 1
+                kind_total["failed"] += 1
+                file_results.append({"file": os.path.basename(path), "kind": kind, "error": str(e)})
+                print(f"[FAIL] {os.path.basename(path)}: {e}")
+                continue
+
+            seconds = time.perf_counter() - file_start
+            for stage, value in timings.items():
+                stages[stage] += value
+            merge_span_summary(spans, summarize_report(report))
+
+            total_pages += pages
+            total_chunks += chunks
+            kind_total["docs"] += 1
+            kind_total["chunks"] += chunks
+            kind_total["seconds"] += seconds
+            file_results.append({
+                "file": os.path.basename(path), "kind": kind, "pages": pages,
+                "chunks": chunks, "seconds": seconds, "stages": timings,
+            })
+            print(f"[OK] {os.path.basename(path)}: {pages} pages, {chunks} chunks, {seconds:.2f}s")
+    finally:
+        if not args.keep:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    elapsed = time.perf_counter() - run_start
+    docs = len(files) - failed
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": vars(args),
+        },
+        "totals": {
+            "docs": docs,
+            "failed": failed,
+            "pages": total_pages,
+            "chunks": total_chunks,
+            "seconds": elapsed,
+            "docs_per_sec": docs / elapsed if elapsed else 0.0,
+            "chunks_per_sec": total_chunks / elapsed if elapsed else 0.0,
+            "peak_rss_mb": peak_rss_mb(),
+            "corpus_seconds": corpus_seconds,
+        },
+        "stages": stages,
+        "spans": spans,
+        "by_kind": by_kind,
+        "files": file_results,
+    }
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    configure_environment(args)
+    results = run(args)
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{results['meta']['commit']}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+
+    totals = results["totals"]
+    print(
+        f"\n{totals['docs']} docs ({totals['failed']} failed), {totals['chunks']} chunks in {totals['seconds']:.2f}s "
+        f"-> {totals['docs_per_sec']:.2f} docs/s, {totals['chunks_per_sec']:.2f} chunks/s, "
+        f"peak RSS {totals['peak_rss_mb']:.1f} MB"
+    )
+    for stage, seconds in results["stages"].items():
+        print(f"  {stage:<22} {seconds:8.3f}s")
+    print(f"Results written to {output}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
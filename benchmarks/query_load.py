@@ -0,0 +1,110 @@
+# /benchmarks/query_load.py
+"""
+질의 API(src.api.server) 부하 테스트.
+
+서버를 대체 구현으로 띄운 뒤 실행한다:
+    LLM_PROVIDER=fake EMBEDDING_PROVIDER=fake FAKE_LLM_LATENCY=0.5 python -m src.api.server
+    python -m benchmarks.query_load --url http://localhost:8000 --clients 32 --requests 500 --endpoint answer
+
+처리량, 지연 시간 분위수(p50/p95/p99), 429 비율을 출력하고 --output이 주어지면 JSON으로 저장한다.
+"""
+import json
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+SAMPLE_QUERIES = [
+    "계약 금액은 어떻게 지급되나요?",
+    "개인정보 관리 규정을 알려주세요.",
+    "What is the service level agreement for incidents?",
+    "보고서 제출 기한은 언제인가요?",
+    "분쟁이 발생하면 어떻게 해결하나요?",
+]
+
+
+def percentile(values, ratio):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(len(values) * ratio), len(values) - 1)]
+
+
+def run(url, endpoint, clients, total_requests, top_k):
+    import requests
+
+    path = {"retrieve": "/retrieve", "answer": "/answer", "stream": "/answer/stream"}[endpoint]
+    latencies = []
+    status_counts = {}
+    lock = threading.Lock()
+    local = threading.local()
+
+    def send(i):
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        payload = {"query": SAMPLE_QUERIES[i % len(SAMPLE_QUERIES)], "top_k": top_k}
+        start = time.perf_counter()
+        try:
+            response = local.session.post(url.rstrip("/") + path, json=payload, timeout=300, stream=endpoint == "stream")
+            # 스트리밍은 마지막 조각까지 받은 시점을 기준으로 측정한다.
+            for _ in response.iter_content(chunk_size=None):
+                pass
+            status = response.status_code
+        except requests.RequestException:
+            status = "error"
+        elapsed = time.perf_counter() - start
+
+        with lock:
+            status_counts[status] = status_counts.get(status, 0) + 1
+            if status == 200:
+                latencies.append(elapsed)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        list(executor.map(send, range(total_requests)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "endpoint": endpoint,
+        "clients": clients,
+        "requests": total_requests,
+        "seconds": elapsed,
+        "requests_per_sec": total_requests / elapsed if elapsed else 0.0,
+        "ok_per_sec": len(latencies) / elapsed if elapsed else 0.0,
+        "status_counts": {str(status): count for status, count in status_counts.items()},
+        "rejected_ratio": status_counts.get(429, 0) / total_requests if total_requests else 0.0,
+        "latency": {
+            "p50": percentile(latencies, 0.50),
+            "p95": percentile(latencies, 0.95),
+            "p99": percentile(latencies, 0.99),
+            "max": max(latencies) if latencies else 0.0,
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the RAG query API.")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--endpoint", choices=("retrieve", "answer", "stream"), default="answer")
+    parser.add_argument("--clients", type=int, default=16, help="동시 클라이언트 수")
+    parser.add_argument("--requests", type=int, default=200, help="전체 요청 수")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--output", default=None, help="결과 JSON 경로")
+    args = parser.parse_args(argv)
+
+    results = run(args.url, args.endpoint, args.clients, args.requests, args.top_k)
+    latency = results["latency"]
+    print(
+        f"{results['requests']} requests with {results['clients']} clients in {results['seconds']:.2f}s "
+        f"-> {results['requests_per_sec']:.1f} req/s ({results['ok_per_sec']:.1f} ok/s), "
+        f"p50 {latency['p50'] * 1000:.0f}ms, p95 {latency['p95'] * 1000:.0f}ms, p99 {latency['p99'] * 1000:.0f}ms, "
+        f"status {results['status_counts']}"
+    )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# bulk_ingest.py
+"""
+디렉토리 트리를 대량으로 적재하는 명령줄 도구.
+
+파일별 상태를 체크포인트(SQLite)에 기록하므로, 중간에 종료되어도 같은 명령을 다시 실행하면 이어서 처리한다.
+
+사용법:
+    python bulk_ingest.py /path/to/archive --workers 8
+    python bulk_ingest.py /path/to/archive --status
+"""
+import sys
+import argparse
+from src.config import BULK_INGEST_WORKERS, BULK_INGEST_CHECKPOINT_PATH, BULK_INGEST_MAX_ATTEMPTS
+from src.ingest.checkpoint import IngestCheckpoint
+from src.ingest.pipeline import BulkIngester, discover_files
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk ingest a directory tree into the vectorstore.")
+    parser.add_argument("root", help="적재할 디렉토리 또는 파일")
+    parser.add_argument("--workers", type=int, default=BULK_INGEST_WORKERS, help="병렬 작업자 수")
+    parser.add_argument("--checkpoint", default=BULK_INGEST_CHECKPOINT_PATH, help="체크포인트 DB 경로")
+    parser.add_argument("--extensions", nargs="+", default=None, help="대상 확장자 (예: .pdf .docx)")
+    parser.add_argument("--limit", type=int, default=None, help="이번 실행에서 처리할 최대 파일 수")
+    parser.add_argument("--max-attempts", type=int, default=BULK_INGEST_MAX_ATTEMPTS, help="파일별 최대 시도 횟수")
+    parser.add_argument("--no-retry", action="store_true", help="이전에 실패한 파일을 다시 시도하지 않음")
+    parser.add_argument("--reingest", action="store_true", help="이미 벡터스토어에 있는 문서도 다시 적재")
+    parser.add_argument("--status", action="store_true", help="체크포인트 상태만 출력")
+    return parser.parse_args(argv)
+
+
+def print_status(checkpoint):
+    counts = checkpoint.counts()
+    print("Checkpoint status: " + ", ".join(f"{status}={count}" for status, count in sorted(counts.items())))
+    for path, attempts, error in checkpoint.failures():
+        print(f"  [failed x{attempts}] {path}: {error}")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    checkpoint = IngestCheckpoint(args.checkpoint)
+
+    try:
+        if args.status:
+            print_status(checkpoint)
+            return 0
+
+        paths = discover_files(args.root, args.extensions)
+        print(f"Found {len(paths)} files under {args.root}")
+
+        ingester = BulkIngester(checkpoint, workers=args.workers, skip_existing=not args.reingest)
+        try:
+            progress = ingester.run(
+                paths, retry_failed=not args.no_retry, max_attempts=args.max_attempts, limit=args.limit
+            )
+        except KeyboardInterrupt:
+            print("Interrupted. Run the same command again to resume.")
+            print_status(checkpoint)
+            return 130
+
+        print(
+            f"Finished {progress.completed} files: {progress.chunks} chunks, "
+            f"{progress.skipped} skipped, {progress.failed} failed"
+        )
+        print_status(checkpoint)
+        return 1 if progress.failed else 0
+    finally:
+        checkpoint.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+# compact_vectorstore.py
+"""
+벡터스토어 정리(compaction) 명령줄 도구.
+
+이전 버전 청크, 원본 파일이 사라진 문서, 카탈로그에 없는 청크를 삭제하고 SQLite 파일을 VACUUM한다.
+서비스가 실행 중이면 --enqueue로 적재 워커에 작업을 등록한다. (적재와 동시에 실행되지 않도록)
+
+사용법:
+    python compact_vectorstore.py --dry-run
+    python compact_vectorstore.py --keep-versions 2 --orphan-root ./data --orphan-root /mnt/archive
+    python compact_vectorstore.py --enqueue
+"""
+import sys
+import json
+import argparse
+from src.config import COMPACTION_KEEP_VERSIONS, COMPACTION_ORPHAN_ROOTS, COMPACTION_BATCH_SIZE
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Remove stale versions and orphans from the vectorstore.")
+    parser.add_argument("--keep-versions", type=int, default=COMPACTION_KEEP_VERSIONS, help="문서별로 남길 최신 버전 수")
+    parser.add_argument("--orphan-root", action="append", default=None, help="원본이 사라졌는지 확인할 디렉토리 (여러번 지정 가능)")
+    parser.add_argument("--batch-size", type=int, default=COMPACTION_BATCH_SIZE, help="한번에 삭제할 청크 수")
+    parser.add_argument("--dry-run", action="store_true", help="삭제하지 않고 대상 수만 출력")
+    parser.add_argument("--no-vacuum", action="store_true", help="SQLite VACUUM 생략")
+    parser.add_argument("--enqueue", action="store_true", help="실행 중인 적재 워커에 정리 작업으로 등록")
+    parser.add_argument("--output", default=None, help="리포트 JSON 경로")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.enqueue:
+        from src.ingest.job_queue import JobQueue, COMPACT_JOB, COMPACT_DOC_ID
+        job_id, created = JobQueue().enqueue(COMPACT_JOB, COMPACT_DOC_ID)
+        print(f"Compaction job {job_id} {'queued' if created else 'is already queued'}.")
+        return 0
+
+    from src.embedding.compaction import compact_vectorstore
+    try:
+        report = compact_vectorstore(
+            keep_versions=args.keep_versions,
+            orphan_roots=args.orphan_root or COMPACTION_ORPHAN_ROOTS,
+            batch_size=args.batch_size,
+            dry_run=args.dry_run,
+            vacuum=not args.no_vacuum,
+        )
+    except RuntimeError as e:
+        print(f"Compaction skipped: {e}", file=sys.stderr)
+        return 1
+
+    print(
+        f"{'[dry-run] ' if report['dry_run'] else ''}"
+        f"superseded {report['superseded_chunks']} chunks, orphaned {report['orphaned_documents']} documents, "
+        f"uncatalogued {report['uncatalogued_chunks']} chunks, dangling {report['dangling_catalog_entries']} catalog entries"
+    )
+    print(f"Reclaimed {report['reclaimed_bytes'] / 1024 / 1024:.1f} MB ({report['bytes_before']} -> {report['bytes_after']} bytes)")
+    if report["search_latency_before_ms"] is not None:
+        print(
+            f"Search latency (median): {report['search_latency_before_ms']:.2f}ms -> "
+            f"{report['search_latency_after_ms']:.2f}ms"
+        )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,35 @@
+# ingest_worker.py
+"""
+업로드 작업 큐를 처리하는 워커 프로세스. Streamlit(main_v1.py)과 별도로 실행합니다.
+
+사용법:
+    python ingest_worker.py --concurrency 4
+"""
+import sys
+import signal
+import argparse
+from src.config import INGEST_WORKER_CONCURRENCY, INGEST_WORKER_POLL_INTERVAL
+from src.ingest.worker import IngestWorker
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Process queued ingest/delete jobs.")
+    parser.add_argument("--concurrency", type=int, default=INGEST_WORKER_CONCURRENCY, help="동시에 처리할 파일 수")
+    parser.add_argument("--poll-interval", type=float, default=INGEST_WORKER_POLL_INTERVAL, help="대기 작업 확인 주기(초)")
+    args = parser.parse_args(argv)
+
+    worker = IngestWorker(concurrency=args.concurrency, poll_interval=args.poll_interval)
+
+    # 종료 신호를 받으면 처리 중인 작업을 마친 뒤 종료한다.
+    def handle_signal(signum, frame):
+        worker.stop()
+
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
+
+    worker.run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,55 +1,117 @@
 import json
 import os
 import streamlit as st
-import re
 import unicodedata
-import tempfile
-from src.config import DATA_DIR, VECTORSTORE_VERSION
+from src.config import (
+    DATA_DIR,
+    VECTORSTORE_VERSION,
+    METRICS_ENABLED,
+    RAG_API_URL,
+    INGEST_QUEUE_ENABLED,
+    FILE_LIST_CACHE_TTL,
+    CHAT_HISTORY_RENDER_LIMIT,
+)
+from src.metrics import summarize_report, start_metrics_server
 from src.query.llm_intergration import generate_response
-from src.loader.loader import load_documents
+from src.api.client import RagApiClient, RagApiError
+from src.loader.upload_spooler import UploadSpooler
+from src.ingest.job_queue import JobQueue, INGEST_JOB, DELETE_JOB, ACTIVE_STATUSES, FAILED
+from src.ingest.pipeline import ingest_file
 from src.embedding.vectorstore_handler import (
-    save_to_vectorstore,
     remove_from_vectorstore, 
+    recover_from_journal,
     VectorStoreManager,
 )
-from src.preprocessing import (
-    generate_doc_id,
-    preprocess_documents,
-)
+from src.preprocessing import generate_doc_id
 
 from utils.file_manager import FileManager
+from utils.search_index import FileSearchIndex
 
 # file_list.json 경로
 FILE_LIST_PATH = os.path.join(DATA_DIR, "file_list.json")
 
-file_manager = FileManager(FILE_LIST_PATH)
+# 스크립트는 상호작용마다 다시 실행되므로, 저장소/클라이언트는 st.cache_resource로 프로세스당 한번만 만든다.
+@st.cache_resource
+def get_file_manager():
+    return FileManager(FILE_LIST_PATH)
+
+@st.cache_resource
+def get_vectorstore():
+    vectorstore = VectorStoreManager.get_instance()
+    if not INGEST_QUEUE_ENABLED:
+        # 작업 큐 없이 이 프로세스가 직접 적재/삭제하는 경우에만 중단된 작업을 복구한다. (큐를 쓰면 워커가 복구)
+        recover_from_journal(VECTORSTORE_VERSION)
+    return vectorstore
+
+@st.cache_resource
+def get_job_queue():
+    # 업로드/삭제는 작업 큐에 등록하고 ingest_worker.py가 처리한다. (비활성화하면 이 프로세스에서 바로 처리)
+    return JobQueue() if INGEST_QUEUE_ENABLED else None
+
+@st.cache_resource
+def get_api_client():
+    return RagApiClient(RAG_API_URL)
+
+@st.cache_resource
+def get_file_search_index():
+    # 파일 목록 검색 색인. 목록이 바뀌면 sync()로 바뀐 문서만 반영한다.
+    return FileSearchIndex()
+
+@st.cache_data(ttl=FILE_LIST_CACHE_TTL, show_spinner=False)
+def load_file_list():
+    """
+    파일 목록 (벡터스토어 전체 메타데이터를 조회하므로 캐시한다).
+    업로드/삭제가 끝나면 invalidate_file_list()로 바로 갱신하고, 다른 경로(대량 적재 등)의 변경은 TTL이 지나면 반영된다.
+    """
+    return get_file_manager().load_file_list()
+
+def invalidate_file_list():
+    load_file_list.clear()
+
+file_manager = get_file_manager()
+vectorstore = get_vectorstore()
+job_queue = get_job_queue()
 
-vectorstore = VectorStoreManager.get_instance()
+# /metrics, /metrics.json 노출 (프로세스당 한번만 실행됨)
+if METRICS_ENABLED:
+    start_metrics_server()
 
 
 # 업로드된 파일을 목록에 추가
 def add_uploaded_file_to_list(file):
+    if job_queue is not None:
+        enqueue_uploaded_file(file)
+        return
+
     if not st.session_state.file_uploaded:
-        file_list = file_manager.load_file_list()
-        file_name = file.name
-        
-        file_path = os.path.join(DATA_DIR, file_name)
+        # 업로더에 남아있는 파일은 rerun마다 다시 전달되므로, 이 세션에서 이미 적재한 파일은 건너뛴다.
+        ingested_uploads = st.session_state.setdefault("ingested_uploads", set())
+        upload_key = get_upload_key(file)
+        if upload_key in ingested_uploads:
+            return []
         
-        safe_filename = file_name.replace(' ', '_')
-        temp_dir = tempfile.gettempdir()
-        temp_file_path = os.path.join(temp_dir, safe_filename)
+        file_list = load_file_list()
         
-        # 벡터스토어에서 중복 체크
-        doc_id = generate_doc_id(temp_file_path)
-        existing_docs = vectorstore._collection.get(
-            where={"doc_id": doc_id}
-        )
+        # 업로드 파일을 블록 단위로 스풀링한다. (같은 내용의 파일은 같은 경로로 저장된다)
+        spooler = UploadSpooler.get_instance()
+        spooled = spooler.spool(file)
         
-        if existing_docs and existing_docs.get('documents'):
-            # st.warning(f"파일 {file.name}은 이미 업로드되었습니다.")
+        try:
+            # doc_id와 path는 업로드한 파일명 기준이고 스풀 파일은 읽기에만 사용한다.
+            # 같은 이름의 파일을 다시 올리면 기존 문서를 교체한다.
+            result = ingest_file(
+                spooled.path, VECTORSTORE_VERSION, skip_existing=False, file_name=file.name, source_path=file.name
+            )
+            if result["report"]:
+                st.session_state.ingest_reports = [result["report"]] + st.session_state.get("ingest_reports", [])[:9]
+        except Exception as e:
+            # 저장에 실패하면 기존 문서는 그대로 남는다. 다음에 다시 올리면 다시 시도한다.
+            st.error(f"{file.name} 처리 실패: {e}")
             return []
-        
-        metadatas = save_data(file)
+        finally:
+            spooler.release(spooled.path)
+        ingested_uploads.add(upload_key)
+            
         new_file_list = []
         
         unique_metadatas, _ = file_manager._get_unique_metadatas()
@@ -62,6 +124,7 @@ def add_uploaded_file_to_list(file):
         if new_file_list:
             file_list.extend(new_file_list)
             file_manager.save_file_list(file_list)
+            invalidate_file_list()
             st.success(f"파일 {file.name} 이(가) 업로드되고 목록에 추가되었습니다.")
             st.rerun()
         
@@ -69,35 +132,83 @@ def add_uploaded_file_to_list(file):
     else:
         st.session_state.file_uploaded = False
 
-def normalize_string(s):
-    return unicodedata.normalize('NFC', s)
+def get_upload_key(file):
+    """업로드 한번을 구분하는 키. 같은 파일을 다시 올리면 file_id가 바뀐다."""
+    return getattr(file, "file_id", None) or f"{file.name}:{file.size}"
 
-def save_data(file):
-    # path_list = [file_path]
-    file_list = [file]
+def enqueue_uploaded_file(file):
+    """
+    업로드 파일을 스풀하고 적재 작업으로 등록합니다. 파일 목록은 작업이 끝나면 갱신됩니다.
+    doc_id는 업로드한 파일명 기준이므로, 같은 이름의 파일을 다시 올리면 워커가 기존 문서를 교체합니다.
+    """
+    ingest_jobs = st.session_state.setdefault("ingest_jobs", {})
     
-    # 파일 형식의 문서를 로드하는 함수
-    documents = load_documents(file_list)
+    # 업로더에 남아있는 파일은 rerun마다 다시 전달되므로, 이 세션에서 이미 등록한 파일은 건너뛴다.
+    upload_key = get_upload_key(file)
+    if upload_key in ingest_jobs:
+        return
+    
+    spooler = UploadSpooler.get_instance()
+    spooled = spooler.spool(file)
+    doc_id = generate_doc_id(file.name)
+    
+    # 스풀 파일은 워커가 처리한 뒤 삭제한다.
+    job_id, _ = job_queue.enqueue(INGEST_JOB, doc_id, file_path=spooled.path, file_name=file.name)
+    spooler.detach(spooled.path)
+    ingest_jobs[upload_key] = job_id
 
-    # 문서를 전처리
-    processed = preprocess_documents(documents)  
+def normalize_string(s):
+    return unicodedata.normalize('NFC', s)
 
-    contents = [d.page_content for d in processed]
-    metadatas = [d.metadata for d in processed]
+def display_ingest_reports():
+    """최근 업로드된 문서의 단계별 처리 시간/건수를 표시합니다."""
+    reports = st.session_state.get("ingest_reports", [])
+    if not reports:
+        return
+    
+    with st.expander("**Ingest Report 📊**", expanded=False):
+        for report in reports:
+            st.markdown(f"**{report['file_name']}** - {report['duration']:.2f}s")
+            st.dataframe(summarize_report(report), use_container_width=True, hide_index=True)
 
-    # 전처리된 문서를 벡터화
-    save_to_vectorstore(contents, metadatas, vectorstore_version=VECTORSTORE_VERSION)
+@st.fragment(run_every=2)
+def display_ingest_jobs():
+    """이 세션에서 등록한 적재/삭제 작업의 진행 상황을 표시합니다. 작업이 끝나면 화면 전체를 한번 갱신합니다."""
+    job_ids = [job_id for job_id in st.session_state.get("ingest_jobs", {}).values() if job_id]
+    job_ids += list(st.session_state.get("delete_jobs", {}).values())
+    if not job_ids:
+        return
     
-    # 벡터스토어에서 데이터를 확인
-    all_metadatas = vectorstore.get()['metadatas']
-    # print(all_metadatas)
+    jobs = job_queue.get_jobs(job_ids)
+    if any(job["status"] in ACTIVE_STATUSES for job in jobs) and not job_queue.has_live_worker():
+        st.warning("적재 워커가 실행 중이 아닙니다. `python ingest_worker.py`를 실행해주세요.")
     
-    return metadatas
-
-def normalize_string(text):
-    return re.sub(r'[^a-zA-Z0-9가-힣]', '', text)
+    finished_jobs = st.session_state.setdefault("finished_jobs", set())
+    refresh = False
+    for job in jobs:
+        label = job["file_name"] or job["doc_id"]
+        if job["status"] in ACTIVE_STATUSES:
+            st.progress(job["progress"], text=f"{label} - {job['stage'] or job['status']}")
+            continue
+        
+        if job["job_id"] not in finished_jobs:
+            finished_jobs.add(job["job_id"])
+            refresh = True
+            if job["report"]:
+                st.session_state.ingest_reports = [json.loads(job["report"])] + st.session_state.get("ingest_reports", [])[:9]
+        
+        if job["status"] == FAILED:
+            st.error(f"{label} 처리 실패: {job['error']}")
+        elif job["kind"] == INGEST_JOB:
+            st.caption(f"{label} - {job['status']} ({job['chunks']} chunks)")
+    
+    if refresh:
+        invalidate_file_list()
+        st.rerun()
 
+@st.fragment
 def display_file_list():
+    """저장된 문서 목록. fragment이므로 검색어 입력/삭제 확인 시에는 이 영역만 다시 실행된다."""
     # Expander 상태 초기화
     if "expander_open" not in st.session_state:
         st.session_state["expander_open"] = False
@@ -107,8 +218,10 @@ def display_file_list():
         if expander:  # expander가 클릭되었을 때만 상태 변경
             st.session_state["expander_open"] = not st.session_state["expander_open"]
             
-        # 파일 리스트
-        file_list = file_manager.load_file_list()
+        # 파일 리스트 (삭제 작업이 등록된 파일은 제외)
+        file_list = load_file_list()
+        delete_jobs = st.session_state.get("delete_jobs", {})
+        file_list = [f for f in file_list if f.get("doc_id") not in delete_jobs]
         # 검색창 영역
         search_col1, search_col2 = st.columns([3, 3])
         with search_col1:
@@ -118,13 +231,12 @@ def display_file_list():
                 placeholder="Type to filter documents..."
             )
 
-        # 파일 리스트 영역
+        # 파일 리스트 영역 (입력할 때마다 전체 파일명을 정규화하지 않고 색인에서 찾는다)
         if search_query.strip():
-            search_query_normalized = normalize_string(search_query.lower())
-            filtered_files = [
-                f for f in file_list
-                if search_query_normalized in normalize_string(f.get("filename", "").lower())
-            ]
+            search_index = get_file_search_index()
+            search_index.sync(file_list)
+            files_by_doc_id = {f.get("doc_id"): f for f in file_list}
+            filtered_files = [files_by_doc_id[doc_id] for doc_id in search_index.search(search_query)]
         else:
             filtered_files = file_list
 
@@ -163,7 +275,13 @@ def display_file_list():
                             st.warning(f"정말로 {filename}을(를) 삭제하시겠습니까?")
                         with confirm_col2:
                             if st.button("Yes", key=f"yes_confirm_{file_id}", use_container_width=True):
-                                file_manager.remove_file(file_id)
+                                if job_queue is not None:
+                                    job_id, _ = job_queue.enqueue(DELETE_JOB, file_id, file_name=filename)
+                                    st.session_state.setdefault("delete_jobs", {})[file_id] = job_id
+                                    file_manager.remove_file(file_id, remove_from_store=False)
+                                else:
+                                    file_manager.remove_file(file_id)
+                                invalidate_file_list()
                                 st.session_state.delete_confirm = None
                                 st.rerun()
                         with confirm_col3:
@@ -202,57 +320,66 @@ def display_search_tab():
     if 'top_k' not in st.session_state:
         # 기본적으로 15로 지정, 나중에 reranker를 처리하고 나서 줄인다.
         st.session_state.top_k = 20
-    if 'processing' not in st.session_state:
-        st.session_state.processing = False
-    if 'last_user_input' not in st.session_state:  # 마지막 사용자 입력 저장용
-        st.session_state.last_user_input = None
 
+    display_chat()
+
+@st.fragment
+def display_chat():
+    """
+    대화 영역. fragment이므로 질문/옵션 변경 시에는 이 영역만 다시 실행된다. (파일 목록 등은 그대로)
+    대화 기록은 최근 CHAT_HISTORY_RENDER_LIMIT개만 표시하여 대화가 길어져도 렌더링 비용이 일정하다.
+    """
     chat_col, input_col = st.columns([7, 3])
-    
-    with chat_col:
-        with st.container(height=500):
-            for role, message in st.session_state.chat_history:
-                with st.chat_message(role):
-                    formatted_message = format_message(message)
-                    st.markdown(formatted_message, unsafe_allow_html=True)
-            
-            if st.session_state.processing:
-                with st.spinner('답변을 생성하는 중입니다...'):
-                    st.empty()
 
     with input_col:
-        if prompt := st.chat_input("Ask about your documents..."):
-            if not st.session_state.processing:
-                # 사용자 메시지 추가
-                st.session_state.chat_history.append(("user", prompt))
-                st.session_state.last_user_input = prompt  # 입력 저장
-                st.session_state.processing = True
-                st.rerun()
-                
-        # processing 상태일 때 응답 생성
-        if st.session_state.processing and st.session_state.last_user_input:
-            # 응답 생성
-            response = generate_response(
-                st.session_state.last_user_input,  # 저장된 입력 사용
-                top_k=st.session_state.top_k,
-                vectorstore_version=VECTORSTORE_VERSION,
-                max_tokens=None
-            )
-            
-            # 봇 응답 추가
-            st.session_state.chat_history.append(("bot", response))
-            st.session_state.processing = False
-            st.session_state.last_user_input = None  # 입력 초기화
-            st.rerun()
+        prompt = st.chat_input("Ask about your documents...")
 
         with st.expander("**Advanced Options**", expanded=False):
             st.session_state.top_k = st.slider(
-                "Choose the number of top relevant documents to retrieve:",
+                "Choose the maximum number of relevant documents to retrieve:",
                 min_value=10,
                 max_value=30,
                 value=st.session_state.top_k,
                 key="top_k_slider"
             )
+    
+    with chat_col:
+        with st.container(height=500):
+            chat_history = st.session_state.chat_history
+            hidden = len(chat_history) - CHAT_HISTORY_RENDER_LIMIT
+            if hidden > 0:
+                st.caption(f"이전 메시지 {hidden}개는 표시하지 않습니다.")
+            for role, message in chat_history[max(hidden, 0):]:
+                with st.chat_message(role):
+                    st.markdown(format_message(message), unsafe_allow_html=True)
+            
+            # 질문이 들어오면 rerun 없이 바로 이어서 응답을 생성하고 표시한다.
+            if prompt:
+                st.session_state.chat_history.append(("user", prompt))
+                with st.chat_message("user"):
+                    st.markdown(format_message(prompt), unsafe_allow_html=True)
+                
+                with st.chat_message("bot"):
+                    with st.spinner('답변을 생성하는 중입니다...'):
+                        response = get_answer(prompt, top_k=st.session_state.top_k)
+                    st.markdown(format_message(response), unsafe_allow_html=True)
+                st.session_state.chat_history.append(("bot", response))
+
+def get_answer(query, top_k):
+    """
+    RAG_API_URL이 설정되어 있으면 API 서버에 질의하고, 아니면 프로세스 안에서 응답을 생성합니다.
+    """
+    if not RAG_API_URL:
+        return generate_response(query, top_k=top_k, vectorstore_version=VECTORSTORE_VERSION, max_tokens=None)
+    
+    try:
+        return get_api_client().answer(query, top_k=top_k)
+    except RagApiError as e:
+        if e.status_code == 429:
+            return "현재 요청이 많아 답변을 생성하지 못했습니다. 잠시 후 다시 시도해주세요."
+        return f"An error occurred while generating a response: {e}"
+    except Exception as e:
+        return f"An error occurred while generating a response: {e}"
 
 def format_message(message):
     """
@@ -283,6 +410,9 @@ def main():
         if uploaded_files:
             for uploaded_file in uploaded_files:
                 add_uploaded_file_to_list(uploaded_file)
+        if job_queue is not None:
+            display_ingest_jobs()
+        display_ingest_reports()
     with tab2:
         display_search_tab()
 
@@ -0,0 +1,47 @@
+# snapshot_vectorstore.py
+"""
+벡터스토어 스냅샷 내보내기/가져오기 명령줄 도구.
+
+재임베딩 없이 새 노드(읽기 전용 복제본 등)를 띄울 때 사용한다.
+
+사용법:
+    python snapshot_vectorstore.py export snapshots/full
+    python snapshot_vectorstore.py export snapshots/inc-1 --base snapshots/full
+    python snapshot_vectorstore.py import snapshots/full snapshots/inc-1
+"""
+import sys
+import argparse
+from src.embedding.vectorstore_handler import VectorStoreManager
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Export or import vectorstore snapshots.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="스냅샷 내보내기")
+    export_parser.add_argument("output", help="스냅샷 디렉토리")
+    export_parser.add_argument("--base", default=None, help="증분 스냅샷의 기준 스냅샷 디렉토리")
+
+    import_parser = subparsers.add_parser("import", help="스냅샷 가져오기 (전체 -> 증분 순서로 지정)")
+    import_parser.add_argument("snapshots", nargs="+", help="스냅샷 디렉토리")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.command == "export":
+        manifest = VectorStoreManager.export_snapshot(args.output, base_dir=args.base)
+        print(
+            f"Exported {manifest['chunks']} chunks ({len(manifest['documents'])} documents, "
+            f"{len(manifest['tombstones'])} tombstones) to {args.output}"
+        )
+    else:
+        for snapshot_dir in args.snapshots:
+            manifest = VectorStoreManager.import_snapshot(snapshot_dir)
+            print(f"Imported {manifest['chunks']} chunks from {snapshot_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
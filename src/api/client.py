@@ -0,0 +1,48 @@
+# /src/api/client.py
+import requests
+from src.config import RAG_API_URL, RAG_API_TIMEOUT
+
+
+class RagApiError(Exception):
+    """API 서버가 요청을 처리하지 못한 경우 (429 포함)."""
+
+    def __init__(self, status_code, message):
+        super().__init__(f"{status_code}: {message}")
+        self.status_code = status_code
+
+
+class RagApiClient:
+    """
+    src.api.server의 HTTP 클라이언트. Streamlit 등에서 사용한다.
+    연결은 requests.Session으로 재사용한다.
+    """
+
+    def __init__(self, base_url=RAG_API_URL, timeout=RAG_API_TIMEOUT):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def _post(self, path, payload, stream=False):
+        response = self.session.post(f"{self.base_url}{path}", json=payload, timeout=self.timeout, stream=stream)
+        if response.status_code != 200:
+            try:
+                message = response.json().get("detail", response.text)
+            except ValueError:
+                message = response.text
+            raise RagApiError(response.status_code, message)
+        return response
+
+    def retrieve(self, query, top_k=5):
+        """검색된 문서 리스트({"content", "metadata"})를 반환합니다."""
+        return self._post("/retrieve", {"query": query, "top_k": top_k}).json()["documents"]
+
+    def answer(self, query, top_k=5):
+        """LLM 응답 전체를 반환합니다."""
+        return self._post("/answer", {"query": query, "top_k": top_k}).json()["answer"]
+
+    def stream_answer(self, query, top_k=5):
+        """LLM 응답을 생성되는 대로 텍스트 조각으로 반환합니다."""
+        with self._post("/answer/stream", {"query": query, "top_k": top_k}, stream=True) as response:
+            for piece in response.iter_content(chunk_size=None, decode_unicode=True):
+                if piece:
+                    yield piece
@@ -0,0 +1,233 @@
+# /src/api/server.py
+"""
+RAG 파이프라인을 Streamlit과 분리해서 제공하는 비동기 HTTP 질의 서비스.
+
+엔드포인트:
+    POST /retrieve       검색된 문서 리스트
+    POST /answer         LLM 응답 (한번에)
+    POST /answer/stream  LLM 응답 (생성되는 대로 text/plain 스트리밍)
+    GET  /health         상태 및 현재 처리/대기 요청 수
+
+동시 처리 수는 API_MAX_CONCURRENCY로 제한하고, 대기 요청이 API_MAX_QUEUE를 넘거나
+API_QUEUE_TIMEOUT 안에 처리를 시작하지 못하면 429(Retry-After)를 반환한다.
+검색/LLM 호출은 블로킹이므로 전용 스레드풀에서 실행한다.
+
+실행:
+    python -m src.api.server
+    LLM_PROVIDER=fake EMBEDDING_PROVIDER=fake python -m src.api.server  # 부하 테스트용
+"""
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor, wait
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from src.query.query import get_llm
+from src.query.llm_intergration import fetch_top_documents, generate_response, stream_response
+from src.embedding.vectorstore_handler import VectorStoreManager
+from src.embedding.shared_index import SharedIndex
+from src.query.semantic_cache import SemanticAnswerCache
+from src.config import (
+        RETRIEVER_TYPE,
+        SEMANTIC_CACHE_ENABLED,
+        VECTORSTORE_VERSION,
+        API_HOST,
+        API_PORT,
+        API_MAX_CONCURRENCY,
+        API_MAX_QUEUE,
+        API_QUEUE_TIMEOUT,
+    )
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+
+
+class QueryRequest(BaseModel):
+    query: str
+    top_k: int = 5
+
+
+class ConcurrencyLimiter:
+    """
+    동시 처리 수와 대기열 길이를 제한한다.
+    대기열이 가득 찼거나 대기 시간이 초과되면 429를 발생시킨다.
+    """
+
+    def __init__(self, max_concurrency=API_MAX_CONCURRENCY, max_queue=API_MAX_QUEUE, queue_timeout=API_QUEUE_TIMEOUT):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+
+    async def acquire(self):
+        if self._semaphore.locked() and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise HTTPException(status_code=429, detail="Too many requests", headers={"Retry-After": "1"})
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise HTTPException(status_code=429, detail="Server busy", headers={"Retry-After": "1"})
+        finally:
+            self.waiting -= 1
+        self.active += 1
+
+    def release(self):
+        self.active -= 1
+        self._semaphore.release()
+
+    @asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+
+class StreamSlot:
+    """
+    스트리밍 응답 하나가 쥐고 있는 처리 슬롯과 응답 iterator.
+
+    응답 본문이 시작되지 않았거나 클라이언트가 중간에 끊어도 finish()가 한번만 실행되어,
+    스레드에서 진행 중인 next()가 끝나기를 기다린 뒤 iterator를 닫고(LLM 스트림 중단) 슬롯을 반환한다.
+    """
+
+    def __init__(self, limiter, iterator, executor):
+        self.limiter = limiter
+        self.iterator = iterator
+        self.executor = executor
+        self._pending = None
+        self._finished = False
+
+    async def next(self, default):
+        self._pending = self.executor.submit(next, self.iterator, default)
+        # 요청이 취소되어도 스레드의 next()는 취소되지 않으므로 finish()에서 기다린다.
+        return await asyncio.shield(asyncio.wrap_future(self._pending))
+
+    def _close(self, pending):
+        if pending is not None:
+            wait([pending])
+        try:
+            self.iterator.close()
+        except Exception as e:
+            logging.warning(f"Error closing response stream: {e}")
+
+    def finish(self):
+        """이벤트 루프 스레드에서 호출한다. 기다리지 않고 정리를 예약만 하므로 취소 중에도 호출할 수 있다."""
+        if self._finished:
+            return
+        self._finished = True
+        loop = asyncio.get_running_loop()
+        closing = loop.run_in_executor(self.executor, self._close, self._pending)
+        closing.add_done_callback(lambda _: self.limiter.release())
+
+
+class SlotStreamingResponse(StreamingResponse):
+    """응답이 어떻게 끝나든(본문 시작 전 연결 끊김 포함) StreamSlot을 정리하는 StreamingResponse."""
+
+    def __init__(self, content, stream_slot, **kwargs):
+        super().__init__(content, **kwargs)
+        self.stream_slot = stream_slot
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.stream_slot.finish()
+
+
+def _serialize_documents(documents):
+    return [{"content": doc.page_content, "metadata": doc.metadata} for doc in documents]
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # 블로킹 작업 전용 스레드풀 (동시 처리 수와 같은 크기)
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=API_MAX_CONCURRENCY, thread_name_prefix="rag-api")
+    loop.set_default_executor(executor)
+    app.state.executor = executor
+    app.state.limiter = ConcurrencyLimiter()
+
+    # 첫 요청이 느려지지 않도록 벡터스토어와 LLM 클라이언트를 미리 만들어 둔다.
+    if RETRIEVER_TYPE == "shared":
+        # 공유 인덱스 모드는 벡터스토어(Chroma)를 열지 않고, 임베딩과 메모리 맵 인덱스만 연결한다. (인덱스를 읽어들이지 않음)
+        await asyncio.to_thread(VectorStoreManager.get_embeddings, vectorstore_version=VECTORSTORE_VERSION)
+        await asyncio.to_thread(SharedIndex.get_instance().generation)
+    else:
+        await asyncio.to_thread(VectorStoreManager.get_instance, vectorstore_version=VECTORSTORE_VERSION)
+    await asyncio.to_thread(get_llm, "gemini-2.0-flash-exp", 0.5)
+    if SEMANTIC_CACHE_ENABLED:
+        await asyncio.to_thread(SemanticAnswerCache.get_instance, vectorstore_version=VECTORSTORE_VERSION)
+    logging.info(f"RAG API ready (max concurrency: {API_MAX_CONCURRENCY}, max queue: {API_MAX_QUEUE})")
+    try:
+        yield
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+app = FastAPI(title="RAG Query API", lifespan=lifespan)
+
+
+@app.get("/health")
+async def health():
+    limiter = app.state.limiter
+    status = {"status": "ok", "active": limiter.active, "waiting": limiter.waiting, "rejected": limiter.rejected}
+    if SEMANTIC_CACHE_ENABLED:
+        cache = SemanticAnswerCache.get_instance(vectorstore_version=VECTORSTORE_VERSION)
+        status["semantic_cache"] = {"hits": cache.hits, "misses": cache.misses}
+    return status
+
+
+@app.post("/retrieve")
+async def retrieve(request: QueryRequest):
+    async with app.state.limiter.slot():
+        documents = await asyncio.to_thread(fetch_top_documents, request.query, request.top_k, VECTORSTORE_VERSION)
+    return {"documents": _serialize_documents(documents)}
+
+
+@app.post("/answer")
+async def answer(request: QueryRequest):
+    async with app.state.limiter.slot():
+        response = await asyncio.to_thread(
+            generate_response, request.query, top_k=request.top_k, vectorstore_version=VECTORSTORE_VERSION
+        )
+    return {"answer": response}
+
+
+@app.post("/answer/stream")
+async def answer_stream(request: QueryRequest):
+    limiter = app.state.limiter
+    # 대기열이 가득 차면 응답을 시작하기 전에 429를 반환하도록 슬롯은 여기서 얻는다.
+    await limiter.acquire()
+    iterator = stream_response(request.query, top_k=request.top_k, vectorstore_version=VECTORSTORE_VERSION)
+    stream_slot = StreamSlot(limiter, iterator, app.state.executor)
+
+    async def body():
+        # 스트리밍이 끝날 때까지 처리 슬롯을 유지한다.
+        sentinel = object()
+        try:
+            while True:
+                piece = await stream_slot.next(sentinel)
+                if piece is sentinel:
+                    break
+                yield piece
+        finally:
+            stream_slot.finish()
+
+    return SlotStreamingResponse(body(), stream_slot, media_type="text/plain; charset=utf-8")
+
+
+def main():
+    import uvicorn
+    uvicorn.run(app, host=API_HOST, port=API_PORT)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 # Paths
@@ -23,4 +24,136 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY") # for embedding
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY") # for query
 
 # Extra Variables
-RETRIEVER_TYPE = os.getenv("RETRIEVER_TYPE", "dense")
\ No newline at end of file
+INGEST_QUEUE_ENABLED = os.getenv("INGEST_QUEUE_ENABLED", "true").lower() == "true"  # false면 Streamlit에서 바로 적재 (Ingest Job Queue 참고)
+# chromadb는 다른 프로세스가 쓴 청크를 이미 열린 인덱스(HNSW)에 반영하지 않으므로, 적재 워커를 쓰면 Chroma로 검색하는
+# 질의 프로세스(Streamlit, API)는 재시작 전까지 워커가 적재/삭제한 문서를 반영하지 못한다.
+# 그래서 작업 큐를 쓰면 기본값으로 워커가 발행하는 공유 인덱스(shared)에서 검색한다.
+RETRIEVER_TYPE = os.getenv("RETRIEVER_TYPE", "shared" if INGEST_QUEUE_ENABLED else "dense")
+
+# Hierarchical Retrieval (요약 인덱스 -> 청크 순서의 2단계 검색)
+SUMMARY_COLLECTION_NAME = "summaries"
+HIERARCHICAL_DOC_K = int(os.getenv("HIERARCHICAL_DOC_K", 3))  # 1단계에서 선택할 문서 수
+HIERARCHICAL_CHUNK_K = int(os.getenv("HIERARCHICAL_CHUNK_K", 4))  # 2단계에서 문서당 가져올 청크 수
+HIERARCHICAL_PARALLEL_MIN_DOCS = int(os.getenv("HIERARCHICAL_PARALLEL_MIN_DOCS", 3))  # 이 이상이면 문서별 검색을 병렬로 실행
+SEARCH_MAX_WORKERS = int(os.getenv("SEARCH_MAX_WORKERS", 8))
+
+# Query Embedding Micro-batching (동시 세션의 쿼리 임베딩을 모아서 한번에 요청)
+QUERY_BATCH_ENABLED = os.getenv("QUERY_BATCH_ENABLED", "true").lower() == "true"
+QUERY_BATCH_WINDOW_MS = float(os.getenv("QUERY_BATCH_WINDOW_MS", 5))  # 요청을 모으는 최대 대기 시간
+QUERY_BATCH_MAX_SIZE = int(os.getenv("QUERY_BATCH_MAX_SIZE", 64))  # 한번에 보낼 최대 쿼리 수
+QUERY_BATCH_TIMEOUT = float(os.getenv("QUERY_BATCH_TIMEOUT", 60))  # 배치 처리 결과를 기다리는 최대 시간(초)
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", 1024))  # 같은 쿼리 텍스트의 임베딩을 재사용할 최근 쿼리 수 (0이면 사용 안 함)
+
+# Semantic Answer Cache (표현만 다른 반복 질문에 이전 응답을 재사용, 질의 프로세스별 메모리 캐시)
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", 0.95))  # 이 이상의 코사인 유사도면 같은 질문으로 판단
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", 5000))  # 초과하면 가장 오래 사용되지 않은 응답부터 삭제
+SEMANTIC_CACHE_TTL = float(os.getenv("SEMANTIC_CACHE_TTL", 86400))  # 응답 최대 보관 시간(초)
+SEMANTIC_CACHE_COLLECTION_NAME = "semantic_answer_cache"
+
+# Multi-query Retrieval (복합 질문을 여러 하위 질의로 나눠 검색 후 RRF로 병합)
+MULTI_QUERY_MAX = int(os.getenv("MULTI_QUERY_MAX", 4))  # 원본 질의를 포함한 최대 하위 질의 수
+MULTI_QUERY_RRF_K = int(os.getenv("MULTI_QUERY_RRF_K", 60))  # Reciprocal Rank Fusion 상수
+MULTI_QUERY_MIN_CLAUSE_WORDS = int(os.getenv("MULTI_QUERY_MIN_CLAUSE_WORDS", 3))  # 하위 질의로 나눌 조각의 최소 단어 수
+
+# MMR Diversity Selection (겹치는 청크를 줄이기 위한 다양성 선택)
+MMR_LAMBDA = float(os.getenv("MMR_LAMBDA", 0.5))  # 1에 가까울수록 관련도, 0에 가까울수록 다양성 우선
+MMR_FETCH_K = int(os.getenv("MMR_FETCH_K", 100))  # MMR 후보로 가져올 청크 수
+MMR_OVERLAP_WEIGHT = float(os.getenv("MMR_OVERLAP_WEIGHT", 0.5))  # 같은 문서 내 범위 중복 패널티 가중치
+
+# Adaptive Top-k (유사도 점수로 관련 없는 청크를 잘라내고, 관련 문서가 없으면 LLM 호출 없이 응답)
+ADAPTIVE_TOP_K_ENABLED = os.getenv("ADAPTIVE_TOP_K_ENABLED", "true").lower() == "true"  # dense/shared 검색에 적용 (top_k는 최대 개수)
+ADAPTIVE_MIN_SCORE = float(os.getenv("ADAPTIVE_MIN_SCORE", 0.3))  # 이보다 낮은 코사인 유사도의 청크는 제외 (가장 높은 점수도 낮으면 결과 없음)
+ADAPTIVE_MAX_SCORE_GAP = float(os.getenv("ADAPTIVE_MAX_SCORE_GAP", 0.15))  # 가장 높은 점수보다 이만큼 이상 낮은 청크는 제외
+ADAPTIVE_KNEE_MIN_DROP = float(os.getenv("ADAPTIVE_KNEE_MIN_DROP", 0.05))  # 연속한 점수 차이 중 가장 큰 차이가 이 이상이면 그 앞에서 자름
+ADAPTIVE_MIN_K = int(os.getenv("ADAPTIVE_MIN_K", 2))  # 최소 점수를 넘은 청크는 점수 차이와 관계없이 이 개수까지 유지
+
+# Loader Boilerplate Stripping (페이지마다 반복되는 머리말/꼬리말 제거)
+BOILERPLATE_MIN_PAGE_RATIO = float(os.getenv("BOILERPLATE_MIN_PAGE_RATIO", 0.5))  # 전체 페이지 중 이 비율 이상 반복되면 제거
+BOILERPLATE_MIN_PAGES = int(os.getenv("BOILERPLATE_MIN_PAGES", 3))  # 이 페이지 수 미만의 문서는 반복 줄 제거를 하지 않음
+
+
+# Upload Spooling (업로드 파일을 블록 단위로 복사하고 내용 해시로 저장)
+UPLOAD_SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR", os.path.join(tempfile.gettempdir(), "rag_uploads"))
+UPLOAD_SPOOL_BLOCK_SIZE = int(os.getenv("UPLOAD_SPOOL_BLOCK_SIZE", 1024 * 1024))  # 1MB
+UPLOAD_SPOOL_MAX_AGE = int(os.getenv("UPLOAD_SPOOL_MAX_AGE", 60 * 60 * 24))  # 참조가 없는 스풀 파일을 정리하는 기준(초)
+
+# Tabular Ingestion (CSV/XLSX를 LLM 청킹 없이 행 블록 단위로 저장)
+TABULAR_BLOCK_TOKENS = int(os.getenv("TABULAR_BLOCK_TOKENS", 800))  # 행 블록 하나의 최대 토큰 수 (헤더 포함)
+TABULAR_SAMPLE_VALUES = int(os.getenv("TABULAR_SAMPLE_VALUES", 3))  # 스키마 요약에 보여줄 열별 예시 값 수
+TABULAR_INGEST_BATCH_SIZE = int(os.getenv("TABULAR_INGEST_BATCH_SIZE", 256))  # 한번에 임베딩/저장할 행 블록 수
+
+# Image Ingestion (캡션/OCR 모델을 상주시키고 이미지를 배치로 처리)
+IMAGE_CAPTION_MODEL = os.getenv("IMAGE_CAPTION_MODEL", "Salesforce/blip-image-captioning-base")
+IMAGE_BATCH_SIZE = int(os.getenv("IMAGE_BATCH_SIZE", 8))
+IMAGE_OCR_MIN_CHARS = int(os.getenv("IMAGE_OCR_MIN_CHARS", 20))  # OCR 텍스트가 이 이상이면 캡션 생성을 건너뜀
+OCR_USE_GPU = os.getenv("OCR_USE_GPU", "false").lower() == "true"
+
+# Metrics (단계별 소요 시간/처리량 집계 및 노출)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+METRICS_PORT = int(os.getenv("METRICS_PORT", 9108))  # /metrics(Prometheus), /metrics.json 노출 포트
+METRICS_RECENT_SPANS = int(os.getenv("METRICS_RECENT_SPANS", 500))  # JSON 덤프에 포함할 최근 span 수
+METRICS_MAX_REPORTS = int(os.getenv("METRICS_MAX_REPORTS", 200))  # 메모리에 보관할 최근 파일별 ingest report 수
+
+# Providers (벤치마크/로컬 실행 시 "fake"로 설정하면 외부 API 없이 결정적인 대체 구현을 사용)
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini")  # gemini | fake
+EMBEDDING_PROVIDER = os.getenv("EMBEDDING_PROVIDER", "openai")  # openai | fake
+FAKE_LLM_LATENCY = float(os.getenv("FAKE_LLM_LATENCY", 0.0))  # 호출당 지연 시간(초)
+FAKE_EMBEDDING_LATENCY = float(os.getenv("FAKE_EMBEDDING_LATENCY", 0.0))  # 호출당 지연 시간(초)
+FAKE_EMBEDDING_DIM = int(os.getenv("FAKE_EMBEDDING_DIM", 1536))
+
+# Chunking Cache (검증된 LLM 청킹 결과를 텍스트 해시 기준으로 저장)
+CHUNKING_MODEL = os.getenv("CHUNKING_MODEL", "gemini-1.5-flash")
+CHUNK_CACHE_ENABLED = os.getenv("CHUNK_CACHE_ENABLED", "true").lower() == "true"
+CHUNK_CACHE_PATH = os.getenv("CHUNK_CACHE_PATH", os.path.join(PROCESSED_DATA_DIR, "chunk_cache.sqlite"))
+CHUNK_CACHE_MAX_BYTES = int(os.getenv("CHUNK_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+
+# Bulk Ingest (명령줄 대량 적재)
+BULK_INGEST_WORKERS = int(os.getenv("BULK_INGEST_WORKERS", 4))  # 로드/청킹을 병렬로 처리할 작업자 수
+BULK_INGEST_CHECKPOINT_PATH = os.getenv("BULK_INGEST_CHECKPOINT_PATH", os.path.join(PROCESSED_DATA_DIR, "bulk_ingest.sqlite"))
+BULK_INGEST_MAX_ATTEMPTS = int(os.getenv("BULK_INGEST_MAX_ATTEMPTS", 3))  # 실패한 파일을 재시도할 최대 횟수
+
+# Ingest Journal (문서 단위 적재/삭제의 write-ahead 기록, 벡터스토어 디렉토리에 함께 저장. 쓰기 프로세스 시작 시 복구)
+INGEST_JOURNAL_NAME = "ingest_journal.sqlite"
+INGEST_JOURNAL_LEASE = float(os.getenv("INGEST_JOURNAL_LEASE", 60))  # heartbeat가 이 시간(초) 이상 끊긴 작업만 중단된 것으로 보고 복구
+
+# Chunk Catalog (doc_id -> 청크 id 매핑, 벡터스토어 디렉토리에 함께 저장)
+CHUNK_CATALOG_NAME = "chunk_catalog.sqlite"
+
+# Compaction (이전 버전/원본이 사라진 문서/카탈로그에 없는 청크 정리)
+COMPACTION_KEEP_VERSIONS = int(os.getenv("COMPACTION_KEEP_VERSIONS", 1))  # 문서별로 남길 최신 버전 수
+COMPACTION_ORPHAN_ROOTS = [p for p in os.getenv("COMPACTION_ORPHAN_ROOTS", DATA_DIR).split(",") if p]  # 이 디렉토리 아래 원본이 사라진 문서만 삭제
+COMPACTION_BATCH_SIZE = int(os.getenv("COMPACTION_BATCH_SIZE", 500))  # 한번에 삭제할 청크 수
+COMPACTION_PROBE_QUERIES = int(os.getenv("COMPACTION_PROBE_QUERIES", 20))  # 정리 전후 검색 지연 측정에 사용할 쿼리 수
+
+# Snapshot (벡터/문서/메타데이터를 내보내고 재임베딩 없이 가져오기)
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", os.path.join(BASE_DIR, "snapshots"))
+SNAPSHOT_PART_SIZE = int(os.getenv("SNAPSHOT_PART_SIZE", 10000))  # 파일 하나에 저장할 청크 수
+
+# Shared Index (여러 질의 프로세스가 메모리 맵으로 공유하는 읽기 전용 IVF 인덱스, RETRIEVER_TYPE=shared)
+SHARED_INDEX_ENABLED = os.getenv("SHARED_INDEX_ENABLED", str(RETRIEVER_TYPE == "shared")).lower() == "true"  # true면 적재 워커가 적재 후 새 세대를 발행
+SHARED_INDEX_DIR = os.getenv("SHARED_INDEX_DIR", os.path.join(BASE_DIR, "vectorstore", "shared"))
+SHARED_INDEX_NPROBE = int(os.getenv("SHARED_INDEX_NPROBE", 8))  # 검색 시 확인할 클러스터 수
+SHARED_INDEX_PUBLISH_INTERVAL = float(os.getenv("SHARED_INDEX_PUBLISH_INTERVAL", 30))  # 발행 최소 간격(초)
+SHARED_INDEX_CHECK_INTERVAL = float(os.getenv("SHARED_INDEX_CHECK_INTERVAL", 5))  # 질의 프로세스가 새 세대를 확인하는 주기(초)
+SHARED_INDEX_KEEP_GENERATIONS = int(os.getenv("SHARED_INDEX_KEEP_GENERATIONS", 2))  # 남겨둘 이전 세대 수
+
+# Query API (비동기 HTTP 질의 서비스)
+API_HOST = os.getenv("API_HOST", "0.0.0.0")
+API_PORT = int(os.getenv("API_PORT", 8000))
+API_MAX_CONCURRENCY = int(os.getenv("API_MAX_CONCURRENCY", 8))  # 동시에 처리할 최대 요청 수
+API_MAX_QUEUE = int(os.getenv("API_MAX_QUEUE", 32))  # 대기할 수 있는 최대 요청 수 (초과하면 429)
+API_QUEUE_TIMEOUT = float(os.getenv("API_QUEUE_TIMEOUT", 5))  # 대기 최대 시간(초) (초과하면 429)
+RAG_API_URL = os.getenv("RAG_API_URL", "")  # 설정하면 Streamlit이 API 서버를 통해 질의함 (예: http://localhost:8000)
+RAG_API_TIMEOUT = float(os.getenv("RAG_API_TIMEOUT", 120))
+
+# Ingest Job Queue (업로드 파일을 별도 워커 프로세스에서 적재, 사용 여부는 INGEST_QUEUE_ENABLED)
+INGEST_QUEUE_PATH = os.getenv("INGEST_QUEUE_PATH", os.path.join(PROCESSED_DATA_DIR, "ingest_jobs.sqlite"))
+INGEST_WORKER_CONCURRENCY = int(os.getenv("INGEST_WORKER_CONCURRENCY", 4))  # 워커가 동시에 처리할 파일 수
+INGEST_WORKER_POLL_INTERVAL = float(os.getenv("INGEST_WORKER_POLL_INTERVAL", 1.0))  # 대기 작업 확인 주기(초)
+INGEST_WORKER_HEARTBEAT_TIMEOUT = float(os.getenv("INGEST_WORKER_HEARTBEAT_TIMEOUT", 30))  # 이 시간 동안 신호가 없으면 워커 중지로 판단
+
+# Streamlit UI Caching
+FILE_LIST_CACHE_TTL = int(os.getenv("FILE_LIST_CACHE_TTL", 300))  # 파일 목록 캐시 유지 시간(초), 업로드/삭제 시에는 바로 갱신
+CHAT_HISTORY_RENDER_LIMIT = int(os.getenv("CHAT_HISTORY_RENDER_LIMIT", 30))  # 화면에 표시할 최근 대화 메시지 수
+FILE_SEARCH_FUZZY_THRESHOLD = float(os.getenv("FILE_SEARCH_FUZZY_THRESHOLD", 0.5))  # 일치하는 파일이 없을 때, 검색어의 2-gram이 이 비율 이상 겹치는 파일을 표시
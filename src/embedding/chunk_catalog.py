@@ -0,0 +1,356 @@
+# /src/embedding/chunk_catalog.py
+import os
+import sqlite3
+import logging
+import itertools
+import threading
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+
+# 컬렉션 백필 시 한번에 읽을 레코드 수
+BACKFILL_PAGE_SIZE = 5000
+
+
+# documents 테이블에 저장하는 문서 속성 (청크 메타데이터에는 doc_key만 남긴다)
+DOCUMENT_COLUMNS = ("doc_id", "version", "path", "file_name", "last_modified", "is_latest")
+
+# 문서 속성이 청크 메타데이터에 그대로 저장된 이전 형식의 청크가 있는지 (meta 테이블 키)
+LEGACY_METADATA_KEY = "legacy_metadata"
+
+
+class ChunkCatalog:
+    """
+    doc_id -> 청크 id 매핑과 문서 속성을 저장하는 SQLite 카탈로그. 벡터스토어 디렉토리에 함께 저장한다.
+
+    - 문서 존재 확인과 삭제를 Chroma 메타데이터 조회(where) 없이 id 리스트로 처리하기 위해 사용한다.
+    - 문서(버전)별 속성(경로, 파일명, 버전 등)은 documents 테이블에 한번만 저장하고, 청크는 정수 doc_key로 참조한다.
+    - 청크 저장/삭제 직후에 갱신하며, 중단된 경우는 적재 저널 복구에서 함께 정리한다.
+    - 문서 전체를 적재할 때마다 적재 번호(generation)를 새로 받아 청크에 기록하고, 저장이 끝나면 문서의 번호로 기록한다.
+      문서의 번호보다 작은 번호의 청크는 마지막 적재가 쓰지 않은 청크이므로 stale_ids()로 찾을 수 있다.
+      (일부 청크만 저장하는 경우는 번호를 받지 않으므로 기존 청크의 번호가 바뀌지 않는다)
+    - 여러 프로세스(Streamlit, 적재 워커, 대량 적재 CLI)가 같은 파일을 사용하므로 WAL 모드로 연다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS chunks (chunk_id TEXT PRIMARY KEY, doc_id TEXT NOT NULL, generation INTEGER)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_chunks_doc_id ON chunks(doc_id)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS documents (
+                    doc_key INTEGER PRIMARY KEY AUTOINCREMENT,
+                    doc_id TEXT NOT NULL,
+                    version TEXT NOT NULL,
+                    path TEXT,
+                    file_name TEXT,
+                    last_modified TEXT,
+                    is_latest INTEGER NOT NULL DEFAULT 1,
+                    generation INTEGER,
+                    UNIQUE (doc_id, version)
+                )
+            """)
+            # 적재 번호 컬럼이 없던 카탈로그는 컬럼만 추가한다. (이전 청크/문서는 NULL이며 stale_ids 대상이 아님)
+            for table in ("chunks", "documents"):
+                columns = {row[1] for row in self._conn.execute(f"PRAGMA table_info({table})")}
+                if "generation" not in columns:
+                    self._conn.execute(f"ALTER TABLE {table} ADD COLUMN generation INTEGER")
+
+    def add(self, doc_id, chunk_ids, generation=None):
+        """문서의 청크 id를 기록합니다. generation이 주어지면 이미 있는 id의 적재 번호도 바꿉니다."""
+        self.add_many({doc_id: chunk_ids}, generation=generation)
+
+    def add_many(self, chunk_ids_by_doc_id, generation=None):
+        """
+        여러 문서의 청크 id({doc_id: [chunk_id, ...]})를 한 트랜잭션으로 기록합니다.
+        generation이 주어지면 청크의 적재 번호로 기록하고(이미 있는 id 포함), 없으면 이미 있는 id의 번호는 그대로 둡니다.
+        """
+        rows = [
+            (chunk_id, doc_id, generation)
+            for doc_id, chunk_ids in chunk_ids_by_doc_id.items()
+            for chunk_id in chunk_ids
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO chunks (chunk_id, doc_id, generation) VALUES (?, ?, ?) "
+                "ON CONFLICT(chunk_id) DO UPDATE SET generation = COALESCE(excluded.generation, chunks.generation)",
+                rows,
+            )
+
+    def next_generation(self, doc_id):
+        """문서 전체를 새로 적재할 때 사용할 적재 번호. (마지막으로 기록한 번호 + 1)"""
+        with self._lock:
+            row = self._conn.execute("SELECT MAX(generation) FROM documents WHERE doc_id = ?", (doc_id,)).fetchone()
+        return (row[0] or 0) + 1
+
+    def set_generation(self, doc_id, generation):
+        """문서 전체의 저장이 끝났으므로 문서의 최신 버전에 적재 번호를 기록합니다."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE documents SET generation = ? WHERE doc_id = ? AND is_latest = 1", (generation, doc_id)
+            )
+
+    def register_document(self, doc_id, version, path=None, file_name=None, last_modified=None):
+        """
+        문서(버전)를 등록하고 doc_key를 반환합니다. 같은 doc_id의 다른 버전은 is_latest=0으로 바꿉니다.
+        """
+        doc_keys = self.register_documents([(doc_id, version, path, file_name, last_modified)])
+        return doc_keys[(doc_id, str(version))]
+
+    def register_documents(self, documents):
+        """
+        여러 문서(버전)를 한 트랜잭션으로 등록합니다. 순서대로 register_document와 같이 처리하므로,
+        같은 doc_id의 버전이 여러개면 마지막 버전이 is_latest가 됩니다.
+
+        Args:
+            documents (list[tuple]): (doc_id, version, path, file_name, last_modified) 리스트.
+
+        Returns:
+            dict: (doc_id, version) -> doc_key
+        """
+        doc_keys = {}
+        with self._lock, self._conn:
+            for doc_id, version, path, file_name, last_modified in documents:
+                version = str(version)
+                self._conn.execute(
+                    "INSERT INTO documents (doc_id, version, path, file_name, last_modified, is_latest) VALUES (?, ?, ?, ?, ?, 1) "
+                    "ON CONFLICT(doc_id, version) DO UPDATE SET path = excluded.path, file_name = excluded.file_name, "
+                    "last_modified = excluded.last_modified, is_latest = 1",
+                    (doc_id, version, path, file_name, last_modified),
+                )
+                self._conn.execute("UPDATE documents SET is_latest = 0 WHERE doc_id = ? AND version != ?", (doc_id, version))
+                row = self._conn.execute(
+                    "SELECT doc_key FROM documents WHERE doc_id = ? AND version = ?", (doc_id, version)
+                ).fetchone()
+                doc_keys[(doc_id, version)] = row[0]
+        return doc_keys
+
+    def get_documents(self, doc_keys):
+        """doc_key -> 문서 속성 딕셔너리를 반환합니다."""
+        documents = {}
+        doc_keys = list(set(doc_keys))
+        for start in range(0, len(doc_keys), 900):
+            batch = doc_keys[start:start + 900]
+            placeholders = ",".join("?" * len(batch))
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT doc_key, {', '.join(DOCUMENT_COLUMNS)} FROM documents WHERE doc_key IN ({placeholders})", batch
+                ).fetchall()
+            for row in rows:
+                document = dict(zip(DOCUMENT_COLUMNS, row[1:]))
+                document["is_latest"] = bool(document["is_latest"])
+                documents[row[0]] = document
+        return documents
+
+    def doc_keys_for(self, doc_ids):
+        """doc_id들의 모든 버전의 doc_key를 반환합니다."""
+        doc_ids = list(doc_ids)
+        if not doc_ids:
+            return []
+        placeholders = ",".join("?" * len(doc_ids))
+        with self._lock:
+            rows = self._conn.execute(f"SELECT doc_key FROM documents WHERE doc_id IN ({placeholders})", doc_ids).fetchall()
+        return [row[0] for row in rows]
+
+    def list_documents(self, doc_ids=None):
+        """
+        청크가 저장된 문서의 최신 버전 속성 리스트를 반환합니다. (Chroma 조회 없음)
+        doc_ids가 주어지면 해당 문서만 조회합니다.
+        """
+        query = (
+            f"SELECT {', '.join(DOCUMENT_COLUMNS)} FROM documents WHERE is_latest = 1 "
+            "AND doc_id IN (SELECT DISTINCT doc_id FROM chunks)"
+        )
+        params = []
+        if doc_ids is not None:
+            params = list(doc_ids)
+            query += f" AND doc_id IN ({','.join('?' * len(params))})"
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY doc_key", params).fetchall()
+        documents = [dict(zip(DOCUMENT_COLUMNS, row)) for row in rows]
+        for document in documents:
+            document["is_latest"] = bool(document["is_latest"])
+        return documents
+
+    def ids_for(self, doc_id):
+        with self._lock:
+            rows = self._conn.execute("SELECT chunk_id FROM chunks WHERE doc_id = ?", (doc_id,)).fetchall()
+        return [row[0] for row in rows]
+
+    def has_document(self, doc_id):
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM chunks WHERE doc_id = ? LIMIT 1", (doc_id,)).fetchone()
+        return row is not None
+
+    def has_unfinished_ingest(self, doc_id):
+        """
+        문서의 번호보다 큰 적재 번호의 청크가 있는지 여부. 적재가 청크를 저장하다가 끝나지 못한 문서다.
+        (행 블록을 나눠서 저장하는 표 파일은 도중에 종료되면 일부 청크만 남는다)
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM chunks c WHERE c.doc_id = ? AND c.generation > COALESCE("
+                "(SELECT MAX(generation) FROM documents d WHERE d.doc_id = c.doc_id), 0) LIMIT 1",
+                (doc_id,),
+            ).fetchone()
+        return row is not None
+
+    def doc_ids(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT DISTINCT doc_id FROM chunks").fetchall()
+        return [row[0] for row in rows]
+
+    def known_ids(self, chunk_ids):
+        """chunk_ids 중 카탈로그에 있는 id 집합을 반환합니다."""
+        known = set()
+        chunk_ids = list(chunk_ids)
+        # SQLite 변수 개수 제한(999) 안에서 나눠서 조회한다.
+        for start in range(0, len(chunk_ids), 900):
+            batch = chunk_ids[start:start + 900]
+            placeholders = ",".join("?" * len(batch))
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT chunk_id FROM chunks WHERE chunk_id IN ({placeholders})", batch
+                ).fetchall()
+            known.update(row[0] for row in rows)
+        return known
+
+    def stale_ids(self, chunk_ids):
+        """
+        chunk_ids 중 문서의 마지막 적재가 쓰지 않은(적재 번호가 문서의 번호보다 작은) 청크 id 집합.
+        적재 번호가 없는 청크와 문서(이전 카탈로그, 일부 청크만 저장한 경우)는 판단할 수 없으므로 제외합니다.
+        """
+        stale = set()
+        chunk_ids = list(chunk_ids)
+        for start in range(0, len(chunk_ids), 900):
+            batch = chunk_ids[start:start + 900]
+            placeholders = ",".join("?" * len(batch))
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT c.chunk_id FROM chunks c JOIN documents d ON d.doc_id = c.doc_id AND d.is_latest = 1 "
+                    f"WHERE c.chunk_id IN ({placeholders}) AND c.generation < d.generation",
+                    batch,
+                ).fetchall()
+            stale.update(row[0] for row in rows)
+        return stale
+
+    def iter_ids(self, page_size=BACKFILL_PAGE_SIZE):
+        """카탈로그의 청크 id를 page_size개씩 반환합니다."""
+        last_rowid = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT rowid, chunk_id FROM chunks WHERE rowid > ? ORDER BY rowid LIMIT ?", (last_rowid, page_size)
+                ).fetchall()
+            if not rows:
+                return
+            last_rowid = rows[-1][0]
+            yield [row[1] for row in rows]
+
+    def iter_documents(self, page_size=BACKFILL_PAGE_SIZE):
+        """(doc_id, [chunk_id]) 를 doc_id 순서로 반환합니다. 카탈로그 전체를 메모리에 올리지 않도록 나눠서 읽습니다."""
+        last = ("", "")
+        doc_id, chunk_ids = None, []
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT doc_id, chunk_id FROM chunks WHERE (doc_id, chunk_id) > (?, ?) "
+                    "ORDER BY doc_id, chunk_id LIMIT ?",
+                    (*last, page_size),
+                ).fetchall()
+            if not rows:
+                break
+            last = rows[-1]
+            for row_doc_id, group in itertools.groupby(rows, key=lambda row: row[0]):
+                if row_doc_id != doc_id:
+                    if doc_id is not None:
+                        yield doc_id, chunk_ids
+                    doc_id, chunk_ids = row_doc_id, []
+                chunk_ids.extend(row[1] for row in group)
+        if doc_id is not None:
+            yield doc_id, chunk_ids
+
+    def get_meta(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key, value):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def remove_ids(self, chunk_ids):
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM chunks WHERE chunk_id = ?", [(chunk_id,) for chunk_id in chunk_ids])
+
+    def remove_document(self, doc_id):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM chunks WHERE doc_id = ?", (doc_id,))
+            self._conn.execute("DELETE FROM documents WHERE doc_id = ?", (doc_id,))
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def is_backfilled(self):
+        """backfill()이 이미 실행되었는지 여부. (True면 컬렉션을 열지 않고 카탈로그만 사용할 수 있다)"""
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM meta WHERE key = 'backfilled_documents'").fetchone() is not None
+
+    def backfill(self, collection):
+        """
+        카탈로그가 생기기 전에 저장된 청크와 문서 속성을 컬렉션에서 읽어 기록합니다. (디렉토리당 한번만 실행)
+
+        Args:
+            collection: Chroma 컬렉션 (vectorstore._collection).
+        """
+        if self.is_backfilled():
+            return
+
+        total = 0
+        offset = 0
+        while True:
+            records = collection.get(include=["metadatas"], limit=BACKFILL_PAGE_SIZE, offset=offset)
+            if not records["ids"]:
+                break
+            rows = [
+                (chunk_id, metadata.get("doc_id"))
+                for chunk_id, metadata in zip(records["ids"], records["metadatas"])
+                if metadata and metadata.get("doc_id")
+            ]
+            documents = {
+                (metadata["doc_id"], str(metadata.get("version", "1"))): metadata
+                for metadata in records["metadatas"] if metadata and metadata.get("doc_id")
+            }
+            with self._lock, self._conn:
+                self._conn.executemany("INSERT OR IGNORE INTO chunks (chunk_id, doc_id) VALUES (?, ?)", rows)
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO documents (doc_id, version, path, file_name, last_modified, is_latest) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (doc_id, version, m.get("path"), m.get("file_name"), m.get("last_modified"), int(m.get("is_latest", True)))
+                        for (doc_id, version), m in documents.items()
+                    ],
+                )
+            total += len(rows)
+            offset += len(records["ids"])
+
+        with self._lock, self._conn:
+            # 이전 형식은 이전 버전 청크의 is_latest를 갱신하지 않았으므로 문서마다 마지막으로 등록된 버전만 최신으로 둔다.
+            self._conn.execute(
+                "UPDATE documents SET is_latest = (doc_key = (SELECT MAX(d.doc_key) FROM documents d WHERE d.doc_id = documents.doc_id))"
+            )
+            if total:
+                # 문서 속성이 청크 메타데이터에 남아있는 청크가 있으므로 doc_id 필터도 함께 사용해야 한다.
+                self._conn.execute(f"INSERT OR REPLACE INTO meta (key, value) VALUES ('{LEGACY_METADATA_KEY}', '1')")
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('backfilled_documents', '1')")
+        if total:
+            logging.info(f"Chunk catalog backfilled with {total} chunks.")
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,241 @@
+# /src/embedding/compaction.py
+import os
+import time
+import sqlite3
+import logging
+from src.embedding.vectorstore_handler import VectorStoreManager, remove_from_vectorstore, hydrate_metadatas, recover_from_journal
+from src.ingest.job_queue import JobQueue
+from src.config import (
+        VECTORSTORE_VERSION,
+        COMPACTION_KEEP_VERSIONS,
+        COMPACTION_ORPHAN_ROOTS,
+        COMPACTION_BATCH_SIZE,
+        COMPACTION_PROBE_QUERIES,
+    )
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+
+# 컬렉션 메타데이터를 한번에 읽을 레코드 수
+SCAN_PAGE_SIZE = 5000
+
+# Chroma가 레코드/메타데이터를 저장하는 SQLite 파일
+CHROMA_SQLITE_NAME = "chroma.sqlite3"
+
+
+def _version_key(version):
+    """버전은 문자열("1") 또는 정수로 저장되어 있으므로 숫자로 비교한다."""
+    try:
+        return (0, int(version))
+    except (TypeError, ValueError):
+        return (1, str(version))
+
+
+def _is_under(path, roots):
+    # 업로드 문서의 path는 원래 파일명(상대 경로)이므로 원본 확인 대상이 아니다.
+    if not path or not os.path.isabs(path):
+        return False
+    path = os.path.abspath(path)
+    return any(path.startswith(os.path.abspath(root) + os.sep) for root in roots)
+
+
+def _directory_size(directory):
+    total = 0
+    for dirpath, _, filenames in os.walk(directory):
+        for filename in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, filename))
+            except OSError:
+                pass
+    return total
+
+
+def scan_vectorstore(vectorstore, catalog, keep_versions=COMPACTION_KEEP_VERSIONS, orphan_roots=COMPACTION_ORPHAN_ROOTS):
+    """
+    컬렉션 메타데이터를 한번 훑어서 정리 대상을 찾습니다. (삭제는 하지 않음)
+
+    적재 파이프라인은 버전을 매기지 않고 같은 버전("1")으로 다시 저장하므로, 최신 버전 안에서도
+    마지막 적재가 기록하지 않은 청크(적재 번호가 문서의 번호보다 작은 청크, 카탈로그의 stale_ids)는 정리한다.
+    ingest_file은 교체할 때 이런 청크를 바로 지우므로, 교체 도중 종료된 경우에 남은 청크가 대상이다.
+
+    Returns:
+        dict: {
+            "superseded": list[str],   # 최신 keep_versions개를 제외한 이전 버전과 최신 버전의 이전 적재 청크 id
+            "orphaned": list[str],     # 원본 파일이 orphan_roots 아래에서 사라진 doc_id
+            "uncatalogued": list[str], # doc_id가 있는데 카탈로그에 없는 청크 id (doc_id 없이 저장된 청크는 제외)
+            "dangling": list[str],     # 컬렉션에 없는데 카탈로그에 남은 청크 id
+        }
+    """
+    collection = vectorstore._collection
+    versions = {}  # doc_id -> {version: [chunk_id]}
+    stale = {}     # doc_id -> {version: [chunk_id]} (마지막 적재가 기록하지 않은 청크)
+    sources = {}   # doc_id -> 원본 경로
+    uncatalogued = []
+
+    offset = 0
+    while True:
+        records = collection.get(include=["metadatas"], limit=SCAN_PAGE_SIZE, offset=offset)
+        if not records["ids"]:
+            break
+        offset += len(records["ids"])
+
+        known = catalog.known_ids(records["ids"])
+        stale_ids = catalog.stale_ids(known)
+        for chunk_id, metadata in zip(records["ids"], hydrate_metadatas(records["metadatas"])):
+            doc_id = metadata.get("doc_id")
+            if chunk_id not in known:
+                # doc_id 없이 저장된 청크는 원래 카탈로그에 기록되지 않으므로 정리 대상이 아니다.
+                if doc_id:
+                    uncatalogued.append(chunk_id)
+                continue
+            versions.setdefault(doc_id, {}).setdefault(metadata.get("version"), []).append(chunk_id)
+            if chunk_id in stale_ids:
+                stale.setdefault(doc_id, {}).setdefault(metadata.get("version"), []).append(chunk_id)
+            if metadata.get("path"):
+                sources.setdefault(doc_id, metadata["path"])
+
+    # 업로드 파일은 스풀 디렉토리에서 적재 후 삭제되므로, 지정한 디렉토리 아래의 원본만 확인한다.
+    orphaned = [
+        doc_id for doc_id, path in sources.items()
+        if _is_under(path, orphan_roots) and not os.path.exists(path)
+    ]
+
+    # 원본이 사라진 문서는 문서 전체를 삭제하므로 이전 버전 대상에서 제외한다.
+    orphaned_set = set(orphaned)
+    superseded = []
+    for doc_id, doc_versions in versions.items():
+        if doc_id in orphaned_set:
+            continue
+        ordered = sorted(doc_versions, key=_version_key, reverse=True)
+        superseded.extend(stale.get(doc_id, {}).get(ordered[0], []))
+        for version in ordered[keep_versions:]:
+            superseded.extend(doc_versions[version])
+
+    dangling = []
+    for chunk_ids in catalog.iter_ids(SCAN_PAGE_SIZE):
+        present = set(collection.get(ids=chunk_ids, include=[])["ids"])
+        dangling.extend(chunk_id for chunk_id in chunk_ids if chunk_id not in present)
+
+    return {"superseded": superseded, "orphaned": orphaned, "uncatalogued": uncatalogued, "dangling": dangling}
+
+
+def _ensure_no_live_writers(vectorstore_version, check_worker=True):
+    """적재 워커가 실행 중이거나 저널에 진행 중인 적재/삭제 작업이 있으면 RuntimeError를 발생시킵니다."""
+    if check_worker:
+        queue = JobQueue()
+        try:
+            worker_running = queue.has_live_worker()
+        finally:
+            queue.close()
+        if worker_running:
+            raise RuntimeError("An ingest worker is running. Enqueue compaction instead (compact_vectorstore.py --enqueue).")
+    if VectorStoreManager.get_journal(vectorstore_version=vectorstore_version).has_live_operations():
+        raise RuntimeError("Ingest or delete operations are in progress. Retry compaction after they finish.")
+
+
+def probe_search_latency(vectorstore, query_embeddings, k=10):
+    """주어진 쿼리 임베딩으로 검색해서 지연 시간 중앙값(ms)을 반환합니다."""
+    if not query_embeddings:
+        return None
+    latencies = []
+    for embedding in query_embeddings:
+        start = time.perf_counter()
+        vectorstore._collection.query(query_embeddings=[embedding], n_results=k, include=[])
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return latencies[len(latencies) // 2]
+
+
+def vacuum_sqlite(path):
+    """SQLite 파일의 빈 페이지를 반환합니다. (삭제만으로는 파일 크기가 줄지 않음)"""
+    if not os.path.exists(path):
+        return
+    conn = sqlite3.connect(path, timeout=60)
+    try:
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+
+
+def compact_vectorstore(
+    vectorstore_version=VECTORSTORE_VERSION,
+    keep_versions=COMPACTION_KEEP_VERSIONS,
+    orphan_roots=COMPACTION_ORPHAN_ROOTS,
+    batch_size=COMPACTION_BATCH_SIZE,
+    probe_queries=COMPACTION_PROBE_QUERIES,
+    dry_run=False,
+    vacuum=True,
+    check_worker=True,
+):
+    """
+    벡터스토어를 정리합니다.
+
+    1. 이전 버전 청크, 원본이 사라진 문서, 카탈로그에 없는 청크를 찾는다.
+    2. 원본이 사라진 문서는 저널에 기록하며 문서 단위로, 나머지 청크는 batch_size개씩 삭제한다.
+    3. Chroma SQLite 파일을 VACUUM하고, 줄어든 디렉토리 크기와 정리 전후 검색 지연 시간을 보고한다.
+
+    적재와 동시에 실행하면 저장 중인 청크가 카탈로그에 없거나 이전 적재의 청크로 보일 수 있으므로,
+    적재 워커가 실행 중이거나 다른 프로세스의 적재/삭제 작업이 진행 중이면 정리하지 않는다. (RuntimeError)
+    실행 중인 서비스에서는 적재 워커에 작업으로 등록해서 실행한다. (compact_vectorstore.py --enqueue)
+
+    Args:
+        check_worker (bool): 실행 중인 적재 워커가 있으면 정리하지 않을지 여부. 워커가 직접 실행할 때는 False.
+
+    Returns:
+        dict: 정리 결과 리포트.
+    """
+    vectorstore = VectorStoreManager.get_instance(vectorstore_version=vectorstore_version)
+    summary_store = VectorStoreManager.get_summary_instance(vectorstore_version=vectorstore_version)
+    catalog = VectorStoreManager.get_catalog(vectorstore_version=vectorstore_version)
+    directory = VectorStoreManager._directory
+    recover_from_journal(vectorstore_version)
+    if not dry_run:
+        _ensure_no_live_writers(vectorstore_version, check_worker)
+
+    start = time.perf_counter()
+    bytes_before = _directory_size(directory)
+    probe = vectorstore._collection.get(limit=probe_queries, include=["embeddings"])["embeddings"] if probe_queries else []
+    probe = list(probe) if probe is not None else []
+    latency_before = probe_search_latency(vectorstore, probe)
+
+    plan = scan_vectorstore(vectorstore, catalog, keep_versions=keep_versions, orphan_roots=orphan_roots)
+    report = {
+        "directory": directory,
+        "dry_run": dry_run,
+        "superseded_chunks": len(plan["superseded"]),
+        "orphaned_documents": len(plan["orphaned"]),
+        "uncatalogued_chunks": len(plan["uncatalogued"]),
+        "dangling_catalog_entries": len(plan["dangling"]),
+        "bytes_before": bytes_before,
+    }
+    logging.info(f"Compaction plan: {report}")
+
+    if not dry_run:
+        # 스캔 중에 시작된 적재가 있으면 정리하지 않고, 그 사이 카탈로그에 기록된 청크는 지우지 않는다.
+        _ensure_no_live_writers(vectorstore_version, check_worker)
+        for doc_id in plan["orphaned"]:
+            remove_from_vectorstore(doc_id=doc_id, vectorstore_version=vectorstore_version)
+
+        recorded = catalog.known_ids(plan["uncatalogued"])
+        chunk_ids = plan["superseded"] + [chunk_id for chunk_id in plan["uncatalogued"] if chunk_id not in recorded]
+        for batch_start in range(0, len(chunk_ids), batch_size):
+            batch = chunk_ids[batch_start:batch_start + batch_size]
+            vectorstore._collection.delete(ids=batch)
+            summary_store._collection.delete(ids=batch)
+            catalog.remove_ids(batch)
+
+        catalog.remove_ids(plan["dangling"])
+
+        if vacuum:
+            vacuum_sqlite(os.path.join(directory, CHROMA_SQLITE_NAME))
+
+    bytes_after = _directory_size(directory)
+    latency_after = probe_search_latency(vectorstore, probe)
+    report.update({
+        "bytes_after": bytes_after,
+        "reclaimed_bytes": bytes_before - bytes_after,
+        "search_latency_before_ms": latency_before,
+        "search_latency_after_ms": latency_after,
+        "seconds": time.perf_counter() - start,
+    })
+    logging.info(f"Compaction finished: reclaimed {report['reclaimed_bytes']} bytes in {report['seconds']:.1f}s")
+    return report
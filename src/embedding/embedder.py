@@ -1,12 +1,24 @@
 # src/embedding/embedder.py
 from langchain_openai import OpenAIEmbeddings
+from src.embedding.query_batcher import QueryEmbeddingBatcher
+from src.config import QUERY_BATCH_ENABLED, EMBEDDING_PROVIDER
 
 
 class CustomOpenAIEmbeddings(OpenAIEmbeddings):
     def embed_documents(self, texts):
         # 커스텀 로직을 추가하거나 기존 메소드를 호출합니다.
         return super().embed_documents(texts)
-    
+
     def embed_query(self, text):
-        # 커스텀 로직을 추가하거나 기존 메소드를 호출합니다.
-        return super().embed_query(text)
\ No newline at end of file
+        # 동시 요청을 모아서 embed_documents 한번으로 처리합니다.
+        if QUERY_BATCH_ENABLED:
+            return QueryEmbeddingBatcher.get_instance(self.embed_documents).embed_query(text)
+        return super().embed_query(text)
+
+
+def get_embedding_function():
+    """EMBEDDING_PROVIDER 설정에 맞는 임베딩 구현을 반환합니다. (openai | fake)"""
+    if EMBEDDING_PROVIDER == "fake":
+        from src.embedding.fake_embedder import FakeEmbeddings
+        return FakeEmbeddings()
+    return CustomOpenAIEmbeddings()
@@ -0,0 +1,41 @@
+# /src/embedding/fake_embedder.py
+import time
+import hashlib
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from src.config import FAKE_EMBEDDING_LATENCY, FAKE_EMBEDDING_DIM
+
+
+class FakeEmbeddings(Embeddings):
+    """
+    외부 API 없이 동작하는 결정적인 임베딩 대체 구현 (EMBEDDING_PROVIDER=fake).
+
+    단어를 해시해서 고정 차원 벡터에 더하는 방식(feature hashing)이라,
+    같은 텍스트는 항상 같은 벡터가 되고 단어가 겹치는 텍스트끼리는 유사도가 높게 나온다.
+    latency로 API 호출(배치 단위) 지연을 흉내낸다.
+    """
+
+    def __init__(self, dim=FAKE_EMBEDDING_DIM, latency=FAKE_EMBEDDING_LATENCY):
+        self.dim = dim
+        self.latency = latency
+
+    def _embed(self, text):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in text.lower().split():
+            digest = hashlib.md5(token.encode("utf-8")).digest()
+            index = int.from_bytes(digest[:4], "little") % self.dim
+            vector[index] += 1.0 if digest[4] & 1 else -1.0
+
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            vector[0] = 1.0
+            norm = 1.0
+        return (vector / norm).tolist()
+
+    def embed_documents(self, texts):
+        if self.latency:
+            time.sleep(self.latency)
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
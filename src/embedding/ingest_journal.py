@@ -0,0 +1,185 @@
+# /src/embedding/ingest_journal.py
+import os
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import logging
+import threading
+from src.config import INGEST_JOURNAL_LEASE
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+
+# 작업 종류
+INGEST = "ingest"
+DELETE = "delete"
+
+# 작업 상태 (완료된 작업은 기록에서 삭제한다)
+INTENT = "intent"        # 작업 시작 전. 저장할 청크 id를 미리 기록한다.
+COMMITTED = "committed"  # 청크가 모두 저장됨. 요약 인덱스 동기화 등 후처리가 남아있을 수 있다.
+
+_owner = None
+_owner_pid = None
+
+
+def current_owner():
+    """
+    이 프로세스의 작업 소유자 id ("호스트-pid-토큰").
+    컨테이너를 재시작하면 pid가 같을 수 있으므로 프로세스마다 임의 토큰을 붙인다.
+    """
+    global _owner, _owner_pid
+    if _owner_pid != os.getpid():
+        _owner = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        _owner_pid = os.getpid()
+    return _owner
+
+
+def _pid_alive(pid):
+    if os.name == "nt":
+        # Windows의 os.kill은 프로세스를 종료시키므로 확인하지 않는다. (lease로만 판단)
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def owner_is_dead(owner, heartbeat, lease=INGEST_JOURNAL_LEASE, now=None):
+    """
+    작업 소유자 프로세스가 종료되었는지 판단합니다.
+    heartbeat가 lease 이상 끊겼거나, 같은 호스트의 프로세스인데 pid가 없으면 종료된 것으로 봅니다.
+    """
+    if owner == current_owner():
+        return False
+    now = time.time() if now is None else now
+    if owner is None or heartbeat is None or now - heartbeat > lease:
+        return True
+    host, pid, _ = owner.rsplit("-", 2)
+    if host == socket.gethostname() and pid.isdigit():
+        return not _pid_alive(int(pid))
+    return False
+
+
+class IngestJournal:
+    """
+    문서 단위 적재/삭제 작업의 write-ahead 기록. 벡터스토어 디렉토리에 카탈로그와 함께 저장된다.
+
+    - 적재: 청크 id를 미리 만들어 intent로 기록 -> 저장 -> committed -> 후처리 -> 기록 삭제
+    - 삭제: intent로 기록 -> 삭제 -> 기록 삭제
+    - 완료된 작업은 바로 지우므로 기록에는 진행 중이던 작업만 남는다.
+      따라서 복구 시간은 전체 문서 수가 아니라 중단된 작업 수에 비례한다.
+    - 작업마다 소유자(호스트-pid)와 heartbeat를 기록한다. 작업이 남아있는 동안 lease/3 간격으로 heartbeat를 갱신하므로,
+      다른 프로세스는 소유자가 종료된 작업만 복구한다. (같은 저장소를 쓰는 다른 프로세스의 진행 중인 작업은 건드리지 않음)
+    """
+
+    def __init__(self, path, lease=INGEST_JOURNAL_LEASE):
+        self.path = path
+        self.lease = lease
+        self._lock = threading.Lock()
+        self._heartbeat_thread = None
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS operations (
+                    op_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    kind TEXT NOT NULL,
+                    doc_id TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    chunk_ids TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    owner TEXT,
+                    heartbeat REAL
+                )
+            """)
+            # 소유자 컬럼이 없던 기록은 소유자가 없는(종료된) 작업으로 본다.
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(operations)")}
+            if "owner" not in columns:
+                self._conn.execute("ALTER TABLE operations ADD COLUMN owner TEXT")
+                self._conn.execute("ALTER TABLE operations ADD COLUMN heartbeat REAL")
+
+    def begin(self, kind, doc_id, chunk_ids=()):
+        """작업 의도를 기록하고 op_id를 반환합니다."""
+        self._start_heartbeat()
+        now = time.time()
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO operations (kind, doc_id, state, chunk_ids, created_at, owner, heartbeat) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (kind, doc_id, INTENT, json.dumps(list(chunk_ids)), now, current_owner(), now),
+            )
+            return cursor.lastrowid
+
+    def commit(self, op_id):
+        """청크 저장이 끝났음을 기록합니다."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE operations SET state = ?, heartbeat = ? WHERE op_id = ?", (COMMITTED, time.time(), op_id)
+            )
+
+    def complete(self, op_id):
+        """작업이 끝났으므로 기록을 삭제합니다."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM operations WHERE op_id = ?", (op_id,))
+
+    def _start_heartbeat(self):
+        if self._heartbeat_thread is not None and self._heartbeat_thread.is_alive():
+            return
+        with self._lock:
+            if self._heartbeat_thread is None or not self._heartbeat_thread.is_alive():
+                self._heartbeat_thread = threading.Thread(target=self._heartbeat_loop, name="ingest-journal", daemon=True)
+                self._heartbeat_thread.start()
+
+    def _heartbeat_loop(self):
+        while True:
+            time.sleep(self.lease / 3)
+            try:
+                with self._lock, self._conn:
+                    self._conn.execute(
+                        "UPDATE operations SET heartbeat = ? WHERE owner = ?", (time.time(), current_owner())
+                    )
+            except Exception as e:
+                logging.error(f"Error updating ingest journal heartbeat: {e}", exc_info=True)
+
+    def pending(self):
+        """
+        완료되지 않은 작업 리스트를 시작 순서대로 반환합니다. (다른 프로세스가 진행 중인 작업 포함)
+
+        Returns:
+            list[dict]: {"op_id", "kind", "doc_id", "state", "chunk_ids", "owner", "heartbeat"}
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT op_id, kind, doc_id, state, chunk_ids, owner, heartbeat FROM operations ORDER BY op_id"
+            ).fetchall()
+        return [
+            {
+                "op_id": op_id, "kind": kind, "doc_id": doc_id, "state": state,
+                "chunk_ids": json.loads(chunk_ids), "owner": owner, "heartbeat": heartbeat,
+            }
+            for op_id, kind, doc_id, state, chunk_ids, owner, heartbeat in rows
+        ]
+
+    def orphaned(self):
+        """
+        소유자 프로세스가 종료된(중단된) 작업만 반환합니다.
+        같은 doc_id를 다른 프로세스가 진행 중이면 그 작업이 끝날 때까지 복구하지 않습니다.
+        """
+        operations = self.pending()
+        now = time.time()
+        dead = [op for op in operations if owner_is_dead(op["owner"], op["heartbeat"], self.lease, now)]
+        dead_ids = {op["op_id"] for op in dead}
+        live_doc_ids = {op["doc_id"] for op in operations if op["op_id"] not in dead_ids}
+        return [op for op in dead if op["doc_id"] not in live_doc_ids]
+
+    def has_live_operations(self):
+        """소유자가 살아있는(진행 중인) 작업이 있는지 여부. 이 프로세스의 작업도 포함합니다."""
+        operations = self.pending()
+        now = time.time()
+        return any(not owner_is_dead(op["owner"], op["heartbeat"], self.lease, now) for op in operations)
@@ -0,0 +1,131 @@
+# /src/embedding/query_batcher.py
+import time
+import queue
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from src.config import QUERY_BATCH_WINDOW_MS, QUERY_BATCH_MAX_SIZE, QUERY_BATCH_TIMEOUT, QUERY_EMBEDDING_CACHE_SIZE
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+
+
+class QueryEmbeddingBatcher:
+    """
+    프로세스 전역 쿼리 임베딩 마이크로 배처.
+
+    여러 세션에서 동시에 들어오는 embed_query 요청을 짧은 시간(window_ms) 동안 모아서
+    embed_documents 한번으로 처리한 뒤, 결과를 각 호출자에게 나눠준다.
+    동시 사용자가 많을수록 임베딩 API 요청 수와 요청당 오버헤드가 줄어든다.
+    최근 쿼리(cache_size개)의 임베딩은 기억해두므로, 같은 쿼리로 다시 요청하면 API를 호출하지 않는다.
+    (시맨틱 캐시 조회 후 검색에서 같은 쿼리를 다시 임베딩하는 경우 등)
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls, embed_documents):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls(embed_documents)
+        return cls._instance
+
+    def __init__(self, embed_documents, window_ms=QUERY_BATCH_WINDOW_MS, max_batch_size=QUERY_BATCH_MAX_SIZE,
+                 cache_size=QUERY_EMBEDDING_CACHE_SIZE):
+        self.embed_documents = embed_documents
+        self.window = window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self.cache_size = cache_size
+        self.request_count = 0
+        self.batch_count = 0
+        self.cache_hits = 0
+
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="query-embedding-batcher", daemon=True)
+        self._worker.start()
+
+    def embed_query(self, text, timeout=QUERY_BATCH_TIMEOUT):
+        """
+        쿼리 임베딩을 요청하고 배치 처리가 끝날 때까지 기다린다.
+
+        Args:
+            text (str): 임베딩할 쿼리.
+            timeout (float, optional): 최대 대기 시간(초). 넘으면 TimeoutError.
+
+        Returns:
+            list[float]: 쿼리 임베딩.
+        """
+        with self._cache_lock:
+            if text in self._cache:
+                self._cache.move_to_end(text)
+                self.cache_hits += 1
+                return self._cache[text]
+
+        future = Future()
+        self._queue.put((text, future))
+        return future.result(timeout=timeout)
+
+    def _remember(self, results):
+        if self.cache_size <= 0:
+            return
+        with self._cache_lock:
+            for text, embedding in results.items():
+                self._cache[text] = embedding
+                self._cache.move_to_end(text)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _collect_batch(self):
+        # 첫 요청이 들어올 때까지 기다린 뒤, window 동안 추가 요청을 모은다.
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.window
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    @staticmethod
+    def _resolve(future, result=None, error=None):
+        """결과를 전달한다. 이미 처리된(타임아웃 후 취소 등) future에서 예외가 나도 워커는 멈추지 않는다."""
+        try:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+        except Exception as e:
+            logging.warning(f"Could not resolve query embedding future: {e}")
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+
+            # 같은 쿼리는 한번만 임베딩한다.
+            unique_texts = list(dict.fromkeys(text for text, _ in batch))
+
+            try:
+                embeddings = self.embed_documents(unique_texts)
+                results = dict(zip(unique_texts, embeddings))
+                self._remember(results)
+            except Exception as e:
+                logging.error(f"Error embedding query batch of {len(unique_texts)}: {e}", exc_info=True)
+                for _, future in batch:
+                    self._resolve(future, error=e)
+            else:
+                for text, future in batch:
+                    if text in results:
+                        self._resolve(future, result=results[text])
+                    else:
+                        self._resolve(future, error=RuntimeError(f"No embedding returned for query: {text!r}"))
+
+            self.request_count += len(batch)
+            self.batch_count += 1
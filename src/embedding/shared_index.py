@@ -0,0 +1,315 @@
+# /src/embedding/shared_index.py
+"""
+여러 질의 프로세스가 함께 사용하는 읽기 전용 검색 인덱스.
+
+- 발행(적재 워커 또는 `python -m src.embedding.shared_index`)이 Chroma 컬렉션을 읽어 세대(generation) 디렉토리를 만들고,
+  CURRENT 파일을 원자적으로 교체해서 새 세대를 알린다.
+- 질의 프로세스는 세대 파일을 메모리 맵(np.load(mmap_mode="r"))으로 연다. 같은 파일의 페이지 캐시를 공유하므로
+  프로세스 수가 늘어도 메모리는 인덱스 하나 크기 정도만 사용하고, 시작할 때 인덱스를 읽어들이는 과정도 없다.
+- 질의 프로세스는 SHARED_INDEX_CHECK_INTERVAL마다 CURRENT를 확인하고 새 세대로 바꾼다. 처리 중인 검색은 이전 세대로 끝난다.
+
+세대 디렉토리:
+    vectors.npy        (N, dim) float32, 정규화된 임베딩. 클러스터 순서로 정렬되어 클러스터별로 연속된 영역
+    centroids.npy      (L, dim) float32, 클러스터 중심 (IVF)
+    list_offsets.npy   (L + 1,) int64, 클러스터 l의 행 범위는 list_offsets[l]:list_offsets[l + 1]
+    records.jsonl      한 줄에 하나씩 {"id", "document", "metadata"}
+    record_spans.npy   (N, 2) int64, vectors의 각 행에 해당하는 records.jsonl의 바이트 범위
+    manifest.json
+"""
+import os
+import json
+import mmap
+import time
+import shutil
+import logging
+import argparse
+import threading
+import numpy as np
+from langchain.schema import Document
+from src.embedding.vectorstore_handler import VectorStoreManager, hydrate_metadatas
+from src.config import (
+        VECTORSTORE_VERSION,
+        SHARED_INDEX_DIR,
+        SHARED_INDEX_NPROBE,
+        SHARED_INDEX_CHECK_INTERVAL,
+        SHARED_INDEX_KEEP_GENERATIONS,
+    )
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+
+GENERATION_PREFIX = "gen-"
+CURRENT_NAME = "CURRENT"
+
+# 컬렉션을 한번에 읽을 레코드 수
+BUILD_PAGE_SIZE = 5000
+
+# 클러스터 중심 학습에 사용할 최대 표본 수와 반복 횟수
+KMEANS_SAMPLE_SIZE = 50000
+KMEANS_ITERATIONS = 10
+
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _train_centroids(vectors, n_lists, seed=0):
+    """표본에 대해 spherical k-means로 클러스터 중심을 학습합니다."""
+    rng = np.random.default_rng(seed)
+    sample_idx = np.sort(rng.choice(len(vectors), size=min(len(vectors), KMEANS_SAMPLE_SIZE), replace=False))
+    sample = np.asarray(vectors[sample_idx])
+    centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)].copy()
+
+    for _ in range(KMEANS_ITERATIONS):
+        assignments = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, sample)
+        counts = np.bincount(assignments, minlength=n_lists)
+        # 비어있는 클러스터는 이전 중심을 유지한다.
+        centroids = np.where(counts[:, None] > 0, _normalize(sums), centroids).astype(np.float32)
+    return centroids
+
+
+def build_generation(collection, path, n_lists=None, page_size=BUILD_PAGE_SIZE):
+    """
+    Chroma 컬렉션으로 세대 디렉토리를 만듭니다. 임베딩은 페이지 단위로 임시 파일에 기록하므로
+    전체 임베딩을 메모리에 올리지 않습니다.
+
+    Returns:
+        dict: manifest
+    """
+    os.makedirs(path, exist_ok=False)
+    start = time.perf_counter()
+    capacity = collection.count()
+
+    raw_path = os.path.join(path, "raw.npy")
+    raw = None
+    spans = np.zeros((capacity, 2), dtype=np.int64)
+    count = 0
+    offset = 0
+    with open(os.path.join(path, "records.jsonl"), "wb") as records_file:
+        while count < capacity:
+            records = collection.get(
+                include=["embeddings", "documents", "metadatas"], limit=min(page_size, capacity - count), offset=count
+            )
+            if not records["ids"]:
+                break
+            embeddings = _normalize(np.asarray(records["embeddings"], dtype=np.float32))
+            if raw is None:
+                raw = np.lib.format.open_memmap(raw_path, mode="w+", dtype=np.float32, shape=(capacity, embeddings.shape[1]))
+            raw[count:count + len(embeddings)] = embeddings
+
+            # 검색 프로세스가 카탈로그를 열지 않도록 문서 속성을 합친 메타데이터를 기록한다.
+            metadatas = hydrate_metadatas(records["metadatas"])
+            for i, (chunk_id, document, metadata) in enumerate(zip(records["ids"], records["documents"], metadatas)):
+                line = json.dumps({"id": chunk_id, "document": document, "metadata": metadata}, ensure_ascii=False).encode("utf-8") + b"\n"
+                records_file.write(line)
+                spans[count + i] = (offset, offset + len(line))
+                offset += len(line)
+            count += len(records["ids"])
+
+    dim = raw.shape[1] if raw is not None else 0
+    n_lists = min(n_lists or max(1, int(np.sqrt(count))), max(count, 1))
+
+    if count:
+        raw = raw[:count]
+        centroids = _train_centroids(raw, n_lists)
+
+        assignments = np.empty(count, dtype=np.int64)
+        for i in range(0, count, page_size):
+            assignments[i:i + page_size] = np.argmax(np.asarray(raw[i:i + page_size]) @ centroids.T, axis=1)
+        order = np.argsort(assignments, kind="stable")
+        list_offsets = np.concatenate([[0], np.cumsum(np.bincount(assignments, minlength=n_lists))]).astype(np.int64)
+
+        # 클러스터 순서로 다시 기록해서 검색 시 클러스터별로 연속된 영역만 읽도록 한다.
+        vectors = np.lib.format.open_memmap(os.path.join(path, "vectors.npy"), mode="w+", dtype=np.float32, shape=(count, dim))
+        for i in range(0, count, page_size):
+            vectors[i:i + page_size] = raw[order[i:i + page_size]]
+        vectors.flush()
+        del vectors
+        np.save(os.path.join(path, "record_spans.npy"), spans[:count][order])
+    else:
+        centroids = np.zeros((0, dim), dtype=np.float32)
+        list_offsets = np.zeros(1, dtype=np.int64)
+        np.save(os.path.join(path, "vectors.npy"), np.zeros((0, dim), dtype=np.float32))
+        np.save(os.path.join(path, "record_spans.npy"), np.zeros((0, 2), dtype=np.int64))
+
+    del raw
+    if os.path.exists(raw_path):
+        os.remove(raw_path)
+    np.save(os.path.join(path, "centroids.npy"), centroids)
+    np.save(os.path.join(path, "list_offsets.npy"), list_offsets)
+
+    manifest = {
+        "generation": os.path.basename(path),
+        "created_at": time.time(),
+        "count": count,
+        "dim": dim,
+        "n_lists": len(centroids),
+        "build_seconds": time.perf_counter() - start,
+    }
+    with open(os.path.join(path, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    return manifest
+
+
+def publish_shared_index(vectorstore_version=VECTORSTORE_VERSION, root=SHARED_INDEX_DIR,
+                         keep_generations=SHARED_INDEX_KEEP_GENERATIONS):
+    """
+    새 세대를 만들고 CURRENT를 교체합니다. 이전 세대는 keep_generations개만 남깁니다.
+    (삭제된 세대 파일도 이미 연 프로세스에서는 매핑이 유지되므로 검색 도중 지워도 안전하다)
+    """
+    vectorstore = VectorStoreManager.get_instance(vectorstore_version=vectorstore_version)
+    os.makedirs(root, exist_ok=True)
+
+    name = f"{GENERATION_PREFIX}{time.time_ns()}"
+    manifest = build_generation(vectorstore._collection, os.path.join(root, name))
+
+    current_path = os.path.join(root, CURRENT_NAME)
+    with open(current_path + ".tmp", "w", encoding="utf-8") as f:
+        f.write(name)
+    os.replace(current_path + ".tmp", current_path)
+
+    generations = sorted(entry for entry in os.listdir(root) if entry.startswith(GENERATION_PREFIX) and entry != name)
+    for old in generations[:max(len(generations) - keep_generations, 0)]:
+        shutil.rmtree(os.path.join(root, old), ignore_errors=True)
+
+    logging.info(
+        f"Published shared index {name} ({manifest['count']} chunks, {manifest['n_lists']} lists) "
+        f"in {manifest['build_seconds']:.1f}s"
+    )
+    return manifest
+
+
+class SharedIndexGeneration:
+    """메모리 맵으로 연 세대 하나. 검색만 지원한다."""
+
+    def __init__(self, path):
+        self.path = path
+        self.name = os.path.basename(path)
+        with open(os.path.join(path, "manifest.json"), "r", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+
+        self.vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r")
+        self.record_spans = np.load(os.path.join(path, "record_spans.npy"), mmap_mode="r")
+        self.centroids = np.load(os.path.join(path, "centroids.npy"))
+        self.list_offsets = np.load(os.path.join(path, "list_offsets.npy"))
+
+        with open(os.path.join(path, "records.jsonl"), "rb") as f:
+            self._records = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b""
+
+    def _record(self, row):
+        start, end = self.record_spans[row]
+        return json.loads(self._records[start:end])
+
+    def search(self, embedding, k, nprobe=SHARED_INDEX_NPROBE, doc_ids=None):
+        """
+        쿼리 임베딩과 가장 가까운 클러스터 nprobe개 안에서 코사인 유사도로 검색합니다.
+
+        Args:
+            doc_ids (set[str], optional): 주어지면 이 문서의 청크만 반환합니다.
+
+        Returns:
+            list[tuple[Document, float]]: (Document, 거리) 리스트. 거리는 1 - 코사인 유사도.
+        """
+        if k <= 0 or not len(self.vectors):
+            return []
+
+        query = _normalize(np.asarray(embedding, dtype=np.float32))
+        nprobe = min(nprobe, len(self.centroids))
+        lists = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+
+        rows = []
+        scores = []
+        for l in lists:
+            start, end = self.list_offsets[l], self.list_offsets[l + 1]
+            if start == end:
+                continue
+            rows.append(np.arange(start, end))
+            scores.append(self.vectors[start:end] @ query)
+        if not rows:
+            return []
+        rows = np.concatenate(rows)
+        scores = np.concatenate(scores)
+
+        # 문서 필터가 있으면 여유있게 후보를 뽑아서 거른다.
+        fetch = len(scores) if doc_ids else min(k, len(scores))
+        top = np.argpartition(-scores, fetch - 1)[:fetch]
+        top = top[np.argsort(-scores[top])]
+
+        hits = []
+        for i in top:
+            record = self._record(rows[i])
+            metadata = record["metadata"] or {}
+            if doc_ids and metadata.get("doc_id") not in doc_ids:
+                continue
+            hits.append((Document(page_content=record["document"], metadata=metadata), max(float(1.0 - scores[i]), 0.0)))
+            if len(hits) >= k:
+                break
+        return hits
+
+
+class SharedIndex:
+    """
+    현재 세대를 열어두고, CURRENT가 바뀌면 새 세대로 교체하는 읽기 전용 인덱스. 프로세스당 하나.
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, root=SHARED_INDEX_DIR, check_interval=SHARED_INDEX_CHECK_INTERVAL):
+        self.root = root
+        self.check_interval = check_interval
+        self._generation = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    def _read_current(self):
+        try:
+            with open(os.path.join(self.root, CURRENT_NAME), "r", encoding="utf-8") as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def generation(self):
+        """현재 세대를 반환합니다. 발행된 세대가 없으면 None."""
+        if time.monotonic() - self._last_check >= self.check_interval:
+            with self._lock:
+                if time.monotonic() - self._last_check >= self.check_interval:
+                    self._last_check = time.monotonic()
+                    name = self._read_current()
+                    if name and (self._generation is None or self._generation.name != name):
+                        try:
+                            # 참조만 바꾸므로 검색 중인 스레드는 이전 세대로 끝난다.
+                            self._generation = SharedIndexGeneration(os.path.join(self.root, name))
+                            logging.info(f"Attached shared index generation {name} ({self._generation.manifest['count']} chunks)")
+                        except (OSError, ValueError) as e:
+                            logging.error(f"Could not attach shared index generation {name}: {e}", exc_info=True)
+        return self._generation
+
+    def search(self, embedding, k, nprobe=SHARED_INDEX_NPROBE, doc_ids=None):
+        generation = self.generation()
+        if generation is None:
+            logging.warning(f"No shared index has been published in {self.root}.")
+            return []
+        return generation.search(embedding, k, nprobe=nprobe, doc_ids=doc_ids)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Publish a new shared index generation from the vectorstore.")
+    parser.add_argument("--root", default=SHARED_INDEX_DIR, help="세대를 저장할 디렉토리")
+    parser.add_argument("--keep", type=int, default=SHARED_INDEX_KEEP_GENERATIONS, help="남겨둘 이전 세대 수")
+    args = parser.parse_args(argv)
+    publish_shared_index(root=args.root, keep_generations=args.keep)
+
+
+if __name__ == "__main__":
+    main()
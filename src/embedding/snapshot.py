@@ -0,0 +1,305 @@
+# /src/embedding/snapshot.py
+import os
+import gzip
+import json
+import time
+import uuid
+import hashlib
+import logging
+import numpy as np
+from src.embedding.vectorstore_handler import (
+        VectorStoreManager,
+        remove_from_vectorstore,
+        sync_summary_index,
+        hydrate_metadatas,
+        upsert_batch_size,
+        recover_from_journal,
+    )
+from src.ingest.job_queue import JobQueue
+from src.preprocessing.metadata_manager_v1 import compact_metadata
+from src.config import VECTORSTORE_VERSION, EMBEDDING_PROVIDER, SNAPSHOT_PART_SIZE
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+
+SNAPSHOT_FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+
+# 마지막으로 가져온 스냅샷 id (카탈로그 meta 테이블에 저장)
+IMPORTED_SNAPSHOT_KEY = "imported_snapshot_id"
+
+# 가져오기 시 한번에 upsert할 청크 수
+IMPORT_BATCH_SIZE = 5000
+
+# 내보내는 도중 바뀐 문서를 다시 고정해서 가져오는 최대 횟수
+EXPORT_REPIN_ATTEMPTS = 3
+
+
+def _fingerprint(chunk_ids):
+    """문서의 청크 id 목록 해시. 청크 id에 내용 해시가 포함되므로 내용이 바뀌면 값이 바뀐다."""
+    return hashlib.md5("\n".join(sorted(chunk_ids)).encode("utf-8")).hexdigest()
+
+
+def load_manifest(snapshot_dir):
+    with open(os.path.join(snapshot_dir, MANIFEST_NAME), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported snapshot format: {manifest.get('format_version')}")
+    return manifest
+
+
+def _write_part(output_dir, index, records):
+    """
+    청크 묶음 하나를 저장합니다.
+    임베딩은 float32 배열(npz, 압축), id/본문/메타데이터는 한 줄에 하나씩 JSONL(gzip)로 저장합니다.
+    """
+    name = f"part-{index:05d}"
+    embeddings = np.asarray(records["embeddings"], dtype=np.float32)
+    np.savez_compressed(os.path.join(output_dir, f"{name}.npz"), embeddings=embeddings)
+    with gzip.open(os.path.join(output_dir, f"{name}.jsonl.gz"), "wt", encoding="utf-8") as f:
+        for chunk_id, document, metadata in zip(records["ids"], records["documents"], records["metadatas"]):
+            f.write(json.dumps({"id": chunk_id, "document": document, "metadata": metadata}, ensure_ascii=False) + "\n")
+    return {"name": name, "count": len(records["ids"]), "dim": int(embeddings.shape[1]) if embeddings.size else 0}
+
+
+def _read_part(snapshot_dir, part):
+    embeddings = np.load(os.path.join(snapshot_dir, f"{part['name']}.npz"))["embeddings"]
+    with gzip.open(os.path.join(snapshot_dir, f"{part['name']}.jsonl.gz"), "rt", encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f]
+    if len(rows) != len(embeddings):
+        raise ValueError(f"Snapshot part {part['name']} is corrupted ({len(rows)} rows, {len(embeddings)} embeddings).")
+    return rows, embeddings
+
+
+def _document_key(metadata):
+    return metadata["doc_id"], str(metadata.get("version", "1"))
+
+
+def _register_for_import(catalog, rows, doc_keys):
+    """
+    rows의 문서(버전) 중 doc_keys에 없는 것만 카탈로그에 한 트랜잭션으로 등록하고 doc_keys를 채웁니다.
+    같은 doc_id의 버전이 여러개면 is_latest인 버전을 마지막에 등록해서 최신 버전으로 남깁니다.
+    """
+    pending = {}
+    for row in rows:
+        metadata = row["metadata"]
+        if metadata and metadata.get("doc_id") and _document_key(metadata) not in doc_keys:
+            pending.setdefault(_document_key(metadata), metadata)
+    if not pending:
+        return
+    ordered = sorted(pending.values(), key=lambda metadata: bool(metadata.get("is_latest", True)))
+    doc_keys.update(catalog.register_documents([
+        (metadata["doc_id"], metadata.get("version", "1"), metadata.get("path"), metadata.get("file_name"),
+         metadata.get("last_modified"))
+        for metadata in ordered
+    ]))
+
+
+def _compact_for_import(metadata, doc_keys):
+    """스냅샷의 메타데이터(문서 속성 포함)를 이 벡터스토어의 doc_key로 저장할 형태로 바꿉니다."""
+    if not metadata or not metadata.get("doc_id"):
+        return metadata or None
+    return compact_metadata(metadata, doc_keys[_document_key(metadata)])
+
+
+def _ensure_no_live_writers(vectorstore_version):
+    """적재 워커가 실행 중이거나 저널에 진행 중인 적재/삭제 작업이 있으면 RuntimeError를 발생시킵니다."""
+    queue = JobQueue()
+    try:
+        worker_running = queue.has_live_worker()
+    finally:
+        queue.close()
+    if worker_running:
+        raise RuntimeError("An ingest worker is running. Stop the worker before exporting a snapshot.")
+    if VectorStoreManager.get_journal(vectorstore_version=vectorstore_version).has_live_operations():
+        raise RuntimeError("Ingest or delete operations are in progress. Retry the export after they finish.")
+
+
+def _group_by_document(pinned, part_size):
+    """고정한 문서를 part_size개 안팎의 청크 묶음으로 나눕니다. 한 문서의 청크는 같은 묶음에 넣는다."""
+    group, size = {}, 0
+    for doc_id, chunk_ids in pinned.items():
+        group[doc_id] = chunk_ids
+        size += len(chunk_ids)
+        if size >= part_size:
+            yield group
+            group, size = {}, 0
+    if group:
+        yield group
+
+
+def _fetch_documents(vectorstore, catalog, group, vectorstore_version):
+    """
+    묶음의 청크를 가져옵니다. 고정한 청크 중 가져오지 못한 것이 있는 문서(내보내는 도중 교체/삭제됨)는
+    진행 중인 쓰기가 없는지 확인한 뒤 카탈로그에서 다시 고정해서 가져옵니다.
+
+    Returns:
+        (dict, dict): 가져온 청크, 문서별 고정한 청크 id (삭제된 문서는 빈 리스트)
+    """
+    group = dict(group)
+    for _ in range(EXPORT_REPIN_ATTEMPTS):
+        ids = [chunk_id for chunk_ids in group.values() for chunk_id in chunk_ids]
+        records = vectorstore._collection.get(ids=ids, include=["embeddings", "documents", "metadatas"])
+        fetched = set(records["ids"])
+        changed = [doc_id for doc_id, chunk_ids in group.items() if not fetched.issuperset(chunk_ids)]
+        if not changed:
+            return records, group
+        logging.info(f"{len(changed)} documents changed during export. Re-pinning them.")
+        _ensure_no_live_writers(vectorstore_version)
+        group.update({doc_id: catalog.ids_for(doc_id) for doc_id in changed})
+    raise RuntimeError("Documents kept changing during export. Retry the export when ingestion is idle.")
+
+
+def export_snapshot(output_dir, base_dir=None, vectorstore_version=VECTORSTORE_VERSION, part_size=SNAPSHOT_PART_SIZE):
+    """
+    벡터스토어의 청크(id, 임베딩, 본문, 메타데이터)를 스냅샷 디렉토리로 내보냅니다.
+
+    - 적재 워커가 실행 중이거나 진행 중인 적재/삭제 작업이 있으면 내보내지 않는다. (RuntimeError)
+    - 내보낼 청크 목록은 시작 시점의 카탈로그로 고정한다. 내보내는 도중 교체된 문서는 고정한 청크 중 일부가
+      사라지므로, 가져온 청크를 문서별로 확인해서 그 문서만 다시 고정해서 가져온다. (문서의 일부만 포함되지 않음)
+      내보내는 도중 삭제된 문서는 삭제 기록(tombstone)으로 남긴다.
+    - 한 문서의 청크는 같은 파일에 저장한다.
+    - base_dir이 주어지면 기준 스냅샷과 비교해서 추가/변경된 문서만 내보내고, 사라진 문서는 삭제 기록으로 남긴다.
+    - manifest.json은 마지막에 저장하므로, manifest가 있는 디렉토리만 완성된 스냅샷이다.
+    - doc_key는 벡터스토어마다 다르므로 메타데이터는 문서 속성을 합친 형태로 저장한다.
+
+    Returns:
+        dict: manifest
+    """
+    if os.path.exists(os.path.join(output_dir, MANIFEST_NAME)):
+        raise FileExistsError(f"Snapshot already exists: {output_dir}")
+    os.makedirs(output_dir, exist_ok=True)
+
+    vectorstore = VectorStoreManager.get_instance(vectorstore_version=vectorstore_version)
+    catalog = VectorStoreManager.get_catalog(vectorstore_version=vectorstore_version)
+    recover_from_journal(vectorstore_version)
+    _ensure_no_live_writers(vectorstore_version)
+    base = load_manifest(base_dir) if base_dir else None
+    base_documents = base["documents"] if base else {}
+
+    start = time.perf_counter()
+    documents = {}
+    pinned = {}  # 내보낼 문서 -> 고정한 청크 id
+    for doc_id, chunk_ids in catalog.iter_documents():
+        fingerprint = _fingerprint(chunk_ids)
+        documents[doc_id] = fingerprint
+        if base_documents.get(doc_id) != fingerprint:
+            pinned[doc_id] = chunk_ids
+
+    parts = []
+    deleted_during_export = []
+    for group in _group_by_document(pinned, part_size):
+        records, group = _fetch_documents(vectorstore, catalog, group, vectorstore_version)
+        for doc_id, chunk_ids in group.items():
+            if chunk_ids:
+                documents[doc_id] = _fingerprint(chunk_ids)
+            else:
+                # 내보내는 도중 삭제된 문서는 가져올 때 지워지도록 삭제 기록으로 남긴다.
+                documents.pop(doc_id, None)
+                deleted_during_export.append(doc_id)
+        if not records["ids"]:
+            continue
+        records["metadatas"] = hydrate_metadatas(records["metadatas"], vectorstore_version)
+        parts.append(_write_part(output_dir, len(parts), records))
+
+    tombstones = sorted(set(doc_id for doc_id in base_documents if doc_id not in documents) | set(deleted_during_export))
+
+    manifest = {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "snapshot_id": uuid.uuid4().hex,
+        "base_id": base["snapshot_id"] if base else None,
+        "created_at": time.time(),
+        "vectorstore_version": vectorstore_version,
+        "embedding_provider": EMBEDDING_PROVIDER,
+        "dim": next((part["dim"] for part in parts if part["dim"]), base["dim"] if base else 0),
+        "chunks": sum(part["count"] for part in parts),
+        "parts": parts,
+        "tombstones": tombstones,
+        "documents": documents,
+    }
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    with open(manifest_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(manifest_path + ".tmp", manifest_path)
+
+    logging.info(
+        f"Exported snapshot {manifest['snapshot_id']} ({manifest['chunks']} chunks, {len(tombstones)} tombstones, "
+        f"base={manifest['base_id']}) to {output_dir} in {time.perf_counter() - start:.1f}s"
+    )
+    return manifest
+
+
+def import_snapshot(snapshot_dir, vectorstore_version=VECTORSTORE_VERSION):
+    """
+    스냅샷을 재임베딩 없이 벡터스토어로 가져옵니다.
+
+    - 증분 스냅샷은 기준 스냅샷을 가져온 벡터스토어에만 적용할 수 있다. (전체 -> 증분 순서로 가져온다)
+    - 스냅샷에 포함된 문서는 기존 청크를 지운 뒤 upsert하므로, 도중에 중단되어도 같은 스냅샷을 다시 가져오면 된다.
+    - 문서 속성은 이 벡터스토어의 카탈로그에 등록하고 청크에는 doc_key만 저장한다.
+
+    Returns:
+        dict: manifest
+    """
+    manifest = load_manifest(snapshot_dir)
+    if manifest["embedding_provider"] != EMBEDDING_PROVIDER:
+        raise ValueError(
+            f"Snapshot was built with '{manifest['embedding_provider']}' embeddings "
+            f"but EMBEDDING_PROVIDER is '{EMBEDDING_PROVIDER}'."
+        )
+
+    vectorstore = VectorStoreManager.get_instance(vectorstore_version=vectorstore_version)
+    catalog = VectorStoreManager.get_catalog(vectorstore_version=vectorstore_version)
+    recover_from_journal(vectorstore_version)
+
+    imported = catalog.get_meta(IMPORTED_SNAPSHOT_KEY)
+    if imported == manifest["snapshot_id"]:
+        logging.info(f"Snapshot {manifest['snapshot_id']} is already imported.")
+        return manifest
+    if manifest["base_id"] and manifest["base_id"] != imported:
+        raise ValueError(
+            f"Snapshot {manifest['snapshot_id']} is incremental on {manifest['base_id']}, "
+            f"but the last imported snapshot is {imported}."
+        )
+
+    start = time.perf_counter()
+    for doc_id in manifest["tombstones"]:
+        remove_from_vectorstore(doc_id=doc_id, vectorstore_version=vectorstore_version)
+
+    batch_size = min(IMPORT_BATCH_SIZE, upsert_batch_size(vectorstore))
+    cleared = set()
+    # 여러 파일에 나뉜 문서도 한번만 등록한다.
+    doc_keys = {}  # (doc_id, version) -> doc_key
+    for part in manifest["parts"]:
+        rows, embeddings = _read_part(snapshot_dir, part)
+
+        # 변경된 문서는 이전 청크를 먼저 지운다. (문서가 여러 파일에 나뉘어 있어도 한번만)
+        for doc_id in {row["metadata"].get("doc_id") for row in rows} - cleared:
+            if doc_id and catalog.has_document(doc_id):
+                remove_from_vectorstore(doc_id=doc_id, vectorstore_version=vectorstore_version)
+            cleared.add(doc_id)
+
+        for batch_start in range(0, len(rows), batch_size):
+            batch = rows[batch_start:batch_start + batch_size]
+            _register_for_import(catalog, batch, doc_keys)
+            vectorstore._collection.upsert(
+                ids=[row["id"] for row in batch],
+                embeddings=embeddings[batch_start:batch_start + len(batch)].tolist(),
+                documents=[row["document"] for row in batch],
+                metadatas=[_compact_for_import(row["metadata"], doc_keys) for row in batch],
+            )
+
+            ids_by_doc_id = {}
+            for row in batch:
+                if row["metadata"].get("doc_id"):
+                    ids_by_doc_id.setdefault(row["metadata"]["doc_id"], []).append(row["id"])
+            catalog.add_many(ids_by_doc_id)
+
+            summary_ids = [row["id"] for row in batch if row["metadata"].get("content_role") == "summary"]
+            if summary_ids:
+                sync_summary_index(summary_ids, vectorstore_version=vectorstore_version)
+
+    catalog.set_meta(IMPORTED_SNAPSHOT_KEY, manifest["snapshot_id"])
+    logging.info(
+        f"Imported snapshot {manifest['snapshot_id']} ({manifest['chunks']} chunks, "
+        f"{len(manifest['tombstones'])} tombstones) in {time.perf_counter() - start:.1f}s"
+    )
+    return manifest
@@ -1,29 +1,124 @@
 # src/embedding/vectorstore_handler.py
 import os
+import uuid
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from langchain_chroma import Chroma
 from langchain.schema import Document
 from src.embedding.embedder import (
-        CustomOpenAIEmbeddings, 
+        get_embedding_function,
         # CustomGoogleEmbeddings,
     )
 from .vectorestore_dict import get_vectorstore_dir
+from src.embedding.ingest_journal import IngestJournal, INGEST, DELETE, INTENT
+from src.embedding.chunk_catalog import ChunkCatalog, LEGACY_METADATA_KEY
+from src.metrics import span
 from src.preprocessing.metadata_manager import generate_doc_id  # doc_id 생성 함수
-from src.config import VECTORSTORE_VERSION
+from src.preprocessing.metadata_manager_v1 import generate_chunk_id, compact_metadata, expand_metadata
+from src.config import (
+        VECTORSTORE_VERSION,
+        SUMMARY_COLLECTION_NAME,
+        CHUNK_CATALOG_NAME,
+        INGEST_JOURNAL_NAME,
+        SEARCH_MAX_WORKERS,
+    )
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
 
+# 검색 요청을 병렬로 처리하기 위한 공용 스레드풀
+_search_executor = ThreadPoolExecutor(max_workers=SEARCH_MAX_WORKERS, thread_name_prefix="vectorsearch")
+
 class VectorStoreManager:
     _instance = None
     _vectorstore = None
+    _summary_vectorstore = None
+    _catalog = None
+    _journal = None
+    _directory = None
+    _embeddings = None
     
     @classmethod
     def get_instance(cls, directory=None, vectorstore_version=VECTORSTORE_VERSION):
         if cls._instance is None:
             cls._instance = cls()
-            cls._vectorstore = cls._create_vectorstore(directory, vectorstore_version)
+            cls._directory = directory or get_vectorstore_dir(vectorstore_version)
+            cls._vectorstore = cls._create_vectorstore(cls._directory, vectorstore_version)
         return cls._vectorstore
     
+    @classmethod
+    def get_summary_instance(cls, directory=None, vectorstore_version=VECTORSTORE_VERSION):
+        """
+        문서별 요약(content_role="summary")만 모아둔 작은 컬렉션을 반환합니다.
+        계층 검색의 1단계에서 사용하며, 청크 컬렉션과 같은 디렉토리에 저장됩니다.
+        """
+        if cls._summary_vectorstore is None:
+            vectorstore = cls.get_instance(directory, vectorstore_version)
+            # 청크 컬렉션과 같은 디렉토리를 사용한다. (벤치마크 등에서 별도 디렉토리를 지정한 경우 포함)
+            directory = cls._directory
+                
+            cls._summary_vectorstore = Chroma(
+                collection_name=SUMMARY_COLLECTION_NAME,
+                persist_directory=directory,
+                embedding_function=vectorstore.embeddings
+            )
+            
+            # 요약 컬렉션이 비어있다면 기존 청크 컬렉션의 요약 문서로 채운다. (재임베딩 없음)
+            if cls._summary_vectorstore._collection.count() == 0:
+                existing = vectorstore._collection.get(where={"content_role": "summary"}, include=[])
+                if existing["ids"]:
+                    sync_summary_index(existing["ids"], vectorstore_version=vectorstore_version)
+                    logging.info(f"Summary index backfilled with {len(existing['ids'])} documents.")
+                    
+        return cls._summary_vectorstore
+    
+    @classmethod
+    def get_catalog(cls, directory=None, vectorstore_version=VECTORSTORE_VERSION):
+        """
+        doc_id -> 청크 id 카탈로그를 반환합니다. 벡터스토어 디렉토리에 저장됩니다.
+        처음 열 때 카탈로그 이전에 저장된 청크를 한번 백필합니다.
+        """
+        if cls._catalog is None:
+            # 이미 백필된 카탈로그는 벡터스토어를 열지 않고 사용한다. (공유 인덱스만 쓰는 질의 프로세스)
+            catalog_dir = cls._directory or directory or get_vectorstore_dir(vectorstore_version)
+            catalog = ChunkCatalog(os.path.join(catalog_dir, CHUNK_CATALOG_NAME))
+            if not catalog.is_backfilled():
+                vectorstore = cls.get_instance(catalog_dir, vectorstore_version)
+                catalog.backfill(vectorstore._collection)
+            cls._catalog = catalog
+        return cls._catalog
+    
+    @classmethod
+    def get_journal(cls, directory=None, vectorstore_version=VECTORSTORE_VERSION):
+        """적재/삭제 write-ahead 기록을 반환합니다. 카탈로그와 같은 벡터스토어 디렉토리에 저장됩니다."""
+        if cls._journal is None:
+            journal_dir = cls._directory or directory or get_vectorstore_dir(vectorstore_version)
+            cls._journal = IngestJournal(os.path.join(journal_dir, INGEST_JOURNAL_NAME))
+        return cls._journal
+    
+    @classmethod
+    def get_embeddings(cls, vectorstore_version=VECTORSTORE_VERSION):
+        """
+        질의 임베딩에 사용하는 임베딩 구현을 반환합니다.
+        벡터스토어가 열려 있으면 같은 구현을 쓰고, 아니면 벡터스토어(Chroma)를 열지 않고 만듭니다.
+        """
+        if cls._vectorstore is not None:
+            return cls._vectorstore.embeddings
+        if cls._embeddings is None:
+            cls._embeddings = get_embedding_function()
+        return cls._embeddings
+    
+    @classmethod
+    def export_snapshot(cls, output_dir, base_dir=None, vectorstore_version=VECTORSTORE_VERSION):
+        """벡터스토어 스냅샷을 내보냅니다. base_dir이 주어지면 증분 스냅샷. (src.embedding.snapshot 참고)"""
+        from src.embedding.snapshot import export_snapshot
+        return export_snapshot(output_dir, base_dir=base_dir, vectorstore_version=vectorstore_version)
+    
+    @classmethod
+    def import_snapshot(cls, snapshot_dir, vectorstore_version=VECTORSTORE_VERSION):
+        """스냅샷을 재임베딩 없이 가져옵니다. (src.embedding.snapshot 참고)"""
+        from src.embedding.snapshot import import_snapshot
+        return import_snapshot(snapshot_dir, vectorstore_version=vectorstore_version)
+    
     @staticmethod
     def _create_vectorstore(directory=None, vectorstore_version=VECTORSTORE_VERSION):
         if not directory:
@@ -33,13 +128,13 @@ class VectorStoreManager:
             os.makedirs(directory)
             logging.info(f"Directory created at: {directory}")
             
-        embedding_function = CustomOpenAIEmbeddings()
+        embedding_function = get_embedding_function()
         vectorstore = Chroma(
             persist_directory=directory,
             embedding_function=embedding_function
         )
         
-        if len(vectorstore.get()["ids"]) == 0:
+        if vectorstore._collection.count() == 0:
             logging.info(f"VectorStore initialized at: {directory}")
         else:
             logging.info(f"VectorStore loaded with existing data at: {directory}")
@@ -54,12 +149,13 @@ def exists_in_vectorstore(doc_id, content_hash, vectorstore_version=VECTORSTORE_
     vectorstore = VectorStoreManager.get_instance(vectorstore_version=vectorstore_version)
     
     try:
-        results = vectorstore._collection.get(where={
-            "$and": [
-                {"doc_id": doc_id},
-                {"content_hash": content_hash}
-            ]
-        })
+        with span("exists_in_vectorstore"):
+            results = vectorstore._collection.get(where={
+                "$and": [
+                    document_filter([doc_id], vectorstore_version),
+                    {"content_hash": content_hash}
+                ]
+            }, include=["documents"])
         
         # print(results)
         if results and results.get('documents'):
@@ -70,15 +166,46 @@ def exists_in_vectorstore(doc_id, content_hash, vectorstore_version=VECTORSTORE_
         logging.error(f"Error checking existence in vectorstore for doc_id={doc_id}, content_hash={content_hash}: {e}", exc_info=True)
         return False
 
-def save_to_vectorstore(chunks, metadata_list, vectorstore_version=VECTORSTORE_VERSION):
+def document_exists(doc_id, vectorstore_version=VECTORSTORE_VERSION):
     """
-    텍스트 청크와 메타데이터를 받아 벡터스토어에 저장하기 전에
-    doc_id와 content_hash 기반으로 중복 여부를 확인합니다.
+    특정 doc_id의 문서가 벡터스토어에 하나라도 저장되어 있는지 확인합니다.
+    파싱 전에 이미 인덱싱된 파일인지 확인할 때 사용합니다. (카탈로그 조회, 벡터스토어 메타데이터 조회 없음)
+    적재가 끝나지 못한 문서(일부 청크만 저장됨)는 없는 것으로 보고 다시 적재하게 합니다.
+    """
+    try:
+        catalog = VectorStoreManager.get_catalog(vectorstore_version=vectorstore_version)
+        return catalog.has_document(doc_id) and not catalog.has_unfinished_ingest(doc_id)
+    except Exception as e:
+        logging.error(f"Error checking document in vectorstore for doc_id={doc_id}: {e}", exc_info=True)
+        return False
+
+def save_to_vectorstore(chunks, metadata_list, vectorstore_version=VECTORSTORE_VERSION, generation=None, first_position=0):
+    """
+    텍스트 청크와 메타데이터를 벡터스토어에 저장합니다.
+
+    청크 id는 doc_id + content_hash + 문서 내 순서로 만들어지므로, 이미 저장된 청크는
+    id 리스트 한번의 조회로 걸러지고 같은 문서를 다시 적재해도 아무것도 저장하지 않습니다.
+    
+    문서 단위 속성(경로, 파일명, 버전 등)은 카탈로그의 documents 테이블에 한번만 저장하고,
+    청크 메타데이터에는 doc_key와 청크 고유 속성만 저장합니다. (검색 결과는 hydrate_metadatas로 되돌림)
+    
+    저장에 실패하면 로그를 남기고 예외를 그대로 발생시킵니다. (호출한 쪽에서 작업을 실패로 처리하고 다시 시도)
+
+    Args:
+        generation (int, optional): 문서 전체를 적재할 때의 적재 번호(ChunkCatalog.next_generation).
+            이미 저장되어 있던 청크를 포함해서 입력 청크 모두에 기록합니다. 일부 청크만 저장할 때는 넘기지 않습니다.
+        first_position (int): 입력의 첫 청크의 문서 내 순서. 문서를 여러번에 나눠 저장할 때 청크 id가 겹치지 않도록 넘깁니다.
+
+    Returns:
+        dict: doc_id -> 입력 청크의 id 리스트. (이미 저장되어 있던 청크 포함)
     """
     
     vectorstore = VectorStoreManager.get_instance(vectorstore_version=vectorstore_version)
-    docs_to_add = []
+    catalog = VectorStoreManager.get_catalog(vectorstore_version=vectorstore_version)
     
+    # 문서(doc_id) 단위로 나누고 청크 id를 만든다.
+    docs_by_doc_id = {}
+    doc_keys = {}
     for chunk, metadata in zip(chunks, metadata_list):
         doc_id = metadata.get("doc_id")
         content_hash = metadata.get("content_hash")
@@ -86,25 +213,104 @@ def save_to_vectorstore(chunks, metadata_list, vectorstore_version=VECTORSTORE_V
         if not doc_id or not content_hash:
             logging.warning("Metadata is missing 'doc_id' or 'content_hash'. Cannot reliably check duplicates.")
             # doc_id나 content_hash가 없다면 중복 확인 없이 추가
-            docs_to_add.append(Document(page_content=chunk, metadata=metadata))
-            continue
-
-        # 중복 문서 확인
-        if exists_in_vectorstore(doc_id, content_hash, vectorstore_version=vectorstore_version):
-            logging.info(f"Document with doc_id={doc_id}, content_hash={content_hash} already exists. Skipping.")
+            chunk_id = str(uuid.uuid4())
+        else:
+            chunk_id = generate_chunk_id(doc_id, content_hash, first_position + len(docs_by_doc_id.get(doc_id, [])))
+        if doc_id:
+            if doc_id not in doc_keys:
+                doc_keys[doc_id] = catalog.register_document(
+                    doc_id,
+                    metadata.get("version", "1"),
+                    path=metadata.get("path"),
+                    file_name=metadata.get("file_name"),
+                    last_modified=metadata.get("last_modified"),
+                )
+            metadata = compact_metadata(metadata, doc_keys[doc_id])
+        docs_by_doc_id.setdefault(doc_id, []).append((chunk_id, Document(page_content=chunk, metadata=metadata)))
+    
+    # 이미 저장된 청크는 한번에 조회해서 제외한다.
+    all_ids = [chunk_id for docs in docs_by_doc_id.values() for chunk_id, _ in docs]
+    saved_ids = {doc_id: [chunk_id for chunk_id, _ in docs] for doc_id, docs in docs_by_doc_id.items()}
+    if not all_ids:
+        logging.info("No documents were added to vectorstore (empty input).")
+        return saved_ids
+    with span("exists_in_vectorstore", chunks=len(all_ids)):
+        existing_ids = set(vectorstore._collection.get(ids=all_ids, include=[])["ids"])
+    
+    # 이미 저장된 청크도 이번 적재의 청크이므로 적재 번호를 기록한다. (정리에서 이전 적재의 청크로 보지 않도록)
+    if generation is not None:
+        rewritten = {
+            doc_id: [chunk_id for chunk_id, _ in docs if chunk_id in existing_ids]
+            for doc_id, docs in docs_by_doc_id.items() if doc_id
+        }
+        catalog.add_many({doc_id: ids for doc_id, ids in rewritten.items() if ids}, generation=generation)
+    
+    added = False
+    for doc_id, docs in docs_by_doc_id.items():
+        new_docs = [(chunk_id, doc) for chunk_id, doc in docs if chunk_id not in existing_ids]
+        if len(new_docs) < len(docs):
+            logging.info(f"{len(docs) - len(new_docs)} chunks of doc_id={doc_id} already exist. Skipping.")
+        if not new_docs:
             continue
         
-        # 중복이 아니면 추가
-        docs_to_add.append(Document(page_content=chunk, metadata=metadata))
-
-    if docs_to_add:
+        # 문서(doc_id) 단위로 저널에 기록하면서 저장한다.
         try:
-            vectorstore.add_documents(docs_to_add)
-            logging.info(f"Added {len(docs_to_add)} documents to vectorstore.")
+            _add_document_chunks(
+                vectorstore,
+                doc_id,
+                [chunk_id for chunk_id, _ in new_docs],
+                [doc for _, doc in new_docs],
+                vectorstore_version,
+                generation,
+            )
+            added = True
         except Exception as e:
-            logging.error(f"Error adding documents to vectorstore: {e}", exc_info=True)
-    else:
+            logging.error(f"Error adding documents to vectorstore for doc_id={doc_id}: {e}", exc_info=True)
+            raise
+    
+    if not added:
         logging.info("No documents were added to vectorstore (all duplicates or empty input).")
+    return saved_ids
+
+def upsert_batch_size(vectorstore):
+    """Chroma가 upsert 한번에 받는 최대 레코드 수. (넘으면 저장이 거부된다)"""
+    return vectorstore._client.get_max_batch_size()
+
+def _add_document_chunks(vectorstore, doc_id, ids, docs, vectorstore_version=VECTORSTORE_VERSION, generation=None):
+    """
+    한 문서의 새 청크를 저장합니다.
+    저장할 청크 id를 저널에 먼저 기록하므로, 도중에 종료되어도 저장된 청크를 찾아서 되돌릴 수 있습니다.
+    (이미 저장되어 있던 청크는 ids에 포함되지 않으므로 되돌릴 때 함께 지워지지 않습니다)
+    """
+    journal = VectorStoreManager.get_journal(vectorstore_version=vectorstore_version)
+    catalog = VectorStoreManager.get_catalog(vectorstore_version=vectorstore_version)
+    op_id = journal.begin(INGEST, doc_id, ids) if doc_id else None
+    
+    with span(
+        "add_documents",
+        chunks=len(docs),
+        chars=sum(len(doc.page_content) for doc in docs),
+    ):
+        # langchain_chroma는 ids가 주어지면 upsert로 저장하므로 같은 id를 다시 저장해도 중복되지 않는다.
+        # 한번의 upsert는 Chroma의 최대 배치 크기를 넘을 수 없으므로 나눠서 저장한다. (행이 많은 CSV 등)
+        batch_size = upsert_batch_size(vectorstore)
+        for start in range(0, len(docs), batch_size):
+            vectorstore.add_documents(docs[start:start + batch_size], ids=ids[start:start + batch_size])
+    logging.info(f"Added {len(docs)} documents to vectorstore.")
+    
+    if op_id:
+        catalog.add(doc_id, ids, generation=generation)
+        journal.commit(op_id)
+    
+    summary_ids = [
+        chunk_id for chunk_id, doc in zip(ids, docs)
+        if doc.metadata.get("content_role") == "summary"
+    ]
+    if summary_ids:
+        sync_summary_index(summary_ids, vectorstore_version=vectorstore_version)
+    
+    if op_id:
+        journal.complete(op_id)
 
 def remove_from_vectorstore(file_path=None, doc_id=None, remove_all_versions=True, vectorstore_version=VECTORSTORE_VERSION):
     """
@@ -120,17 +326,95 @@ def remove_from_vectorstore(file_path=None, doc_id=None, remove_all_versions=Tru
     print("삭제하려는 문서의 doc_id:", doc_id)
     
     vectorstore = VectorStoreManager.get_instance(vectorstore_version=vectorstore_version)
+    journal = VectorStoreManager.get_journal(vectorstore_version=vectorstore_version)
     
     try:
         # doc_id 기반 문서 삭제
         # 모든 버전을 제거하려면 doc_id만 사용, 특정 버전 제거하려면 where에 'version': 특정값 추가
         # vectorstore.delete(where={"ids": doc_id})
         # vectorstore.delete(where={"doc_id": doc_id})
-        vectorstore._collection.delete(where={"doc_id": doc_id})
+        # 도중에 종료되면 다음 시작 시 삭제를 마저 진행한다.
+        op_id = journal.begin(DELETE, doc_id)
+        _delete_document(doc_id, vectorstore_version)
+        journal.complete(op_id)
         logging.info(f"All documents with doc_id={doc_id} removed from vectorstore (origin: {file_path}).")
     except Exception as e:
         logging.error(f"Error removing documents from vectorstore for doc_id={doc_id}: {e}", exc_info=True)
 
+def remove_chunks(doc_id, chunk_ids, vectorstore_version=VECTORSTORE_VERSION):
+    """
+    문서의 일부 청크만 삭제합니다. (문서를 교체한 뒤 새 청크에 없는 이전 청크)
+    삭제할 id를 저널에 먼저 기록하므로, 도중에 종료되어도 다음 복구에서 같은 청크만 마저 삭제합니다.
+    """
+    if not chunk_ids:
+        return
+    journal = VectorStoreManager.get_journal(vectorstore_version=vectorstore_version)
+    op_id = journal.begin(DELETE, doc_id, chunk_ids)
+    _delete_chunks(chunk_ids, vectorstore_version)
+    journal.complete(op_id)
+    logging.info(f"Removed {len(chunk_ids)} stale chunks of doc_id={doc_id}.")
+
+def _delete_chunks(chunk_ids, vectorstore_version=VECTORSTORE_VERSION):
+    """청크 컬렉션, 요약 컬렉션, 카탈로그에서 chunk_ids를 삭제합니다."""
+    vectorstore = VectorStoreManager.get_instance(vectorstore_version=vectorstore_version)
+    vectorstore._collection.delete(ids=chunk_ids)
+    VectorStoreManager.get_summary_instance(vectorstore_version=vectorstore_version)._collection.delete(ids=chunk_ids)
+    VectorStoreManager.get_catalog(vectorstore_version=vectorstore_version).remove_ids(chunk_ids)
+
+def _delete_document(doc_id, vectorstore_version=VECTORSTORE_VERSION):
+    """청크 컬렉션과 요약 컬렉션에서 doc_id의 청크를 카탈로그의 id 리스트로 삭제합니다."""
+    vectorstore = VectorStoreManager.get_instance(vectorstore_version=vectorstore_version)
+    catalog = VectorStoreManager.get_catalog(vectorstore_version=vectorstore_version)
+    
+    ids = catalog.ids_for(doc_id)
+    if ids:
+        vectorstore._collection.delete(ids=ids)
+        VectorStoreManager.get_summary_instance(vectorstore_version=vectorstore_version)._collection.delete(ids=ids)
+    catalog.remove_document(doc_id)
+
+def recover_from_journal(vectorstore_version=VECTORSTORE_VERSION):
+    """
+    저널에 남아있는 작업 중 소유자 프로세스가 종료된(중단된) 작업을 정리합니다.
+    벡터스토어에 쓰는 프로세스(적재 워커, 명령줄 도구)가 시작할 때 호출하며, 질의 프로세스에서는 호출하지 않습니다.
+
+    - 적재 intent: 청크 저장이 끝나지 않았으므로 미리 기록한 청크 id를 삭제해서 되돌린다.
+    - 적재 committed: 청크는 모두 저장되었으므로 요약 인덱스 동기화를 마저 진행한다.
+    - 삭제: 삭제를 마저 진행한다. (청크 id가 기록된 삭제는 해당 청크만)
+    - 다른 프로세스가 진행 중인 작업은 건드리지 않는다. (IngestJournal.orphaned 참고)
+    """
+    journal = VectorStoreManager.get_journal(vectorstore_version=vectorstore_version)
+    operations = journal.orphaned()
+    if not operations:
+        return
+    
+    vectorstore = VectorStoreManager.get_instance(vectorstore_version=vectorstore_version)
+    summary_store = VectorStoreManager.get_summary_instance(vectorstore_version=vectorstore_version)
+    catalog = VectorStoreManager.get_catalog(vectorstore_version=vectorstore_version)
+    
+    for op in operations:
+        try:
+            if op["kind"] == INGEST and op["state"] == INTENT:
+                if op["chunk_ids"]:
+                    vectorstore._collection.delete(ids=op["chunk_ids"])
+                    summary_store._collection.delete(ids=op["chunk_ids"])
+                    catalog.remove_ids(op["chunk_ids"])
+                logging.warning(f"Rolled back partial ingest of doc_id={op['doc_id']} ({len(op['chunk_ids'])} chunks).")
+            elif op["kind"] == INGEST:
+                catalog.add(op["doc_id"], op["chunk_ids"])
+                summary = vectorstore._collection.get(ids=op["chunk_ids"], where={"content_role": "summary"}, include=[])
+                if summary["ids"]:
+                    sync_summary_index(summary["ids"], vectorstore_version=vectorstore_version)
+                logging.warning(f"Rolled forward committed ingest of doc_id={op['doc_id']}.")
+            elif op["kind"] == DELETE and op["chunk_ids"]:
+                _delete_chunks(op["chunk_ids"], vectorstore_version)
+                logging.warning(f"Rolled forward interrupted removal of {len(op['chunk_ids'])} chunks of doc_id={op['doc_id']}.")
+            elif op["kind"] == DELETE:
+                _delete_document(op["doc_id"], vectorstore_version)
+                logging.warning(f"Rolled forward interrupted delete of doc_id={op['doc_id']}.")
+            journal.complete(op["op_id"])
+        except Exception as e:
+            logging.error(f"Error recovering journal operation {op}: {e}", exc_info=True)
+
 def search_vectorstore(query, top_k=5, vectorstore_version=VECTORSTORE_VERSION):
     """
     벡터스토어에서 쿼리에 대한 유사한 문서를 검색합니다.
@@ -139,8 +423,104 @@ def search_vectorstore(query, top_k=5, vectorstore_version=VECTORSTORE_VERSION):
     vectorstore = VectorStoreManager.get_instance(vectorstore_version=vectorstore_version)
     try:
         results = vectorstore.similarity_search(query, k=top_k)
+        for doc, metadata in zip(results, hydrate_metadatas([doc.metadata for doc in results], vectorstore_version)):
+            doc.metadata = metadata
         print(results)
         return results
     except Exception as e:
         logging.error(f"Error searching vectorstore for query '{query}': {e}", exc_info=True)
-        return []
\ No newline at end of file
+        return []
+
+def sync_summary_index(ids, vectorstore_version=VECTORSTORE_VERSION):
+    """
+    청크 컬렉션에 저장된 요약 문서를 요약 컬렉션으로 복사합니다.
+    이미 계산된 임베딩을 그대로 사용하므로 추가 임베딩 호출이 없습니다.
+
+    Args:
+        ids (list[str]): 청크 컬렉션에 저장된 요약 문서의 id 리스트.
+    """
+    vectorstore = VectorStoreManager.get_instance(vectorstore_version=vectorstore_version)
+    summary_store = VectorStoreManager.get_summary_instance(vectorstore_version=vectorstore_version)
+    
+    try:
+        records = vectorstore._collection.get(ids=ids, include=["embeddings", "documents", "metadatas"])
+        if not records["ids"]:
+            return
+        
+        batch_size = upsert_batch_size(summary_store)
+        for start in range(0, len(records["ids"]), batch_size):
+            end = start + batch_size
+            summary_store._collection.upsert(
+                ids=records["ids"][start:end],
+                embeddings=records["embeddings"][start:end],
+                documents=records["documents"][start:end],
+                metadatas=records["metadatas"][start:end],
+            )
+    except Exception as e:
+        logging.error(f"Error syncing summary index for ids={ids}: {e}", exc_info=True)
+
+def document_filter(doc_ids, vectorstore_version=VECTORSTORE_VERSION):
+    """
+    doc_id 리스트로 청크를 거르는 where 조건을 만듭니다. 청크에는 doc_key(정수)만 저장되어 있으므로
+    카탈로그에서 doc_key로 바꿔서 필터링합니다. 이전 형식의 청크가 남아있으면 doc_id 조건도 함께 사용합니다.
+    """
+    catalog = VectorStoreManager.get_catalog(vectorstore_version=vectorstore_version)
+    where = {"doc_key": {"$in": catalog.doc_keys_for(doc_ids) or [-1]}}
+    if catalog.get_meta(LEGACY_METADATA_KEY):
+        where = {"$or": [where, {"doc_id": {"$in": list(doc_ids)}}]}
+    return where
+
+def hydrate_metadatas(metadatas, vectorstore_version=VECTORSTORE_VERSION):
+    """
+    저장된 청크 메타데이터(doc_key)에 카탈로그의 문서 속성을 합쳐서 반환합니다.
+    문서 속성이 이미 있는 메타데이터(이전 형식, 이미 합친 결과)는 그대로 반환합니다.
+    """
+    doc_keys = {m["doc_key"] for m in metadatas if m and "doc_key" in m and "doc_id" not in m}
+    if not doc_keys:
+        return [m or {} for m in metadatas]
+    documents = VectorStoreManager.get_catalog(vectorstore_version=vectorstore_version).get_documents(doc_keys)
+    return [expand_metadata(m, documents.get(m.get("doc_key"))) if m else {} for m in metadatas]
+
+def get_search_executor():
+    """검색 병렬 처리에 사용하는 공용 스레드풀을 반환합니다."""
+    return _search_executor
+
+def search_by_vector(vectorstore, embedding, k, where=None, include_embeddings=False):
+    """
+    이미 계산된 쿼리 임베딩으로 컬렉션을 직접 검색합니다.
+    같은 쿼리로 여러번 검색할 때 임베딩을 한번만 계산하기 위해 사용합니다.
+
+    Args:
+        vectorstore (Chroma): 검색할 벡터스토어.
+        embedding (list[float]): 쿼리 임베딩.
+        k (int): 가져올 문서 수.
+        where (dict, optional): 메타데이터 필터.
+        include_embeddings (bool): 결과 문서의 임베딩도 함께 반환할지 여부.
+
+    Returns:
+        list[tuple]: (Document, distance) 리스트. include_embeddings=True면 (Document, distance, embedding).
+    """
+    if k <= 0:
+        return []
+    
+    include = ["documents", "metadatas", "distances"]
+    if include_embeddings:
+        include.append("embeddings")
+    
+    results = vectorstore._collection.query(
+        query_embeddings=[embedding],
+        n_results=k,
+        where=where,
+        include=include,
+    )
+    
+    hits = []
+    for idx, (content, metadata, distance) in enumerate(zip(
+        results["documents"][0], hydrate_metadatas(results["metadatas"][0]), results["distances"][0]
+    )):
+        doc = Document(page_content=content, metadata=metadata or {})
+        if include_embeddings:
+            hits.append((doc, distance, results["embeddings"][0][idx]))
+        else:
+            hits.append((doc, distance))
+    return hits
\ No newline at end of file
@@ -0,0 +1,131 @@
+# /src/ingest/checkpoint.py
+import os
+import time
+import sqlite3
+import threading
+from src.config import BULK_INGEST_CHECKPOINT_PATH
+
+# 파일별 적재 상태
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+SKIPPED = "skipped"
+FAILED = "failed"
+
+
+class IngestCheckpoint:
+    """
+    대량 적재의 파일별 상태를 저장하는 SQLite 체크포인트.
+
+    - 파일마다 (크기, 수정 시각)을 같이 저장해서, 완료된 파일이라도 내용이 바뀌면 다시 적재한다.
+      바뀐 파일은 changed로 표시해서 기존 문서를 지우고 적재하도록 한다. (doc_id는 경로 기준이므로 같은 문서)
+    - 실행 도중 종료되어 running으로 남은 파일은 다음 실행 시작 시 pending으로 되돌린다.
+    - 상태 변경은 바로 커밋하므로 프로세스가 강제 종료되어도 완료된 파일은 다시 처리하지 않는다.
+    """
+
+    def __init__(self, path=BULK_INGEST_CHECKPOINT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS files (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime REAL NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    chunks INTEGER NOT NULL DEFAULT 0,
+                    seconds REAL NOT NULL DEFAULT 0,
+                    error TEXT,
+                    updated_at REAL NOT NULL,
+                    changed INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(files)")}
+            if "changed" not in columns:
+                self._conn.execute("ALTER TABLE files ADD COLUMN changed INTEGER NOT NULL DEFAULT 0")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_files_status ON files(status)")
+            # 이전 실행이 중간에 종료되었다면 처리 중이던 파일을 다시 대기 상태로 돌린다.
+            self._conn.execute("UPDATE files SET status = ? WHERE status = ?", (PENDING, RUNNING))
+
+    def register(self, paths):
+        """
+        적재 대상 파일을 등록합니다. 새 파일이나 크기/수정 시각이 바뀐 파일은 pending이 됩니다.
+        이미 등록되어 있던 파일이 바뀐 경우 changed로 표시합니다. (is_changed 참고)
+
+        Returns:
+            int: pending으로 등록(또는 재등록)된 파일 수.
+        """
+        now = time.time()
+        queued = 0
+        with self._lock, self._conn:
+            for path in paths:
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                row = self._conn.execute("SELECT size, mtime FROM files WHERE path = ?", (path,)).fetchone()
+                if row and row[0] == stat.st_size and row[1] == stat.st_mtime:
+                    continue
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO files (path, size, mtime, status, attempts, updated_at, changed) "
+                    "VALUES (?, ?, ?, ?, 0, ?, ?)",
+                    (path, stat.st_size, stat.st_mtime, PENDING, now, 1 if row else 0),
+                )
+                queued += 1
+        return queued
+
+    def retry_failed(self, max_attempts):
+        """재시도 횟수가 남은 실패 파일을 다시 pending으로 돌립니다."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE files SET status = ? WHERE status = ? AND attempts < ?", (PENDING, FAILED, max_attempts)
+            )
+            return cursor.rowcount
+
+    def pending(self):
+        """처리할 파일 경로 리스트를 반환합니다."""
+        with self._lock:
+            rows = self._conn.execute("SELECT path FROM files WHERE status = ? ORDER BY path", (PENDING,)).fetchall()
+        return [row[0] for row in rows]
+
+    def is_changed(self, path):
+        """등록된 뒤 내용이 바뀌어서 다시 대기 중인 파일인지 여부. (기존 문서를 지우고 적재해야 함)"""
+        with self._lock:
+            row = self._conn.execute("SELECT changed FROM files WHERE path = ?", (path,)).fetchone()
+        return bool(row and row[0])
+
+    def mark_running(self, path):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE files SET status = ?, attempts = attempts + 1, updated_at = ? WHERE path = ?",
+                (RUNNING, time.time(), path),
+            )
+
+    def mark_finished(self, path, status, chunks=0, seconds=0.0, error=None):
+        # 실패한 파일은 재시도할 때도 기존 문서를 교체해야 하므로 changed를 유지한다.
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE files SET status = ?, chunks = ?, seconds = ?, error = ?, updated_at = ?, "
+                "changed = CASE WHEN ? = ? THEN changed ELSE 0 END WHERE path = ?",
+                (status, chunks, seconds, error, time.time(), status, FAILED, path),
+            )
+
+    def counts(self):
+        """상태별 파일 수를 반환합니다."""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM files GROUP BY status").fetchall()
+        return dict(rows)
+
+    def failures(self, limit=20):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT path, attempts, error FROM files WHERE status = ? ORDER BY updated_at DESC LIMIT ?", (FAILED, limit)
+            ).fetchall()
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,183 @@
+# /src/ingest/job_queue.py
+import os
+import json
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+from src.config import INGEST_QUEUE_PATH, INGEST_WORKER_HEARTBEAT_TIMEOUT
+
+# 작업 종류
+INGEST_JOB = "ingest"
+DELETE_JOB = "delete"
+COMPACT_JOB = "compact"  # 벡터스토어 정리 (doc_id는 COMPACT_DOC_ID)
+
+COMPACT_DOC_ID = "*"
+
+# 작업 상태
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+SKIPPED = "skipped"
+FAILED = "failed"
+
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+
+class JobQueue:
+    """
+    적재/삭제 작업을 저장하는 SQLite 작업 큐.
+
+    - Streamlit은 작업을 등록(enqueue)하고 상태만 조회한다.
+    - 워커 프로세스(ingest_worker.py)가 작업을 가져가서(claim) 처리하고, 단계와 진행률을 기록한다.
+    - 같은 doc_id로 대기/처리 중인 작업이 있으면 새로 등록하지 않고 기존 작업을 반환한다.
+    - 여러 프로세스가 같은 파일을 사용하므로 연결은 WAL 모드로 연다.
+    """
+
+    def __init__(self, path=INGEST_QUEUE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                doc_id TEXT NOT NULL,
+                file_path TEXT,
+                file_name TEXT,
+                status TEXT NOT NULL,
+                stage TEXT,
+                progress REAL NOT NULL DEFAULT 0,
+                chunks INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                worker_id TEXT,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                report TEXT
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, job_id)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_doc_id ON jobs(doc_id)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS workers (worker_id TEXT PRIMARY KEY, heartbeat REAL NOT NULL)")
+
+    @contextmanager
+    def _transaction(self):
+        """다른 프로세스와 충돌하지 않도록 쓰기 잠금을 먼저 잡는 트랜잭션."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            else:
+                self._conn.execute("COMMIT")
+
+    def enqueue(self, kind, doc_id, file_path=None, file_name=None):
+        """
+        작업을 등록합니다.
+
+        Returns:
+            tuple[int, bool]: (job_id, 새로 등록했는지 여부)
+        """
+        with self._transaction() as conn:
+            placeholders = ",".join("?" * len(ACTIVE_STATUSES))
+            row = conn.execute(
+                f"SELECT job_id FROM jobs WHERE doc_id = ? AND kind = ? AND status IN ({placeholders})",
+                (doc_id, kind, *ACTIVE_STATUSES),
+            ).fetchone()
+            if row:
+                return row["job_id"], False
+
+            cursor = conn.execute(
+                "INSERT INTO jobs (kind, doc_id, file_path, file_name, status, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (kind, doc_id, file_path, file_name, QUEUED, time.time()),
+            )
+            return cursor.lastrowid, True
+
+    def claim(self, worker_id, limit=1):
+        """대기 중인 작업을 등록 순서대로 최대 limit개 가져가서 running으로 바꿉니다."""
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY job_id LIMIT ?", (QUEUED, limit)
+            ).fetchall()
+            now = time.time()
+            for row in rows:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, worker_id = ?, started_at = ?, stage = ? WHERE job_id = ?",
+                    (RUNNING, worker_id, now, "started", row["job_id"]),
+                )
+        return [dict(row) for row in rows]
+
+    def update_progress(self, job_id, stage, progress):
+        with self._transaction() as conn:
+            conn.execute("UPDATE jobs SET stage = ?, progress = ? WHERE job_id = ?", (stage, progress, job_id))
+
+    def finish(self, job_id, status, chunks=0, error=None, report=None):
+        """작업 결과를 기록합니다. report는 단계별 처리 리포트(ingest_report)입니다."""
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, stage = ?, progress = 1, chunks = ?, error = ?, finished_at = ?, report = ? "
+                "WHERE job_id = ?",
+                (status, status, chunks, error, time.time(), json.dumps(report, default=str) if report else None, job_id),
+            )
+
+    def requeue_orphaned(self, timeout=INGEST_WORKER_HEARTBEAT_TIMEOUT):
+        """
+        처리 중에 워커가 종료되어 running으로 남은 작업을 다시 대기 상태로 돌립니다.
+        heartbeat가 timeout 이상 끊긴 워커의 작업만 대상입니다.
+        """
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, stage = NULL, progress = 0 WHERE status = ? AND (worker_id IS NULL OR "
+                "worker_id NOT IN (SELECT worker_id FROM workers WHERE heartbeat >= ?))",
+                (QUEUED, RUNNING, time.time() - timeout),
+            )
+            return cursor.rowcount
+
+    def get_jobs(self, job_ids):
+        if not job_ids:
+            return []
+        placeholders = ",".join("?" * len(job_ids))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM jobs WHERE job_id IN ({placeholders}) ORDER BY job_id", tuple(job_ids)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def recent_jobs(self, limit=20):
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM jobs ORDER BY job_id DESC LIMIT ?", (limit,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def counts(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) AS count FROM jobs GROUP BY status").fetchall()
+        return {row["status"]: row["count"] for row in rows}
+
+    def heartbeat(self, worker_id):
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO workers (worker_id, heartbeat) VALUES (?, ?) "
+                "ON CONFLICT(worker_id) DO UPDATE SET heartbeat = excluded.heartbeat",
+                (worker_id, time.time()),
+            )
+
+    def unregister_worker(self, worker_id):
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM workers WHERE worker_id = ?", (worker_id,))
+
+    def has_live_worker(self, timeout=INGEST_WORKER_HEARTBEAT_TIMEOUT):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) AS count FROM workers WHERE heartbeat >= ?", (time.time() - timeout,)
+            ).fetchone()
+        return row["count"] > 0
+
+    def close(self):
+        self._conn.close()
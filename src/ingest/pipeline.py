@@ -0,0 +1,332 @@
+# /src/ingest/pipeline.py
+import os
+import time
+import logging
+import threading
+from itertools import islice
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from src.loader.loader import load_documents, LOADER_MAP
+from src.loader.image_ingest import ImageIngestionService, is_image_file
+from src.loader.tabular import TabularLoader, TABULAR_EXTENSIONS
+from src.preprocessing.preprocessor_v1 import preprocess_documents, preprocess_tabular_blocks, tabular_summary_document
+from src.preprocessing.page_index import PageOffsetIndex
+from src.preprocessing.metadata_manager import generate_doc_id
+from src.embedding.vectorstore_handler import (
+    save_to_vectorstore,
+    remove_chunks,
+    document_exists,
+    recover_from_journal,
+    VectorStoreManager,
+)
+from src.ingest.checkpoint import IngestCheckpoint, DONE, SKIPPED, FAILED
+from src.metrics import ingest_report
+from src.config import (
+    VECTORSTORE_VERSION,
+    BULK_INGEST_WORKERS,
+    BULK_INGEST_MAX_ATTEMPTS,
+    IMAGE_BATCH_SIZE,
+    TABULAR_INGEST_BATCH_SIZE,
+)
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+
+# 벡터스토어 쓰기는 한번에 하나씩 처리한다. (로드/청킹은 병렬)
+vectorstore_write_lock = threading.Lock()
+
+
+def apply_source_path(documents, source_path):
+    """
+    로더가 읽은 파일 경로 대신 문서의 논리 경로(업로드 파일명 등)를 메타데이터에 기록합니다.
+    doc_id와 path 메타데이터는 이 경로로 만들어지므로, 읽기용 임시 파일(스풀 파일)의 위치와 관계없이 문서가 식별됩니다.
+    """
+    for doc in documents:
+        doc.metadata["file_path"] = source_path
+        doc.metadata["source"] = source_path
+    return documents
+
+
+@contextmanager
+def prefetched_images(image_paths):
+    """
+    이미지 묶음을 한번의 배치로 OCR/캡션해 두고, 블록 안의 파일별 ingest_file이 그 결과를 사용하게 합니다.
+    ingest_file은 파일을 하나씩 로드하므로, 묶음 처리는 여러 이미지를 가진 호출자(대량 적재, 적재 워커)가 이 블록으로 감쌉니다.
+    미리 처리하지 못하면 파일별로 다시 처리하고, 블록이 끝나면 사용되지 않은 결과를 지웁니다.
+    """
+    service = ImageIngestionService.get_instance() if len(image_paths) > 1 else None
+    if service:
+        try:
+            service.prefetch(image_paths)
+        except Exception as e:
+            logging.error(f"Error prefetching {len(image_paths)} images: {e}", exc_info=True)
+    try:
+        yield
+    finally:
+        if service:
+            service.discard(image_paths)
+
+
+def _save_chunks(processed, vectorstore_version, generation, first_position=0):
+    """청크 Document를 벡터스토어에 저장하고 저장된(이미 있던 청크 포함) 청크 id를 반환합니다. (vectorstore_write_lock 안에서 호출)"""
+    return save_to_vectorstore(
+        [d.page_content for d in processed],
+        [d.metadata for d in processed],
+        vectorstore_version=vectorstore_version,
+        generation=generation,
+        first_position=first_position,
+    )
+
+
+def _finish_document(doc_id, generation, saved_ids, source_path, vectorstore_version):
+    """문서의 청크를 모두 저장했으므로 적재 번호를 기록하고, 이번 적재가 쓰지 않은 이전 청크를 삭제합니다. (vectorstore_write_lock 안에서 호출)"""
+    catalog = VectorStoreManager.get_catalog(vectorstore_version=vectorstore_version)
+    catalog.set_generation(doc_id, generation)
+    stale_ids = set(catalog.ids_for(doc_id)) - set(saved_ids)
+    if stale_ids:
+        logging.info(f"Replacing existing document doc_id={doc_id} ({source_path})")
+        remove_chunks(doc_id, sorted(stale_ids), vectorstore_version=vectorstore_version)
+
+
+def _ingest_tabular_file(file_path, source_path, doc_id, vectorstore_version, on_stage):
+    """
+    표 파일(CSV/XLSX)의 행 블록을 TABULAR_INGEST_BATCH_SIZE개씩 읽으면서 바로 임베딩/저장합니다.
+    파일 전체의 행 블록을 메모리에 올리지 않습니다. 스키마 요약은 모든 행을 읽은 뒤에 완성되므로 마지막에 저장하고,
+    그 뒤에 문서의 적재 번호를 기록합니다. (도중에 종료된 문서는 document_exists가 없는 것으로 보고 다시 적재함)
+
+    Returns:
+        (int, int): 행 블록 수, 청크 수 (요약 포함)
+    """
+    catalog = VectorStoreManager.get_catalog(vectorstore_version=vectorstore_version)
+    generation = catalog.next_generation(doc_id)
+    loader = TabularLoader(file_path)
+    blocks = loader.lazy_load()
+    saved_ids = []
+    page_lengths, page_numbers = [], []
+
+    on_stage("save_to_vectorstore", 0.3)
+    while True:
+        batch = list(islice(blocks, TABULAR_INGEST_BATCH_SIZE))
+        if not batch:
+            break
+        if source_path != file_path:
+            apply_source_path(batch, source_path)
+        processed = preprocess_tabular_blocks(batch, content_offset=sum(page_lengths))
+        page_lengths.extend(len(block.page_content) for block in batch)
+        page_numbers.extend(block.metadata["page"] + 1 for block in batch)
+
+        # 요약이 문서의 첫 청크(순서 0)이므로 행 블록은 1부터 순서를 매긴다.
+        with vectorstore_write_lock:
+            saved = _save_chunks(processed, vectorstore_version, generation, first_position=1 + len(saved_ids))
+        saved_ids.extend(saved.get(doc_id, []))
+
+    if not page_lengths:
+        return 0, 0
+
+    on_stage("save_to_vectorstore", 0.9)
+    summary = tabular_summary_document(source_path, loader.table_summary, PageOffsetIndex(page_lengths, page_numbers))
+    with vectorstore_write_lock:
+        saved = _save_chunks([summary], vectorstore_version, generation)
+        saved_ids.extend(saved.get(doc_id, []))
+        _finish_document(doc_id, generation, saved_ids, source_path, vectorstore_version)
+
+    logging.info(f"Ingested {len(page_lengths)} row blocks from {source_path} in batches of {TABULAR_INGEST_BATCH_SIZE}")
+    return len(page_lengths), len(saved_ids)
+
+
+def ingest_file(file_path, vectorstore_version=VECTORSTORE_VERSION, skip_existing=True, file_name=None, on_stage=None,
+                replace_existing=False, source_path=None):
+    """
+    파일 하나를 로드 -> 청킹 -> 임베딩/저장합니다. Streamlit 업로드와 같은 함수를 사용합니다.
+    같은 doc_id의 문서가 이미 있는데 건너뛰지 않으면 기존 문서를 교체합니다. 청크 id는 doc_id와 내용으로 정해지므로
+    먼저 저장해서 바뀌지 않은 청크는 다시 임베딩하지 않고, 저장이 끝난 뒤 새 청크에 없는 이전 청크만 삭제합니다.
+    저장에 실패하면 예외가 발생하고 기존 문서는 그대로 남습니다. (작업은 실패로 기록되어 다시 시도됨)
+    표 파일(CSV/XLSX)은 행 블록을 나눠서 읽으면서 저장합니다. (_ingest_tabular_file)
+
+    Args:
+        file_path (str): 적재할 파일 경로.
+        skip_existing (bool): 이미 같은 doc_id로 저장된 문서면 건너뛸지 여부.
+        replace_existing (bool): skip_existing이어도 기존 문서를 교체할지 여부. (내용이 바뀐 파일)
+        source_path (str, optional): doc_id와 path 메타데이터에 사용할 문서 경로. 없으면 file_path.
+            업로드 파일은 원래 파일명을 넘기고 file_path(스풀 파일)는 읽기에만 사용합니다.
+        file_name (str, optional): 리포트에 표시할 파일명. 없으면 경로의 파일명.
+        on_stage (callable, optional): 단계가 바뀔 때 on_stage(stage, progress)로 호출됩니다.
+
+    Returns:
+        dict: {"status": "done" | "skipped", "pages": int, "chunks": int, "report": dict}
+    """
+    source_path = source_path or file_path
+    doc_id = generate_doc_id(source_path)
+    if skip_existing and not replace_existing and document_exists(doc_id, vectorstore_version=vectorstore_version):
+        return {"status": SKIPPED, "pages": 0, "chunks": 0, "report": None}
+
+    on_stage = on_stage or (lambda stage, progress: None)
+    with ingest_report(doc_id, file_name or os.path.basename(source_path)) as report:
+        if file_path.lower().endswith(TABULAR_EXTENSIONS):
+            pages, chunks = _ingest_tabular_file(file_path, source_path, doc_id, vectorstore_version, on_stage)
+            status = DONE if pages else SKIPPED
+            return {"status": status, "pages": pages, "chunks": chunks, "report": report}
+
+        on_stage("load_documents", 0.1)
+        documents = load_documents([file_path])
+        if not documents:
+            return {"status": SKIPPED, "pages": 0, "chunks": 0, "report": report}
+        if source_path != file_path:
+            apply_source_path(documents, source_path)
+
+        on_stage("preprocess_documents", 0.3)
+        processed = preprocess_documents(documents)
+
+        on_stage("save_to_vectorstore", 0.8)
+        with vectorstore_write_lock:
+            # 이번 적재의 번호를 청크에 기록하고, 저장이 끝나면 문서의 번호로 기록한다. (정리에서 이전 적재의 청크를 구분)
+            generation = VectorStoreManager.get_catalog(vectorstore_version=vectorstore_version).next_generation(doc_id)
+            saved_ids = _save_chunks(processed, vectorstore_version, generation)
+            _finish_document(doc_id, generation, saved_ids.get(doc_id, []), source_path, vectorstore_version)
+
+    return {"status": DONE, "pages": len(documents), "chunks": len(processed), "report": report}
+
+
+def discover_files(root, extensions=None):
+    """root 아래에서 적재 가능한 파일 경로를 찾습니다. (숨김 파일/디렉토리 제외)"""
+    extensions = tuple(ext.lower() for ext in (extensions or LOADER_MAP.keys()))
+    if os.path.isfile(root):
+        return [os.path.abspath(root)]
+
+    paths = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+        for filename in filenames:
+            if not filename.startswith(".") and filename.lower().endswith(extensions):
+                paths.append(os.path.abspath(os.path.join(dirpath, filename)))
+    return sorted(paths)
+
+
+class ProgressReporter:
+    """처리량(files/s, chunks/s)과 남은 시간을 주기적으로 출력한다."""
+
+    def __init__(self, total, interval=2.0, stream=print):
+        self.total = total
+        self.interval = interval
+        self.stream = stream
+        self.completed = 0
+        self.failed = 0
+        self.skipped = 0
+        self.chunks = 0
+        self.start = time.perf_counter()
+        self._last_report = 0.0
+
+    def update(self, status, chunks=0):
+        self.completed += 1
+        self.chunks += chunks
+        if status == FAILED:
+            self.failed += 1
+        elif status == SKIPPED:
+            self.skipped += 1
+
+        now = time.perf_counter()
+        if now - self._last_report >= self.interval or self.completed == self.total:
+            self._last_report = now
+            self.stream(self.format_line(now - self.start))
+
+    def format_line(self, elapsed):
+        rate = self.completed / elapsed if elapsed else 0.0
+        remaining = self.total - self.completed
+        eta = time.strftime("%H:%M:%S", time.gmtime(remaining / rate)) if rate else "--:--:--"
+        return (
+            f"[{self.completed}/{self.total}] {rate:.2f} files/s, {self.chunks / elapsed if elapsed else 0.0:.1f} chunks/s, "
+            f"failed {self.failed}, skipped {self.skipped}, ETA {eta}"
+        )
+
+
+class BulkIngester:
+    """
+    체크포인트를 기준으로 대기 중인 파일을 병렬로 적재한다.
+    중간에 종료되어도 다시 실행하면 완료되지 않은 파일부터 이어서 처리한다.
+    """
+
+    def __init__(self, checkpoint=None, workers=BULK_INGEST_WORKERS, vectorstore_version=VECTORSTORE_VERSION,
+                 skip_existing=True, progress_interval=2.0):
+        self.checkpoint = checkpoint or IngestCheckpoint()
+        self.workers = workers
+        self.vectorstore_version = vectorstore_version
+        self.skip_existing = skip_existing
+        self.progress_interval = progress_interval
+
+    def _process(self, file_path):
+        self.checkpoint.mark_running(file_path)
+        start = time.perf_counter()
+        try:
+            result = ingest_file(
+                file_path, self.vectorstore_version, skip_existing=self.skip_existing,
+                replace_existing=self.checkpoint.is_changed(file_path),
+            )
+        except Exception as e:
+            logging.error(f"Error ingesting {file_path}: {e}", exc_info=True)
+            self.checkpoint.mark_finished(file_path, FAILED, seconds=time.perf_counter() - start, error=str(e))
+            return FAILED, 0
+
+        self.checkpoint.mark_finished(
+            file_path, result["status"], chunks=result["chunks"], seconds=time.perf_counter() - start
+        )
+        return result["status"], result["chunks"]
+
+    def _needs_loading(self, file_path):
+        if not self.skip_existing or self.checkpoint.is_changed(file_path):
+            return True
+        return not document_exists(generate_doc_id(file_path), vectorstore_version=self.vectorstore_version)
+
+    def _process_images(self, file_paths):
+        """이미지 묶음을 한번의 배치로 OCR/캡션한 뒤 파일별로 적재합니다."""
+        with prefetched_images([path for path in file_paths if self._needs_loading(path)]):
+            return [self._process(path) for path in file_paths]
+
+    def run(self, paths, retry_failed=True, max_attempts=BULK_INGEST_MAX_ATTEMPTS, limit=None):
+        """
+        파일을 등록하고 대기 중인 파일을 모두 처리합니다.
+
+        Args:
+            paths (list[str]): 적재 대상 파일 경로.
+            retry_failed (bool): 이전 실행에서 실패한 파일을 다시 시도할지 여부.
+            max_attempts (int): 파일별 최대 시도 횟수.
+            limit (int, optional): 이번 실행에서 처리할 최대 파일 수.
+
+        Returns:
+            ProgressReporter: 처리 결과 집계.
+        """
+        # 이전에 종료된 적재 프로세스가 남긴 중단된 작업을 먼저 정리한다.
+        recover_from_journal(self.vectorstore_version)
+
+        self.checkpoint.register(paths)
+        if retry_failed:
+            self.checkpoint.retry_failed(max_attempts)
+
+        pending = self.checkpoint.pending()
+        if limit:
+            pending = pending[:limit]
+
+        progress = ProgressReporter(len(pending), interval=self.progress_interval)
+        logging.info(f"Bulk ingest: {len(pending)} files pending ({self.checkpoint.counts()})")
+        if not pending:
+            return progress
+
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bulk-ingest")
+        try:
+            # 이미지는 IMAGE_BATCH_SIZE개씩 묶어서 한 작업으로 처리한다. (OCR/캡션 배치)
+            images = [path for path in pending if is_image_file(path)]
+            futures = [executor.submit(lambda path=path: [self._process(path)]) for path in pending if not is_image_file(path)]
+            futures += [
+                executor.submit(self._process_images, images[start:start + IMAGE_BATCH_SIZE])
+                for start in range(0, len(images), IMAGE_BATCH_SIZE)
+            ]
+            for future in as_completed(futures):
+                for status, chunks in future.result():
+                    progress.update(status, chunks)
+        except KeyboardInterrupt:
+            # 처리 중인 파일은 running으로 남고, 다음 실행에서 pending으로 되돌아간다.
+            logging.warning("Interrupted. Waiting for running files to finish; remaining files stay pending.")
+            executor.shutdown(wait=True, cancel_futures=True)
+            raise
+        finally:
+            executor.shutdown(wait=True)
+
+        return progress
@@ -0,0 +1,170 @@
+# /src/ingest/worker.py
+import os
+import time
+import socket
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from src.ingest.job_queue import JobQueue, INGEST_JOB, DELETE_JOB, COMPACT_JOB, DONE, FAILED
+from src.ingest.pipeline import ingest_file, prefetched_images, vectorstore_write_lock
+from src.loader.upload_spooler import UploadSpooler
+from src.loader.image_ingest import is_image_file
+from src.preprocessing.metadata_manager import generate_doc_id
+from src.embedding.vectorstore_handler import (
+    VectorStoreManager,
+    remove_from_vectorstore,
+    recover_from_journal,
+    document_exists,
+)
+from src.embedding.compaction import compact_vectorstore
+from src.embedding.shared_index import publish_shared_index, SharedIndex
+from src.config import (
+    VECTORSTORE_VERSION,
+    INGEST_WORKER_CONCURRENCY,
+    INGEST_WORKER_POLL_INTERVAL,
+    SHARED_INDEX_ENABLED,
+    SHARED_INDEX_PUBLISH_INTERVAL,
+)
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+
+
+class IngestWorker:
+    """
+    작업 큐에서 적재/삭제 작업을 가져와 처리하는 워커. 벡터스토어 쓰기는 이 워커만 한다.
+
+    - 최대 concurrency개의 파일을 동시에 처리한다. (벡터스토어 저장은 한번에 하나씩)
+    - 한번에 가져온 이미지 적재 작업은 묶어서 OCR/캡션을 한번의 배치로 실행한다.
+    - 처리 중에는 poll_interval마다 heartbeat를 기록한다. 시작할 때 heartbeat가 끊긴 워커의 작업을 다시 대기시킨다.
+    - 업로드로 스풀된 파일은 처리가 끝나면 삭제한다.
+    - SHARED_INDEX_ENABLED면 벡터스토어가 바뀐 뒤 처리 중인 작업이 없을 때 공유 인덱스의 새 세대를 발행한다.
+      (SHARED_INDEX_PUBLISH_INTERVAL 간격 이상)
+    """
+
+    def __init__(self, queue=None, concurrency=INGEST_WORKER_CONCURRENCY, poll_interval=INGEST_WORKER_POLL_INTERVAL,
+                 vectorstore_version=VECTORSTORE_VERSION):
+        self.queue = queue or JobQueue()
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.vectorstore_version = vectorstore_version
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}"
+        self._stop = threading.Event()
+        self._index_dirty = SHARED_INDEX_ENABLED and SharedIndex.get_instance().generation() is None
+        self._last_publish = float("-inf")
+
+    def stop(self):
+        self._stop.set()
+
+    def _process(self, job):
+        job_id = job["job_id"]
+        try:
+            if job["kind"] == INGEST_JOB:
+                # 업로드 파일은 원래 파일명을 문서 경로(doc_id, path)로 쓰고, 같은 이름으로 다시 올리면 기존 문서를 교체한다.
+                uploaded = self._is_spooled(job["file_path"])
+                result = ingest_file(
+                    job["file_path"],
+                    self.vectorstore_version,
+                    file_name=job["file_name"],
+                    on_stage=lambda stage, progress: self.queue.update_progress(job_id, stage, progress),
+                    replace_existing=uploaded,
+                    source_path=job["file_name"] if uploaded else None,
+                )
+                self.queue.finish(job_id, result["status"], chunks=result["chunks"], report=result["report"])
+            elif job["kind"] == DELETE_JOB:
+                self.queue.update_progress(job_id, "remove_from_vectorstore", 0.5)
+                with vectorstore_write_lock:
+                    remove_from_vectorstore(doc_id=job["doc_id"], vectorstore_version=self.vectorstore_version)
+                self.queue.finish(job_id, DONE)
+            elif job["kind"] == COMPACT_JOB:
+                # 정리 중에는 적재/삭제가 벡터스토어에 쓰지 않도록 쓰기 잠금을 잡는다.
+                self.queue.update_progress(job_id, "compact_vectorstore", 0.5)
+                with vectorstore_write_lock:
+                    report = compact_vectorstore(vectorstore_version=self.vectorstore_version, check_worker=False)
+                self.queue.finish(job_id, DONE, report=report)
+            else:
+                raise ValueError(f"Unknown job kind: {job['kind']}")
+            self._index_dirty = True
+            logging.info(f"Job {job_id} ({job['kind']} {job['file_name'] or job['doc_id']}) finished.")
+        except Exception as e:
+            logging.error(f"Job {job_id} failed: {e}", exc_info=True)
+            self.queue.finish(job_id, FAILED, error=str(e))
+        finally:
+            self._discard_spooled(job.get("file_path"))
+
+    def _process_images(self, jobs):
+        """이미지 적재 작업 묶음을 한번의 배치로 OCR/캡션한 뒤 작업별로 처리합니다."""
+        # 업로드 파일은 항상 교체하고, 사용자 디렉토리의 파일은 이미 적재된 문서면 ingest_file이 건너뛴다.
+        image_paths = [
+            job["file_path"] for job in jobs
+            if self._is_spooled(job["file_path"])
+            or not document_exists(generate_doc_id(job["file_path"]), vectorstore_version=self.vectorstore_version)
+        ]
+        with prefetched_images(image_paths):
+            for job in jobs:
+                self._process(job)
+
+    @staticmethod
+    def _is_spooled(file_path):
+        """스풀 디렉토리의 파일(업로드 파일)인지 여부."""
+        if not file_path:
+            return False
+        spool_dir = UploadSpooler.get_instance().spool_dir
+        return os.path.abspath(file_path).startswith(os.path.abspath(spool_dir) + os.sep)
+
+    def _discard_spooled(self, file_path):
+        """스풀 디렉토리의 파일(업로드 파일)이면 삭제합니다. 사용자 디렉토리의 파일은 건드리지 않습니다."""
+        if self._is_spooled(file_path):
+            UploadSpooler.get_instance().discard(file_path)
+
+    def _publish_shared_index(self):
+        if not (SHARED_INDEX_ENABLED and self._index_dirty):
+            return
+        if time.monotonic() - self._last_publish < SHARED_INDEX_PUBLISH_INTERVAL:
+            return
+        self._index_dirty = False
+        self._last_publish = time.monotonic()
+        try:
+            # 적재/삭제 도중의 상태가 발행되지 않도록 쓰기 잠금을 잡는다.
+            with vectorstore_write_lock:
+                publish_shared_index(vectorstore_version=self.vectorstore_version)
+        except Exception as e:
+            self._index_dirty = True
+            logging.error(f"Failed to publish shared index: {e}", exc_info=True)
+
+    def run(self):
+        """stop()이 호출될 때까지 작업을 처리합니다."""
+        self.queue.heartbeat(self.worker_id)
+        requeued = self.queue.requeue_orphaned()
+        if requeued:
+            logging.warning(f"Requeued {requeued} jobs left running by a stopped worker.")
+
+        # 벡터스토어를 먼저 열어서 저널 복구(종료된 프로세스의 중단된 작업)를 마친 뒤 작업을 받는다.
+        VectorStoreManager.get_instance(vectorstore_version=self.vectorstore_version)
+        recover_from_journal(self.vectorstore_version)
+        logging.info(f"Ingest worker {self.worker_id} started (concurrency: {self.concurrency}).")
+
+        executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="ingest-worker")
+        in_flight = set()
+        try:
+            while not self._stop.is_set():
+                self.queue.heartbeat(self.worker_id)
+                in_flight = {future for future in in_flight if not future.done()}
+
+                free = self.concurrency - len(in_flight)
+                if free > 0:
+                    jobs = self.queue.claim(self.worker_id, limit=free)
+                    image_jobs = [job for job in jobs if job["kind"] == INGEST_JOB and is_image_file(job["file_path"])]
+                    for job in jobs:
+                        if job not in image_jobs:
+                            in_flight.add(executor.submit(self._process, job))
+                    if image_jobs:
+                        in_flight.add(executor.submit(self._process_images, image_jobs))
+
+                if not in_flight:
+                    self._publish_shared_index()
+
+                self._stop.wait(self.poll_interval)
+        finally:
+            logging.info("Stopping ingest worker, waiting for running jobs...")
+            executor.shutdown(wait=True)
+            self.queue.unregister_worker(self.worker_id)
@@ -0,0 +1,198 @@
+# /src/loader/image_ingest.py
+import os
+import logging
+import threading
+import numpy as np
+from PIL import Image
+from langchain.schema import Document
+from utils.ocr import get_easyocr_reader
+from src.config import IMAGE_CAPTION_MODEL, IMAGE_BATCH_SIZE, IMAGE_OCR_MIN_CHARS
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+
+
+def is_image_file(file_path):
+    return bool(file_path) and file_path.lower().endswith(IMAGE_EXTENSIONS)
+
+
+def _file_key(path):
+    """미리 처리한 결과를 찾는 키. 처리한 뒤 파일이 바뀌었으면 다른 키가 된다."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return os.path.abspath(path), stat.st_mtime_ns, stat.st_size
+
+
+class ImageIngestionService:
+    """
+    이미지 OCR/캡션 모델을 프로세스에 상주시키고, 이미지를 배치 단위로 처리하는 서비스.
+
+    - EasyOCR Reader와 BLIP 캡션 모델은 처음 사용할 때 한번만 로드한다.
+    - 이미지마다 OCR을 먼저 실행하고, OCR 텍스트가 충분하면(IMAGE_OCR_MIN_CHARS 이상) 캡션 생성을 건너뛴다.
+      (OCR은 이미지 크기가 제각각이라 한장씩 실행한다. EasyOCR의 배치 검출은 같은 크기의 입력만 받는다)
+    - 캡션이 필요한 이미지만 모아서 CPU에서 배치로 생성한다.
+    - 적재는 파일 단위(ingest_file)로 진행되므로, 대량 적재와 적재 워커는 이미지 묶음을 prefetch()로 한번에 처리해 두고
+      파일별 로드에서 그 결과를 사용한다.
+    - 열 수 없는 이미지는 그 이미지만 건너뛴다. (결과의 error)
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, caption_model=IMAGE_CAPTION_MODEL, batch_size=IMAGE_BATCH_SIZE, ocr_min_chars=IMAGE_OCR_MIN_CHARS):
+        self.caption_model_name = caption_model
+        self.batch_size = batch_size
+        self.ocr_min_chars = ocr_min_chars
+        self._processor = None
+        self._model = None
+        # 모델 추론은 한번에 하나의 배치만 실행한다.
+        self._inference_lock = threading.Lock()
+        self._prefetched = {}  # _file_key -> 결과
+        self._prefetched_lock = threading.Lock()
+
+    def _load_caption_model(self):
+        if self._model is None:
+            from transformers import BlipForConditionalGeneration, BlipProcessor
+            logging.info(f"Loading caption model: {self.caption_model_name}")
+            self._processor = BlipProcessor.from_pretrained(self.caption_model_name)
+            self._model = BlipForConditionalGeneration.from_pretrained(self.caption_model_name)
+            self._model.eval()
+        return self._processor, self._model
+
+    def _ocr(self, image):
+        reader = get_easyocr_reader(("ko", "en"))
+        return " ".join(reader.readtext(np.array(image), detail=0))
+
+    def _caption(self, images):
+        if not images:
+            return []
+        import torch
+        processor, model = self._load_caption_model()
+        inputs = processor(images=images, return_tensors="pt")
+        with torch.no_grad():
+            output = model.generate(**inputs, max_new_tokens=40)
+        return [caption.strip() for caption in processor.batch_decode(output, skip_special_tokens=True)]
+
+    def _process_batch(self, batch_paths):
+        images = {}
+        errors = {}
+        for i, path in enumerate(batch_paths):
+            try:
+                with Image.open(path) as image:
+                    images[i] = image.convert("RGB")
+            except Exception as e:
+                logging.error(f"Error opening image {path}: {e}")
+                errors[i] = str(e)
+
+        with self._inference_lock:
+            ocr_texts = {}
+            for i, image in images.items():
+                try:
+                    ocr_texts[i] = self._ocr(image)
+                except Exception as e:
+                    logging.error(f"Error running OCR on {batch_paths[i]}: {e}", exc_info=True)
+                    errors[i] = str(e)
+
+            # OCR로 충분한 텍스트를 얻은 이미지는 캡션을 생성하지 않는다.
+            caption_targets = [i for i, text in ocr_texts.items() if len(text.strip()) < self.ocr_min_chars]
+            captions = dict(zip(caption_targets, self._caption([images[i] for i in caption_targets])))
+
+        logging.info(f"Processed image batch: {len(batch_paths)} images, {len(caption_targets)} captioned, {len(errors)} failed")
+        return [
+            {"ocr_text": "", "caption": None, "error": errors[i]} if i in errors
+            else {"ocr_text": ocr_texts[i], "caption": captions.get(i), "error": None}
+            for i in range(len(batch_paths))
+        ]
+
+    def process(self, image_paths):
+        """
+        이미지 파일들을 배치 단위로 OCR하고, 필요한 이미지만 캡션을 생성합니다.
+        prefetch()로 미리 처리한 이미지는 저장해 둔 결과를 반환합니다.
+
+        Args:
+            image_paths (list[str]): 이미지 파일 경로 리스트.
+
+        Returns:
+            list[dict]: 이미지별 {"ocr_text": str, "caption": str | None, "error": str | None} (입력 순서 유지).
+        """
+        results = [None] * len(image_paths)
+        with self._prefetched_lock:
+            for i, path in enumerate(image_paths):
+                results[i] = self._prefetched.pop(_file_key(path), None)
+        pending = [i for i, result in enumerate(results) if result is None]
+
+        for batch_start in range(0, len(pending), self.batch_size):
+            batch = pending[batch_start:batch_start + self.batch_size]
+            for i, result in zip(batch, self._process_batch([image_paths[i] for i in batch])):
+                results[i] = result
+        return results
+
+    def prefetch(self, image_paths):
+        """
+        이미지 묶음을 배치로 처리해서 결과를 저장해 둡니다. 이후 이미지별 process()는 저장된 결과를 사용합니다.
+        사용하지 않은 결과는 discard()로 지워야 합니다.
+        """
+        results = self.process(image_paths)
+        with self._prefetched_lock:
+            for path, result in zip(image_paths, results):
+                key = _file_key(path)
+                if key is not None:
+                    self._prefetched[key] = result
+
+    def discard(self, image_paths):
+        """prefetch()로 저장해 둔 결과 중 사용되지 않은 것을 지웁니다."""
+        with self._prefetched_lock:
+            for path in image_paths:
+                self._prefetched.pop(_file_key(path), None)
+
+
+class ImageLoader:
+    """
+    ImageIngestionService를 사용하는 이미지 로더.
+    load_batch로 여러 이미지를 한번에 처리할 수 있다.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+
+    def load(self):
+        return ImageLoader.load_batch([self])
+
+    @staticmethod
+    def load_batch(loaders):
+        """여러 ImageLoader를 하나의 배치로 처리해서 Document 리스트를 반환합니다."""
+        service = ImageIngestionService.get_instance()
+        results = service.process([loader.file_path for loader in loaders])
+
+        documents = []
+        for loader, result in zip(loaders, results):
+            # 열 수 없는 이미지는 건너뛰고 나머지 이미지는 계속 처리한다.
+            if result.get("error"):
+                logging.error(f"Skipping unreadable image {loader.file_path}: {result['error']}")
+                continue
+            contents = []
+            if result["ocr_text"]:
+                contents.append(result["ocr_text"])
+            if result["caption"]:
+                contents.append(f"이미지 설명: {result['caption']}")
+
+            documents.append(Document(
+                page_content="\n".join(contents),
+                metadata={
+                    "source": loader.file_path,
+                    "file_path": loader.file_path,
+                    "page": 0,
+                    "content_type": "image",
+                },
+            ))
+        return documents
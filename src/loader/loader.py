@@ -1,7 +1,9 @@
 # /src/loader/loader.py
 import os
 import re
+import math
 import logging
+from collections import Counter
 import pytesseract
 from urllib.parse import quote
 from PIL import Image
@@ -10,25 +12,27 @@ from utils.ocr import extract_text_with_easyocr_image
 from langchain_community.document_loaders import (
     PDFPlumberLoader,
     UnstructuredFileLoader, 
-    CSVLoader, 
-    ImageCaptionLoader,
 )
 from langchain.schema import Document
-import tempfile
 from urllib.parse import quote
+from src.config import BOILERPLATE_MIN_PAGE_RATIO, BOILERPLATE_MIN_PAGES
+from src.loader.upload_spooler import UploadSpooler
+from src.loader.tabular import TabularLoader
+from src.loader.image_ingest import ImageLoader
+from src.metrics import span
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
 
 # 파일 형식과 로더 매핑
 LOADER_MAP = {
     ".pdf": PDFPlumberLoader,
-    ".csv": CSVLoader,
-    ".png": ImageCaptionLoader,
-    ".jpg": ImageCaptionLoader,
-    ".jpeg": ImageCaptionLoader,
+    ".csv": TabularLoader,
+    ".png": ImageLoader,
+    ".jpg": ImageLoader,
+    ".jpeg": ImageLoader,
     ".txt": UnstructuredFileLoader,
     ".docx": UnstructuredFileLoader,
-    ".xlsx": UnstructuredFileLoader,
+    ".xlsx": TabularLoader,
     ".pptx": UnstructuredFileLoader,
     ".md": UnstructuredFileLoader,
     ".odt": UnstructuredFileLoader,
@@ -36,6 +40,28 @@ LOADER_MAP = {
     ".odp": UnstructuredFileLoader
 }
 
+# 페이지마다 반복되는 머리말/꼬리말을 찾을 파일 형식 (페이지 단위로 로드되는 형식만)
+PAGED_EXTENSIONS = (".pdf",)
+
+# 페이지 번호를 표시하는 가능한 패턴들 정의 (대소문자 구분 안함)
+PAGE_NUMBER_PATTERNS = [
+    r'\d+\s*/\s*\d+',       # 1. <number>/<number>
+    r'-\s*\d+\s*-',         # 2. - <number> -
+    r'page\s+\d+',          # 3. page <number>
+    r'\d+\s+page',          # 4. <number> page
+    r'\d+\s+of\s+\d+',      # 5. <number> of <number>
+    r'\d+\s*페이지',         # 6. <number> 페이지
+    r'\d+\s*쪽',             # 7. <number> 쪽
+    r'페이지\s*\d+'          # 8. 페이지 <number>
+]
+
+# 패턴을 하나의 정규식으로 합침 (여러 패턴 중 하나라도 매칭되면 True)
+# 호출할 때마다 컴파일하지 않도록 모듈 로드 시 한번만 컴파일한다.
+PAGE_NUMBER_PATTERN = re.compile('(' + '|'.join(PAGE_NUMBER_PATTERNS) + ')', re.IGNORECASE)
+
+# 반복 줄 비교용 정규화 패턴 (연속 공백은 하나로)
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
 def extract_text_with_ocr(file_path, meta_data=None, lang="kor"):
     """
     OCR을 사용하여 이미지 또는 PDF 파일의 텍스트를 추출합니다.
@@ -81,77 +107,59 @@ def extract_text_with_ocr(file_path, meta_data=None, lang="kor"):
 
 def get_loader(file):
     """
-    파일 객체에 따라 적합한 로더 객체를 반환하거나 OCR 처리를 위한 플래그를 반환합니다.
+    파일 경로 또는 파일 객체에 따라 적합한 로더 객체를 반환하거나 OCR 처리를 위한 플래그를 반환합니다.
+    파일 객체(업로드 파일)는 UploadSpooler로 블록 단위 스풀링한 뒤 로더를 생성합니다.
+    이 경우 사용이 끝나면 UploadSpooler.release(loader.file_path)를 호출해야 합니다.
 
     Args:
-        file (File): 파일 객체
+        file (str | File): 파일 경로 또는 파일 객체
 
     Returns:
         (loader, use_ocr): 해당 파일 형식에 맞는 로더 객체 또는 None, OCR 필요 여부(bool)
     """
-    filename = file.name
+    is_path = isinstance(file, str)
+    filename = file if is_path else file.name
     _, ext = os.path.splitext(filename)
     ext = ext.lower()
-    temp_path = None
-
-    if ext in LOADER_MAP:
-        logging.info(f"Loading file with {LOADER_MAP[ext].__name__}: {filename}")
-        try:
-            # 파일명에서 공백만 언더스코어로 변경
-            safe_filename = filename.replace(' ', '_')
-            temp_dir = tempfile.gettempdir()
-            temp_path = os.path.join(temp_dir, safe_filename)
+    
+    if ext not in LOADER_MAP:
+        logging.warning(f"Unsupported file type: {filename}")
+        return None, False
+    
+    logging.info(f"Loading file with {LOADER_MAP[ext].__name__}: {filename}")
+    spooler = UploadSpooler.get_instance()
+    file_path = None
+    try:
+        if is_path:
+            file_path = file
+        else:
+            # 업로드 파일은 메모리에 통째로 올리지 않고 블록 단위로 스풀 디렉토리에 복사한다.
+            file_path = spooler.spool(file).path
             
-            with open(temp_path, 'wb') as temp_file:
-                temp_file.write(file.read())
-                
-            if ext == ".txt":
-                loader = LOADER_MAP[ext](temp_path, encoding="utf-8")
-            else:
-                loader = LOADER_MAP[ext](temp_path)
+        if ext == ".txt":
+            loader = LOADER_MAP[ext](file_path, encoding="utf-8")
+        else:
+            loader = LOADER_MAP[ext](file_path)
+        
+        return loader, False
             
-            return loader, False
-                
-        except Exception as e:
-            logging.error(f"Error initializing loader for {filename}: {e}", exc_info=True)
-            if temp_path and os.path.exists(temp_path):
-                os.remove(temp_path)
-            return None, False
+    except Exception as e:
+        logging.error(f"Error initializing loader for {filename}: {e}", exc_info=True)
+        if file_path and not is_path:
+            spooler.release(file_path)
+        return None, False
 
-def remove_page_number(text):
+def remove_page_number(text, repeated_lines=None):
     # 페이지 번호를 표시하는 듯한 문자열을 제거한다.
     # 대부분의 페이지 번호는 특정 줄에 위차하므로, 특정 중에 해당 값이 있는지를 확인하고
     # 만약에 그 값외에 다른 값의 텍스트 수가 10개 이하라면 해당 줄은 페이지 번호로 판단한다.
     # 그리고 해당 줄을 제거한다.
     
-    # 각각의 후보군은 다음과 같다. (<number>는 숫자를 의미한다.)
-    # 1. <number>/<number>
-    # 2. - <number> -
-    # 3. page <number>
-    # 4. <number> page
-    # 5. <number> of <number>
-    # 6. <number> 페이지
-    # 7. <number> 쪽
-    # 8. 페이지 <number> 
-    
+    # 각각의 후보군은 PAGE_NUMBER_PATTERNS에 정의되어 있다.
     # 각각의 후보군을 확인하고, 해당 값이 있는지 확인한다.
     # 만약에 해당 값이 있는 경우, 해당 줄을 위의 조건에 맞는지 확인하고, 맞다면 해당 줄을 제거한다.
-    # 코드는 아래와 같다.
     
-    # 페이지 번호를 표시하는 가능한 패턴들 정의 (대소문자 구분 안함)
-    patterns = [
-        r'\d+\s*/\s*\d+',       # 1. <number>/<number>
-        r'-\s*\d+\s*-',         # 2. - <number> -
-        r'page\s+\d+',          # 3. page <number>
-        r'\d+\s+page',          # 4. <number> page
-        r'\d+\s+of\s+\d+',      # 5. <number> of <number>
-        r'\d+\s*페이지',         # 6. <number> 페이지
-        r'\d+\s*쪽',             # 7. <number> 쪽
-        r'페이지\s*\d+'          # 8. 페이지 <number>
-    ]
-
-    # 패턴을 하나의 정규식으로 합침 (여러 패턴 중 하나라도 매칭되면 True)
-    combined_pattern = re.compile('(' + '|'.join(patterns) + ')', re.IGNORECASE)
+    # repeated_lines가 주어지면 문서 전체에서 반복되는 줄(머리말, 꼬리말 등)도 함께 제거한다.
 
     text_list = text.split('\n')
     cleaned_lines = []
@@ -163,65 +171,163 @@ def remove_page_number(text):
         token_count = len(stripped_line.split())
 
         # 패턴에 매칭되는지 확인
-        if token_count <= 10 and combined_pattern.search(stripped_line):
+        if token_count <= 10 and PAGE_NUMBER_PATTERN.search(stripped_line):
             # 페이지 번호로 추정되는 라인이므로 제거 (append 안함)
             continue
+        elif repeated_lines and line_signature(stripped_line) in repeated_lines:
+            # 여러 페이지에 반복되는 머리말/꼬리말이므로 제거
+            continue
         else:
             # 페이지 번호가 아니면 라인을 그대로 유지
             cleaned_lines.append(line)
 
     return '\n'.join(cleaned_lines)
+
+def line_signature(line):
+    """
+    반복 줄 비교를 위한 줄의 해시값을 반환합니다.
+    공백과 대소문자만 정규화하며, 숫자만 다른 줄(조항 번호 등)은 다른 줄로 취급합니다.
+    (숫자가 바뀌는 페이지 번호 줄은 PAGE_NUMBER_PATTERN으로 따로 제거합니다.)
+    """
+    normalized = WHITESPACE_PATTERN.sub(' ', line.strip()).lower()
+    if not normalized:
+        return None
+    return hash(normalized)
+
+def find_repeated_lines(page_texts, min_page_ratio=BOILERPLATE_MIN_PAGE_RATIO, min_pages=BOILERPLATE_MIN_PAGES):
+    """
+    여러 페이지에 반복해서 등장하는 줄(머리말, 꼬리말, 기밀 문구, 레터헤드 등)을 찾습니다.
+    페이지별로 줄 해시를 한번씩만 세는 방식으로 전체 문서를 한번만 훑습니다.
+
+    Args:
+        page_texts (list[str]): 페이지별 텍스트.
+        min_page_ratio (float): 전체 페이지 중 이 비율 이상에 등장하면 반복 줄로 판단.
+        min_pages (int): 이 페이지 수 미만의 문서는 판단하지 않음.
+
+    Returns:
+        set[int]: 반복 줄의 해시값 집합.
+    """
+    if len(page_texts) < min_pages:
+        return set()
+    
+    counts = Counter()
+    for text in page_texts:
+        # 같은 페이지 안에서 여러번 나온 줄은 한번만 센다.
+        signatures = {line_signature(line) for line in text.split('\n')}
+        signatures.discard(None)
+        counts.update(signatures)
+    
+    threshold = max(min_pages, math.ceil(len(page_texts) * min_page_ratio))
+    return {signature for signature, count in counts.items() if count >= threshold}
+
+def clean_document_pages(page_texts, strip_repeated=True):
+    """
+    문서 단위로 페이지 번호와 반복되는 머리말/꼬리말을 제거합니다.
+
+    Args:
+        page_texts (list[str]): 페이지별 텍스트.
+        strip_repeated (bool): 반복 줄 제거 여부. (페이지 단위로 로드되지 않는 형식은 False)
+
+    Returns:
+        list[str]: 정리된 페이지별 텍스트.
+    """
+    repeated_lines = find_repeated_lines(page_texts) if strip_repeated else set()
+    if repeated_lines:
+        logging.info(f"Found {len(repeated_lines)} repeated header/footer lines across {len(page_texts)} pages.")
+    return [remove_page_number(text, repeated_lines) for text in page_texts]
+
+def _load_file(loader, file_path):
+    """파일 하나를 로드하고, 텍스트가 부족한 페이지는 OCR로 보완한 뒤 페이지 번호/반복 줄을 제거합니다."""
+    loaded_docs = loader.load()
+    
+    if isinstance(loader, TabularLoader):
+        # 표 데이터는 행 블록 그대로 사용한다. (OCR, 페이지 번호 제거 대상이 아님)
+        return loaded_docs
+    
+    ocr_list = []
+    
+    for idx, doc in enumerate(loaded_docs):
+        result = doc.page_content
+        text_len = len(result)
+        meta_data = doc.metadata
         
+        if text_len < 15:
+            if not ocr_list:
+                with span("ocr_fallback", pages=len(loaded_docs)):
+                    ocr_list = extract_text_with_ocr(file_path, meta_data)
+
+            if ocr_list:
+                ocr_text = ocr_list[idx]
+            else:
+                ocr_text = ""
+                
+            if len(ocr_text) > text_len:
+                result = ocr_text
+        
+        doc.page_content = result
     
+    # 페이지 번호와 페이지마다 반복되는 머리말/꼬리말을 문서 단위로 제거한다.
+    strip_repeated = file_path.lower().endswith(PAGED_EXTENSIONS)
+    cleaned_texts = clean_document_pages([doc.page_content for doc in loaded_docs], strip_repeated=strip_repeated)
+    for doc, cleaned_text in zip(loaded_docs, cleaned_texts):
+        doc.page_content = cleaned_text
+    
+    return loaded_docs
 
 def load_documents(files):
     """
     다양한 파일 형식을 처리하고 Document 객체 리스트를 반환합니다.
 
     Args:
-        files (list): 처리할 파일 객체 리스트
+        files (list): 처리할 파일 경로 또는 파일 객체 리스트
 
     Returns:
         list[Document]: Document 객체 리스트
     """
     documents = []
+    # 이미지는 모아서 한번에 배치로 처리한다.
+    image_loaders = []
+    spooled_images = []
 
     for file in files:
         loader, use_ocr = get_loader(file)
-        file_path = loader.file_path
 
         if not loader:
             continue
+        
+        file_path = loader.file_path
+        file_name = file if isinstance(file, str) else file.name
+        
+        if isinstance(loader, ImageLoader):
+            image_loaders.append(loader)
+            if not isinstance(file, str):
+                spooled_images.append(file_path)
+            continue
 
         try:
-            loaded_docs = loader.load()
-            
-            ocr_list = []
-            
-            for idx, doc in enumerate(loaded_docs):
-                result = doc.page_content
-                text_len = len(result)
-                meta_data = doc.metadata
-                
-                if text_len < 15:
-                    if not ocr_list:
-                        ocr_list = extract_text_with_ocr(file_path, meta_data)
-
-                    if ocr_list:
-                        ocr_text = ocr_list[idx]
-                    else:
-                        ocr_text = ""
-                        
-                    if len(ocr_text) > text_len:
-                        result = ocr_text
-                
-                result = remove_page_number(result)
-                doc.page_content = result
+            with span("load_documents", file_id=file_name, bytes=os.path.getsize(file_path)) as load_span:
+                loaded_docs = _load_file(loader, file_path)
+                load_span["pages"] = len(loaded_docs)
+                load_span["chars"] = sum(len(doc.page_content) for doc in loaded_docs)
             
             documents.extend(loaded_docs)
-            logging.info(f"Loaded {len(loaded_docs)} documents from {file.name}")
+            logging.info(f"Loaded {len(loaded_docs)} documents from {file_name}")
             
         except Exception as e:
             raise e
+        finally:
+            # get_loader에서 스풀한 업로드 파일은 로드가 끝나면 참조를 반환한다.
+            if not isinstance(file, str):
+                UploadSpooler.get_instance().release(file_path)
+
+    if image_loaders:
+        try:
+            with span("image_ingest", images=len(image_loaders)):
+                image_docs = ImageLoader.load_batch(image_loaders)
+            documents.extend(image_docs)
+            logging.info(f"Loaded {len(image_docs)} images in batches")
+        finally:
+            for file_path in spooled_images:
+                UploadSpooler.get_instance().release(file_path)
 
     return documents
\ No newline at end of file
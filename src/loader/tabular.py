@@ -0,0 +1,201 @@
+# /src/loader/tabular.py
+import os
+import re
+import csv
+import codecs
+import logging
+import tiktoken
+from langchain.schema import Document
+from src.config import TABULAR_BLOCK_TOKENS, TABULAR_SAMPLE_VALUES
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+
+TABULAR_EXTENSIONS = (".csv", ".xlsx")
+
+# CSV 인코딩 후보. 한글 Excel에서 저장한 CSV는 보통 cp949(euc-kr 확장)다.
+CSV_ENCODINGS = ("utf-8-sig", "cp949", "euc-kr")
+
+NUMBER_PATTERN = re.compile(r'^[-+]?\d{1,3}(,\d{3})*(\.\d+)?$|^[-+]?\d+(\.\d+)?$')
+DATE_PATTERN = re.compile(r'^\d{4}[-./]\d{1,2}[-./]\d{1,2}')
+
+_encoding = tiktoken.get_encoding("cl100k_base")
+
+
+class ColumnStats:
+    """열 하나의 스키마 정보를 행을 읽으면서 누적한다."""
+
+    def __init__(self, name):
+        self.name = name
+        self.non_null = 0
+        self.type_counts = {"number": 0, "date": 0, "text": 0}
+        self.min_value = None
+        self.max_value = None
+        self.samples = []
+
+    def update(self, value):
+        if value is None or value == "":
+            return
+        self.non_null += 1
+
+        if NUMBER_PATTERN.match(value):
+            self.type_counts["number"] += 1
+            number = float(value.replace(",", ""))
+            self.min_value = number if self.min_value is None else min(self.min_value, number)
+            self.max_value = number if self.max_value is None else max(self.max_value, number)
+        elif DATE_PATTERN.match(value):
+            self.type_counts["date"] += 1
+        else:
+            self.type_counts["text"] += 1
+
+        if len(self.samples) < TABULAR_SAMPLE_VALUES and value not in self.samples:
+            self.samples.append(value[:50])
+
+    def describe(self):
+        column_type = max(self.type_counts, key=self.type_counts.get) if self.non_null else "empty"
+        description = f"- 열 '{self.name}' ({column_type}): 값 {self.non_null}개"
+        if column_type == "number" and self.min_value is not None:
+            description += f", 범위 {self.min_value:g} ~ {self.max_value:g}"
+        if self.samples:
+            description += f", 예: {', '.join(self.samples)}"
+        return description
+
+
+def _cell_to_str(value):
+    if value is None:
+        return ""
+    return str(value).strip()
+
+
+def detect_csv_encoding(file_path, encodings=CSV_ENCODINGS, block_size=1024 * 1024):
+    """
+    CSV 파일 전체를 오류 없이 디코딩할 수 있는 첫 번째 인코딩을 반환합니다.
+    블록 단위로 증분 디코딩하므로 파일 전체를 메모리에 올리지 않습니다.
+    """
+    for encoding in encodings:
+        decoder = codecs.getincrementaldecoder(encoding)()
+        try:
+            with open(file_path, "rb") as f:
+                while True:
+                    block = f.read(block_size)
+                    decoder.decode(block, final=not block)
+                    if not block:
+                        break
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    raise ValueError(f"Could not decode CSV file with any of {', '.join(encodings)}: {file_path}")
+
+
+def iter_tables(file_path):
+    """
+    표 파일을 (시트 이름, 행 iterator) 단위로 순회합니다. 행은 문자열 리스트이며 첫 행은 헤더입니다.
+    파일 전체를 메모리에 올리지 않고 한 행씩 읽습니다.
+    """
+    ext = os.path.splitext(file_path)[1].lower()
+
+    if ext == ".csv":
+        encoding = detect_csv_encoding(file_path)
+        if encoding != CSV_ENCODINGS[0]:
+            logging.info(f"Reading {file_path} as {encoding}")
+        with open(file_path, "r", encoding=encoding, newline="") as f:
+            yield None, csv.reader(f)
+
+    elif ext == ".xlsx":
+        from openpyxl import load_workbook
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            for sheet in workbook.worksheets:
+                rows = ([_cell_to_str(cell) for cell in row] for row in sheet.iter_rows(values_only=True))
+                yield sheet.title, rows
+        finally:
+            workbook.close()
+    else:
+        raise ValueError(f"Unsupported tabular file type: {file_path}")
+
+
+class TabularLoader:
+    """
+    CSV/XLSX 파일을 토큰 수 기준의 행 블록 Document로 변환하는 로더.
+
+    - 행을 한줄씩 읽으면서 블록을 만들고, 블록마다 헤더를 반복해서 넣는다.
+    - 블록이 곧 청크이므로 LLM 청킹을 거치지 않는다. (metadata["content_type"] == "table")
+    - 읽는 동안 열별 스키마 정보를 누적해서, 첫 블록의 metadata["table_summary"]에 문서 요약으로 넣는다.
+      (적재 파이프라인은 lazy_load()의 블록을 나눠서 저장하고, 다 읽은 뒤 table_summary 속성으로 요약을 저장한다)
+    """
+
+    def __init__(self, file_path, max_block_tokens=TABULAR_BLOCK_TOKENS):
+        self.file_path = file_path
+        self.max_block_tokens = max_block_tokens
+
+    def lazy_load(self):
+        block_no = 0
+        summaries = []
+
+        for sheet_name, rows in iter_tables(self.file_path):
+            header = next(rows, None)
+            if not header:
+                continue
+
+            columns = [ColumnStats(name or f"column_{i + 1}") for i, name in enumerate(header)]
+            header_line = " | ".join(column.name for column in columns)
+            header_tokens = len(_encoding.encode(header_line))
+
+            block_lines = []
+            block_tokens = header_tokens
+            block_row_start = 1
+            row_count = 0
+
+            for row in rows:
+                if not any(row):
+                    continue
+                row_count += 1
+                for column, value in zip(columns, row):
+                    column.update(value)
+
+                line = " | ".join(row)
+                line_tokens = len(_encoding.encode(line))
+
+                if block_lines and block_tokens + line_tokens > self.max_block_tokens:
+                    yield self._make_block(block_no, sheet_name, header_line, block_lines, block_row_start, row_count - 1)
+                    block_no += 1
+                    block_lines = []
+                    block_tokens = header_tokens
+                    block_row_start = row_count
+
+                block_lines.append(line)
+                block_tokens += line_tokens
+
+            if block_lines:
+                yield self._make_block(block_no, sheet_name, header_line, block_lines, block_row_start, row_count)
+                block_no += 1
+
+            sheet_label = f" (시트: {sheet_name})" if sheet_name else ""
+            summaries.append(
+                f"표{sheet_label}: 총 {row_count}행, {len(columns)}열\n"
+                + "\n".join(column.describe() for column in columns)
+            )
+
+        self.table_summary = (
+            f"표 데이터 파일 {os.path.basename(self.file_path)}의 열 구성 요약\n\n" + "\n\n".join(summaries)
+        )
+
+    def load(self):
+        documents = list(self.lazy_load())
+        if documents:
+            # 스키마 요약은 모든 행을 읽은 뒤에야 완성되므로 마지막에 첫 블록에 넣는다.
+            documents[0].metadata["table_summary"] = self.table_summary
+        logging.info(f"Loaded {len(documents)} row blocks from {self.file_path}")
+        return documents
+
+    def _make_block(self, block_no, sheet_name, header_line, lines, row_start, row_end):
+        metadata = {
+            "source": self.file_path,
+            "file_path": self.file_path,
+            "page": block_no,
+            "content_type": "table",
+            "row_start": row_start,
+            "row_end": row_end,
+        }
+        if sheet_name:
+            metadata["sheet"] = sheet_name
+        return Document(page_content=header_line + "\n" + "\n".join(lines) + "\n", metadata=metadata)
@@ -0,0 +1,157 @@
+# /src/loader/upload_spooler.py
+import os
+import time
+import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+from dataclasses import dataclass
+from src.config import UPLOAD_SPOOL_DIR, UPLOAD_SPOOL_BLOCK_SIZE, UPLOAD_SPOOL_MAX_AGE
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+
+
+@dataclass
+class SpooledUpload:
+    path: str
+    content_hash: str
+    size: int
+    reused: bool  # 같은 내용의 파일이 이미 스풀되어 있어 재사용했는지 여부
+
+
+class UploadSpooler:
+    """
+    업로드된 파일을 디스크로 옮기는 스풀러.
+
+    - 파일 전체를 메모리에 올리지 않고 고정 크기 블록 단위로 복사하면서 내용 해시를 계산한다.
+    - 스풀 파일은 <UPLOAD_SPOOL_DIR>/<내용 해시>/<파일명> 에 저장되므로,
+      같은 이름의 서로 다른 파일이 동시에 업로드되어도 덮어쓰지 않고, 같은 파일은 한번만 저장된다.
+    - 참조 카운트로 관리하며, 마지막 사용자가 release하면 스풀 파일을 삭제한다.
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, spool_dir=UPLOAD_SPOOL_DIR, block_size=UPLOAD_SPOOL_BLOCK_SIZE):
+        self.spool_dir = spool_dir
+        self.block_size = block_size
+        self._refcounts = {}
+        self._lock = threading.Lock()
+
+        os.makedirs(self.spool_dir, exist_ok=True)
+        self.purge_stale()
+
+    def spool(self, file):
+        """
+        업로드 파일 객체를 스풀 디렉토리로 복사하고 참조를 하나 획득합니다.
+
+        Args:
+            file: read(size)를 지원하는 파일 객체 (Streamlit UploadedFile 등). name 속성이 필요합니다.
+
+        Returns:
+            SpooledUpload: 스풀된 파일 정보. 사용이 끝나면 release(path)를 호출해야 합니다.
+        """
+        if hasattr(file, "seek"):
+            file.seek(0)
+
+        hasher = hashlib.md5()
+        size = 0
+
+        # 해시를 모르는 상태이므로 임시 파일에 먼저 복사한 뒤, 해시 경로로 옮긴다.
+        fd, partial_path = tempfile.mkstemp(dir=self.spool_dir, suffix=".partial")
+        try:
+            with os.fdopen(fd, "wb") as spool_file:
+                while True:
+                    block = file.read(self.block_size)
+                    if not block:
+                        break
+                    hasher.update(block)
+                    spool_file.write(block)
+                    size += len(block)
+
+            content_hash = hasher.hexdigest()
+            path = self.spool_path(content_hash, file.name)
+
+            with self._lock:
+                reused = os.path.exists(path)
+                if reused:
+                    os.remove(partial_path)
+                else:
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    os.replace(partial_path, path)
+                self._refcounts[path] = self._refcounts.get(path, 0) + 1
+        except Exception:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            raise
+
+        logging.info(f"Spooled {file.name} ({size} bytes, hash={content_hash}, reused={reused})")
+        return SpooledUpload(path=path, content_hash=content_hash, size=size, reused=reused)
+
+    def spool_path(self, content_hash, filename):
+        """내용 해시와 파일명으로 스풀 경로를 만듭니다. 파일명의 공백은 언더스코어로 변경합니다."""
+        safe_filename = os.path.basename(filename).replace(' ', '_')
+        return os.path.join(self.spool_dir, content_hash, safe_filename)
+
+    def release(self, path):
+        """참조를 하나 반환하고, 더 이상 참조가 없으면 스풀 파일을 삭제합니다. 참조하지 않은 경로는 무시합니다."""
+        with self._lock:
+            if path not in self._refcounts:
+                logging.warning(f"Ignoring release of untracked spool path: {path}")
+                return
+            count = self._refcounts[path] - 1
+            if count > 0:
+                self._refcounts[path] = count
+                return
+            self._refcounts.pop(path, None)
+            self._remove(path)
+
+    def detach(self, path):
+        """
+        파일을 삭제하지 않고 이 프로세스의 참조만 반환합니다.
+        다른 프로세스(적재 워커)가 파일을 넘겨받아 처리한 뒤 discard로 삭제할 때 사용합니다.
+        """
+        with self._lock:
+            count = self._refcounts.get(path, 0) - 1
+            if count > 0:
+                self._refcounts[path] = count
+            else:
+                self._refcounts.pop(path, None)
+
+    def discard(self, path):
+        """참조 카운트와 관계없이 스풀 파일을 삭제합니다. (넘겨받은 파일의 처리가 끝났을 때)"""
+        with self._lock:
+            self._refcounts.pop(path, None)
+            self._remove(path)
+
+    def purge_stale(self, max_age=UPLOAD_SPOOL_MAX_AGE):
+        """비정상 종료 등으로 남은, 참조가 없는 오래된 스풀 파일을 정리합니다."""
+        now = time.time()
+        for entry in os.scandir(self.spool_dir):
+            if now - entry.stat().st_mtime < max_age:
+                continue
+            with self._lock:
+                if any(path.startswith(entry.path) for path in self._refcounts):
+                    continue
+                if entry.is_dir():
+                    shutil.rmtree(entry.path, ignore_errors=True)
+                else:
+                    os.remove(entry.path)
+
+    def _remove(self, path):
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+            parent = os.path.dirname(path)
+            if parent != self.spool_dir and not os.listdir(parent):
+                os.rmdir(parent)
+        except OSError as e:
+            logging.warning(f"Could not remove spooled file {path}: {e}")
@@ -0,0 +1,251 @@
+# /src/metrics.py
+import json
+import time
+import logging
+import threading
+from bisect import bisect_left
+from collections import deque, OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.config import METRICS_PORT, METRICS_RECENT_SPANS, METRICS_MAX_REPORTS
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+
+# 소요 시간 히스토그램 버킷 (초)
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+# 현재 처리 중인 파일의 ingest report (중첩된 span이 자동으로 같은 report에 기록된다)
+_current_report = ContextVar("current_ingest_report", default=None)
+
+
+class Histogram:
+    def __init__(self, buckets=DURATION_BUCKETS):
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        index = bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            self.bucket_counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative_counts(self):
+        total = 0
+        for count in self.bucket_counts:
+            total += count
+            yield total
+
+
+class MetricsRegistry:
+    """
+    단계(stage)별 소요 시간 히스토그램과 처리량 카운터를 모으는 프로세스 전역 레지스트리.
+    Prometheus 텍스트 포맷과 JSON으로 내보낼 수 있다.
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.durations = {}  # stage -> Histogram
+        self.counters = {}  # (name, stage) -> float
+        self.recent_spans = deque(maxlen=METRICS_RECENT_SPANS)
+        self.reports = OrderedDict()  # file_id -> ingest report (최근 METRICS_MAX_REPORTS개)
+
+    def record_span(self, record):
+        stage = record["stage"]
+        with self._lock:
+            self.durations.setdefault(stage, Histogram()).observe(record["duration"])
+            self.counters[("spans", stage)] = self.counters.get(("spans", stage), 0) + 1
+            if record.get("error"):
+                self.counters[("errors", stage)] = self.counters.get(("errors", stage), 0) + 1
+            # 숫자형 속성(페이지 수, 청크 수, 토큰 수, 바이트 등)은 단계별 누적 카운터로 집계한다.
+            for key, value in record.items():
+                if key in ("duration", "start") or isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                self.counters[(key, stage)] = self.counters.get((key, stage), 0) + value
+            self.recent_spans.append(record)
+
+    def inc(self, name, value=1, stage="global"):
+        with self._lock:
+            self.counters[(name, stage)] = self.counters.get((name, stage), 0) + value
+
+    def render_prometheus(self):
+        """Prometheus text exposition 포맷으로 변환합니다."""
+        lines = [
+            "# HELP rag_stage_duration_seconds Duration of ingest/query stages.",
+            "# TYPE rag_stage_duration_seconds histogram",
+        ]
+        with self._lock:
+            for stage, histogram in sorted(self.durations.items()):
+                for bucket, count in zip(histogram.buckets, histogram.cumulative_counts()):
+                    lines.append(f'rag_stage_duration_seconds_bucket{{stage="{stage}",le="{bucket}"}} {count}')
+                lines.append(f'rag_stage_duration_seconds_bucket{{stage="{stage}",le="+Inf"}} {histogram.count}')
+                lines.append(f'rag_stage_duration_seconds_sum{{stage="{stage}"}} {histogram.sum}')
+                lines.append(f'rag_stage_duration_seconds_count{{stage="{stage}"}} {histogram.count}')
+
+            names = sorted({name for name, _ in self.counters})
+            for name in names:
+                lines.append(f"# TYPE rag_stage_{name}_total counter")
+                for (counter_name, stage), value in sorted(self.counters.items()):
+                    if counter_name == name:
+                        lines.append(f'rag_stage_{name}_total{{stage="{stage}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def to_dict(self):
+        """JSON으로 내보낼 수 있는 형태로 변환합니다."""
+        with self._lock:
+            return {
+                "durations": {
+                    stage: {
+                        "count": histogram.count,
+                        "sum": histogram.sum,
+                        "buckets": dict(zip(map(str, histogram.buckets), histogram.cumulative_counts())),
+                    }
+                    for stage, histogram in self.durations.items()
+                },
+                "counters": [
+                    {"name": name, "stage": stage, "value": value}
+                    for (name, stage), value in self.counters.items()
+                ],
+                "recent_spans": list(self.recent_spans),
+                "reports": dict(self.reports),
+            }
+
+    def dump_json(self, path=None):
+        """메트릭을 JSON 문자열로 반환하고, path가 주어지면 파일로 저장합니다."""
+        data = json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(data)
+        return data
+
+
+@contextmanager
+def span(stage, **attrs):
+    """
+    단계 하나의 소요 시간과 속성을 기록하는 span.
+
+    with span("add_documents", chunks=len(docs)) as s:
+        ...
+        s["bytes"] = total_bytes  # 실행 중에 속성을 추가할 수 있다.
+
+    Args:
+        stage (str): 단계 이름 (load_documents, ocr_fallback, llm_chunking, add_documents 등).
+        **attrs: file_id, pages, chunks, tokens, bytes 등 함께 기록할 속성.
+    """
+    record = dict(attrs)
+    report = _current_report.get()
+    if report is not None:
+        record.setdefault("file_id", report["file_id"])
+
+    start = time.perf_counter()
+    record["start"] = time.time()
+    try:
+        yield record
+    except Exception as e:
+        record["error"] = repr(e)
+        raise
+    finally:
+        record["stage"] = stage
+        record["duration"] = time.perf_counter() - start
+        MetricsRegistry.get_instance().record_span(record)
+        if report is not None:
+            report["stages"].append(record)
+        logging.info(f"[span] {json.dumps(record, ensure_ascii=False, default=str)}")
+
+
+@contextmanager
+def ingest_report(file_id, file_name=None):
+    """
+    파일 하나의 ingest 과정에서 발생한 모든 span을 모으는 report.
+    with 블록 안에서 실행된 span은 자동으로 이 report에 기록됩니다.
+
+    Returns:
+        dict: {"file_id", "file_name", "stages": [span record...], "duration"}
+    """
+    report = {"file_id": file_id, "file_name": file_name or file_id, "stages": [], "started_at": time.time()}
+    token = _current_report.set(report)
+    start = time.perf_counter()
+    try:
+        yield report
+    finally:
+        report["duration"] = time.perf_counter() - start
+        _current_report.reset(token)
+        registry = MetricsRegistry.get_instance()
+        with registry._lock:
+            registry.reports[file_id] = report
+            registry.reports.move_to_end(file_id)
+            while len(registry.reports) > METRICS_MAX_REPORTS:
+                registry.reports.popitem(last=False)
+
+
+def summarize_report(report):
+    """ingest report를 단계별 합계(횟수, 소요 시간, 숫자형 속성 합)로 요약합니다. UI 표시용."""
+    summary = {}
+    for record in report["stages"]:
+        row = summary.setdefault(record["stage"], {"stage": record["stage"], "count": 0, "duration": 0.0})
+        row["count"] += 1
+        row["duration"] += record["duration"]
+        for key, value in record.items():
+            if key in ("duration", "start") or isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            row[key] = row.get(key, 0) + value
+    return list(summary.values())
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        registry = MetricsRegistry.get_instance()
+        if self.path == "/metrics":
+            body = registry.render_prometheus().encode("utf-8")
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        elif self.path == "/metrics.json":
+            body = registry.dump_json().encode("utf-8")
+            content_type = "application/json; charset=utf-8"
+        else:
+            self.send_error(404)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # 스크래핑 요청마다 로그가 쌓이지 않도록 한다.
+        pass
+
+
+_server = None
+_server_lock = threading.Lock()
+
+def start_metrics_server(port=METRICS_PORT):
+    """
+    /metrics(Prometheus 텍스트)와 /metrics.json을 노출하는 HTTP 서버를 백그라운드 스레드로 실행합니다.
+    프로세스당 한번만 실행되며, 이미 실행 중이면 아무것도 하지 않습니다.
+    """
+    global _server
+    with _server_lock:
+        if _server is not None:
+            return _server
+        try:
+            _server = ThreadingHTTPServer(("0.0.0.0", port), _MetricsHandler)
+        except OSError as e:
+            logging.warning(f"Could not start metrics server on port {port}: {e}")
+            return None
+        threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+        logging.info(f"Metrics server started on port {port} (/metrics, /metrics.json)")
+        return _server
@@ -0,0 +1,142 @@
+# /src/preprocessing/chunk_cache.py
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from src.metrics import MetricsRegistry
+from src.config import (
+        CHUNK_CACHE_PATH,
+        CHUNK_CACHE_MAX_BYTES,
+        CHUNK_CACHE_ENABLED,
+    )
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+
+
+def content_key(total_content, prompt_version, model):
+    """전체 텍스트 해시, 프롬프트 버전, 모델로 캐시 키를 만듭니다."""
+    content_hash = hashlib.sha256(total_content.encode("utf-8")).hexdigest()
+    return f"{content_hash}:{prompt_version}:{model}"
+
+
+class ChunkingCache:
+    """
+    검증을 통과한 LLM 청킹 결과(요약 + 청크 범위)를 저장하는 SQLite 캐시.
+
+    - 키는 (전체 텍스트 해시, 프롬프트 버전, 모델)이라 파일을 옮기거나 벡터스토어를 다시 만들어도
+      같은 텍스트면 LLM을 호출하지 않는다.
+    - 청크 본문은 전체 텍스트에서 다시 잘라낼 수 있으므로 범위만 저장한다.
+    - 전체 크기가 max_bytes를 넘으면 가장 오래 사용하지 않은 항목부터 삭제한다. (LRU)
+    - 적중/미스 횟수를 누적해서 stats()와 메트릭(chunk_cache_hits/misses)으로 보고한다.
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, path=CHUNK_CACHE_PATH, max_bytes=CHUNK_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS chunking_cache (
+                    key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_chunking_cache_access ON chunking_cache(last_access)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS cache_stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+
+    def get(self, key):
+        """
+        캐시된 청킹 결과를 반환합니다. 없으면 None.
+
+        Returns:
+            dict | None: {"summary": {...}, "chunks": [{"id", "content_range", ...}]}
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT response FROM chunking_cache WHERE key = ?", (key,)).fetchone()
+            if row:
+                self._conn.execute("UPDATE chunking_cache SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._increment("hits" if row else "misses")
+
+        MetricsRegistry.get_instance().inc("chunk_cache_hits" if row else "chunk_cache_misses", stage="preprocess_documents")
+        return json.loads(row[0]) if row else None
+
+    def put(self, key, json_data):
+        """검증된 청킹 결과를 저장합니다. 청크 본문(content)은 제외하고 범위만 저장합니다."""
+        response = {
+            "summary": json_data.get("summary", {}),
+            "chunks": [
+                {k: v for k, v in chunk.items() if k != "content"}
+                for chunk in json_data.get("chunks", [])
+            ],
+        }
+        data = json.dumps(response, ensure_ascii=False)
+        now = time.time()
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO chunking_cache (key, response, size, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, data, len(data.encode("utf-8")), now, now),
+            )
+            self._evict()
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM chunking_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        evicted = 0
+        for key, size in self._conn.execute("SELECT key, size FROM chunking_cache ORDER BY last_access").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM chunking_cache WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+
+        self._increment("evictions", evicted)
+        logging.info(f"Chunking cache evicted {evicted} entries (size: {total} bytes)")
+
+    def _increment(self, name, value=1):
+        self._conn.execute(
+            "INSERT INTO cache_stats (name, value) VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, value),
+        )
+
+    def stats(self):
+        """항목 수, 전체 크기, 누적 적중/미스/삭제 횟수와 적중률을 반환합니다."""
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM chunking_cache").fetchone()
+            counts = dict(self._conn.execute("SELECT name, value FROM cache_stats").fetchall())
+
+        hits, misses = counts.get("hits", 0), counts.get("misses", 0)
+        return {
+            "entries": entries,
+            "bytes": size,
+            "hits": hits,
+            "misses": misses,
+            "evictions": counts.get("evictions", 0),
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+        }
+
+
+def get_chunking_cache():
+    """CHUNK_CACHE_ENABLED가 꺼져있으면 None을 반환합니다."""
+    return ChunkingCache.get_instance() if CHUNK_CACHE_ENABLED else None
@@ -8,74 +8,70 @@ def generate_doc_id(file_path):
     """파일 경로 기반으로 문서를 식별하는 doc_id 생성."""
     return hashlib.md5(file_path.encode('utf-8')).hexdigest()
 
-def generate_metadata(doc_data:dict, file_path, origin_metadatas, version="1", is_latest=True):
+def generate_chunk_id(doc_id, content_hash, position):
+    """
+    청크 id 생성. 같은 문서의 같은 내용/순서면 항상 같은 id가 되므로, 다시 적재해도 중복 저장되지 않는다.
+    (position은 같은 내용의 청크가 한 문서에 여러번 나오는 경우를 구분한다)
+    """
+    return hashlib.md5(f"{doc_id}:{content_hash}:{position}".encode('utf-8')).hexdigest()
+
+# 문서 단위 속성. 벡터스토어에 저장할 때는 청크 메타데이터에서 빼고 카탈로그의 documents 테이블에 한번만 저장한다.
+DOCUMENT_FIELDS = ("doc_id", "path", "file_name", "last_modified", "version", "is_latest")
+
+def parse_page_span(source_pages):
+    """source_pages(3 또는 "3~5")를 (시작, 끝) 페이지로 변환한다. 알 수 없으면 None."""
+    if isinstance(source_pages, (int, float)):
+        return int(source_pages), int(source_pages)
+    if isinstance(source_pages, str) and source_pages:
+        parts = source_pages.split("~")
+        try:
+            return int(parts[0]), int(parts[-1])
+        except ValueError:
+            return None
+    return None
+
+def compact_metadata(metadata, doc_key):
+    """
+    저장용 청크 메타데이터. 문서 단위 속성은 doc_key(카탈로그 documents 테이블의 정수 키)로 대체하고,
+    source_pages는 정수 2개(page_start, page_end)로 저장한다. 원본 metadata는 바꾸지 않는다.
+    """
+    compact = {key: value for key, value in metadata.items() if key not in DOCUMENT_FIELDS and key != "source_pages"}
+    compact["doc_key"] = doc_key
+    span = parse_page_span(metadata.get("source_pages"))
+    if span:
+        compact["page_start"], compact["page_end"] = span
+    return compact
+
+def expand_metadata(metadata, document):
+    """
+    compact_metadata로 저장된 메타데이터에 문서 속성(document)을 합쳐서 generate_metadata와 같은 형태로 되돌린다.
+    이미 문서 속성이 있는 메타데이터(이전 형식)는 그대로 반환한다.
+    """
+    if not metadata or "doc_key" not in metadata or "doc_id" in metadata or document is None:
+        return metadata
+    expanded = dict(metadata)
+    expanded.update(document)
+    start, end = expanded.pop("page_start", None), expanded.pop("page_end", None)
+    if start is not None:
+        expanded["source_pages"] = start if start == end else f"{start}~{end}"
+    return expanded
+
+def generate_metadata(doc_data:dict, file_path, page_index, version="1", is_latest=True):
     # chunking을 새롭게 처리했기 때문에.
     # 해당 chunking에 맞게 페이지값을 처리해야한다.
-    # origin_metadatas에는 기존의 문서 하나의 페이지에 대한 content_range값이 들어있다.
-    # 그러니 doc_data의 content_range값을 이용해서, 기존의 페이지 값을 가져온다.
-    # 방법은 doc_data의 content_range값의 start와 end를 가져와서
-    # origin_metadatas를 순환하며, 해당 페이지의 content_range값을 확인할 수 있으니까.
-    # 그 시작값이 start보다 작거나 같다면, 일단 해당 페이지는 해당 doc의 첫 페이지이며.
-    # 또다시 순환하면서, 특정 페이지의 끝값이 end보다 크거나 같다면, 해당 페이지는 해당 doc의 마지막 페이지이다.
-    # 그걸 이용해서 시작 페이지 넘버와 끝 페이지 넘버를 가져온뒤
-    # 리스트에 넣을때는 그 시작넘버와 끝넘버의 사이 정수들까지 찾아서 모두 넣는다.
+    # page_index(PageOffsetIndex)는 문서 단위로 한번만 만들어지며, 각 페이지의 content_range를 누적합으로 가지고 있다.
+    # doc_data의 content_range를 bisect로 찾아 시작 페이지와 끝 페이지, 그 사이의 페이지들을 가져온다.
     
     content = doc_data["content"]
     
     # content_range가 있는지 확인한다.
     if "content_range" not in doc_data:
         # metadata의 모든 페이지값을 넣는다.
-        page_list = [i["page"] + 1 for i in origin_metadatas]
+        page_list = list(page_index.page_numbers)
         content_role = "summary"
     else:
-        doc_content_range = doc_data["content_range"]
-        doc_start = doc_content_range[0]
-        doc_end = doc_content_range[1]
-        
-        start_page = end_page = page_list = selected_start = selected_end = None
-        
-        # origin_metadata를 page순으로 정렬한다.
-        origin_metadatas = sorted(origin_metadatas, key=lambda x: x["page"])
-        
-        start_list = [i["content_range"][0] for i in origin_metadatas]
-        end_list = [i["content_range"][1] for i in origin_metadatas]
-        
-        # start_list와 end_list를 정렬한다.
-        start_list.sort()
-        end_list.sort()
-        
-        # start_list에서 doc_start보다 작거나 같은 값들 중 가장 큰 값을 가져온다.
-        for i in start_list:
-            if i <= doc_start:
-                selected_start = i
-            else:
-                break
-        
-        # end_list에서 doc_end보다 크거나 같은 값들 중 가장 작은 값을 가져온다.
-        for i in end_list:
-            if i >= doc_end:
-                selected_end = i
-                break
-        
-        # origin_metadatas를 돌면서 content_range값을 확인한 뒤
-        # selected_start와 같은 값을 ["content_range"][0]에 가지고 있는 페이지를 시작페이지로,
-        # selected_end와 같은 값을 ["content_range"][1]에 가지고 있는 페이지를 끝페이지로 설정한다.
-        
-        # content_range의 start와 end값을 가져온다.
-        for i in origin_metadatas:
-            start = i["content_range"][0]
-            end = i["content_range"][1]
-            
-            if start == selected_start:
-                start_page = i["page"] + 1
-                
-            if end == selected_end:
-                end_page = i["page"] + 1
-                
-            if start_page and end_page:
-                break
-            
-        page_list = list(range(start_page, end_page + 1))
+        doc_start, doc_end = page_index.clamp(*doc_data["content_range"])
+        page_list = page_index.pages_for_range(doc_start, doc_end)
         content_role = "chunking"
         
     if len(page_list) == 1:
@@ -108,6 +104,11 @@ def generate_metadata(doc_data:dict, file_path, origin_metadatas, version="1", i
         "is_latest": is_latest,
     }
     
+    # 청크는 전체 텍스트 기준의 범위를 함께 저장한다. (Chroma 메타데이터는 리스트를 지원하지 않아 정수 2개로 저장)
+    if content_role == "chunking":
+        metadata["content_start"] = doc_start
+        metadata["content_end"] = doc_end
+    
     return metadata
 
 
@@ -0,0 +1,77 @@
+# /src/preprocessing/page_index.py
+from bisect import bisect_right
+from itertools import accumulate
+
+
+class PageOffsetIndex:
+    """
+    문서 전체 텍스트(total_content)에서 각 페이지가 차지하는 범위를 관리하는 인덱스.
+
+    페이지 텍스트를 구분자 없이("") 이어붙인다는 전제로 누적합(prefix sum)을 한번만 계산하고,
+    이후 글자 위치 -> 페이지 변환은 bisect로 O(log pages)에 처리한다.
+    전처리, 메타데이터 생성, 청크 슬라이싱이 모두 같은 인덱스를 사용해야 범위가 어긋나지 않는다.
+
+    범위는 파이썬 슬라이스와 같이 [start, end) 형태다.
+    """
+
+    def __init__(self, page_lengths, page_numbers=None):
+        """
+        Args:
+            page_lengths (list[int]): 이어붙이는 순서대로의 페이지 텍스트 길이.
+            page_numbers (list[int], optional): 각 페이지의 (1부터 시작하는) 페이지 번호. 없으면 순서대로 1, 2, ...
+        """
+        self.ends = list(accumulate(page_lengths))
+        self.starts = [0] + self.ends[:-1]
+        self.page_numbers = page_numbers or list(range(1, len(page_lengths) + 1))
+        self.total_length = self.ends[-1] if self.ends else 0
+
+    @classmethod
+    def from_documents(cls, documents):
+        """
+        로더가 반환한 페이지 단위 Document 리스트로 인덱스를 생성합니다.
+        metadata의 "page"(0부터 시작)가 있으면 사용하고, 없으면 순서대로 번호를 부여합니다.
+        """
+        page_numbers = []
+        for position, doc in enumerate(documents):
+            page = doc.metadata.get("page")
+            page_numbers.append(int(page) + 1 if page is not None else position + 1)
+        return cls([len(doc.page_content) for doc in documents], page_numbers)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def ranges(self):
+        """페이지별 [start, end) 범위 리스트를 반환합니다."""
+        return [[start, end] for start, end in zip(self.starts, self.ends)]
+
+    def clamp(self, start, end):
+        """범위를 전체 텍스트 안으로 제한합니다."""
+        start = min(max(int(start), 0), self.total_length)
+        end = min(max(int(end), start), self.total_length)
+        return start, end
+
+    def position_at(self, offset):
+        """글자 위치가 속한 페이지의 순서(0부터)를 반환합니다. 빈 페이지는 건너뜁니다."""
+        if not self.starts:
+            return None
+        offset = min(max(offset, 0), max(self.total_length - 1, 0))
+        return max(bisect_right(self.starts, offset) - 1, 0)
+
+    def page_at(self, offset):
+        """글자 위치가 속한 페이지 번호를 반환합니다."""
+        position = self.position_at(offset)
+        return None if position is None else self.page_numbers[position]
+
+    def pages_for_range(self, start, end):
+        """
+        [start, end) 범위가 걸쳐있는 페이지 번호 리스트를 반환합니다.
+
+        Returns:
+            list[int]: 범위에 포함된 페이지 번호 (이어붙인 순서).
+        """
+        start, end = self.clamp(start, end)
+        first = self.position_at(start)
+        if first is None:
+            return []
+        last = self.position_at(end - 1) if end > start else first
+        return self.page_numbers[first:last + 1]
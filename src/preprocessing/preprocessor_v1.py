@@ -6,9 +6,16 @@ import logging
 from src.query.query import generate_response
 from langchain.schema import Document
 from src.preprocessing.metadata_manager_v1 import generate_metadata, manage_versions
+from src.preprocessing.page_index import PageOffsetIndex
+from src.preprocessing.chunk_cache import get_chunking_cache, content_key
+from src.metrics import span
+from src.config import LLM_PROVIDER, CHUNKING_MODEL
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
 
+# 청킹 프롬프트(create_summary_prompt)나 응답 형식을 바꾸면 올려야 한다. (청킹 캐시 키에 포함)
+CHUNKING_PROMPT_VERSION = "1"
+
 def create_summary_prompt(data, total_content_text_count):
     
     minimum_chunk_count =  total_content_text_count // 500
@@ -62,12 +69,13 @@ def create_summary_prompt(data, total_content_text_count):
 
     return prompt
 
-def set_document_data(documents_json_data, file_path, origin_metadatas):
+def set_document_data(documents_json_data, file_path, page_index):
     """
     문서 데이터를 Document 객체로 변환합니다.
 
     Args:
         documents_json_data (list[dict]): 문서 데이터 리스트.
+        page_index (PageOffsetIndex): 원본 문서의 페이지 범위 인덱스.
 
     Returns:
         list[Document]: Document 객체 리스트.
@@ -77,7 +85,7 @@ def set_document_data(documents_json_data, file_path, origin_metadatas):
         
         if key == "summary":
             doc_data = value
-            metadata = generate_metadata(doc_data, file_path, origin_metadatas)
+            metadata = generate_metadata(doc_data, file_path, page_index)
             
             doc = Document(
                     page_content=doc_data["content"],
@@ -87,7 +95,7 @@ def set_document_data(documents_json_data, file_path, origin_metadatas):
             
         elif key == "chunks":
             for doc_data in value:
-                metadata = generate_metadata(doc_data, file_path, origin_metadatas)
+                metadata = generate_metadata(doc_data, file_path, page_index)
         
                 doc = Document(
                     page_content=doc_data["content"],
@@ -113,42 +121,98 @@ def is_json_response(response_content):
     except json.JSONDecodeError:
         return False
     
-def set_response_content(response, total_content):
+def set_response_content(response, total_content, page_index):
     # 현재 response에 있는 데이터중 key값이 summary인 하나만 제외하고는 모두 content가 없다.
     # 왜냐면 chunking을 처리해서, 해당 페이지의 내용을 가져온게 아니라
     # 해당 청크의 범위를 가져온것이기 때문이다.
     # 그래서 total_content를 기반으로 response의 각 chunk의 content를 채워넣어야한다.
+    # 범위는 page_index와 같은 기준([start, end))으로 보정해서 슬라이싱한다.
     
     total_overlap = 0
     prev_chunk = None
+    last_value = 0
     
     chunks = response.get("chunks")
     
     # id로 정렬한다.
     chunks = sorted(chunks, key=lambda x: x["id"])
-    chunk_count = len(chunks)
     
     for i in chunks:
-        id = i["id"]
-        content_range = i["content_range"]
-        chunk_content = total_content[content_range[0]:content_range[1]]
-        
-        i["content"] = chunk_content
+        start, end = page_index.clamp(*i["content_range"])
+        i["content_range"] = [start, end]
+        i["content"] = total_content[start:end]
         
         if prev_chunk:
-            prev_content_range = prev_chunk["content_range"]
-            overlap = content_range[0] - prev_content_range[1] - 1
+            # 양수면 이전 청크와의 간격, 음수면 겹친 길이
+            overlap = start - prev_chunk["content_range"][1]
             total_overlap += overlap
             
-        if i["id"] == chunk_count:
-            last_value = content_range[1]
+        last_value = max(last_value, end)
         prev_chunk = i
     
     response["chunks"] = chunks
     
     return response, total_overlap, last_value
 
+def preprocess_tabular_blocks(blocks, content_offset=0):
+    """
+    표 데이터의 행 블록 묶음을 LLM 청킹 없이 그대로 청크로 변환합니다. (요약 제외)
+    행 블록을 나눠서 저장할 때는 묶음마다 호출하고, 요약은 tabular_summary_document로 따로 만듭니다.
+
+    Args:
+        blocks (list[Document]): TabularLoader가 반환한 행 블록 리스트.
+        content_offset (int): 묶음의 첫 블록이 파일 전체 텍스트에서 시작하는 위치.
+
+    Returns:
+        list[Document]: 행 블록 청크 Document 리스트.
+    """
+    file_path = blocks[0].metadata.get("file_path")
+    page_index = PageOffsetIndex.from_documents(blocks)
+    json_data = {
+        "chunks": [
+            {"id": i + 1, "content_range": content_range, "content": doc.page_content}
+            for i, (doc, content_range) in enumerate(zip(blocks, page_index.ranges()))
+        ],
+    }
+    
+    chunks = set_document_data(documents_json_data=json_data, file_path=file_path, page_index=page_index)
+    for chunk in chunks:
+        chunk.metadata["content_start"] += content_offset
+        chunk.metadata["content_end"] += content_offset
+    return chunks
+
+def tabular_summary_document(file_path, table_summary, page_index):
+    """표 데이터의 열 구성 요약(table_summary)으로 문서 요약 Document를 만듭니다. page_index는 파일 전체 블록의 인덱스입니다."""
+    return set_document_data(
+        documents_json_data={"summary": {"content": table_summary}}, file_path=file_path, page_index=page_index
+    )[0]
+
+def preprocess_tabular_documents(documents):
+    """
+    표 데이터(CSV/XLSX)의 행 블록을 LLM 청킹 없이 그대로 청크로 사용합니다.
+    문서 요약은 로더가 만든 열 구성 요약(table_summary)을 사용합니다.
+
+    Args:
+        documents (list[Document]): TabularLoader가 반환한 행 블록 리스트.
+
+    Returns:
+        list[Document]: 요약 1개와 행 블록 청크로 구성된 Document 리스트.
+    """
+    file_path = documents[0].metadata.get("file_path")
+    logging.info(f"#2 Preprocessing table documents without LLM chunking, blocks: {len(documents)} cnt")
+    
+    summary = tabular_summary_document(
+        file_path, documents[0].metadata.get("table_summary", ""), PageOffsetIndex.from_documents(documents)
+    )
+    return [summary] + preprocess_tabular_blocks(documents)
+
 def preprocess_documents(documents, chunk_size=1000, chunk_overlap=200):
+    with span("preprocess_documents", pages=len(documents)) as preprocess_span:
+        cleaned_documents = _preprocess_documents(documents)
+        preprocess_span["chunks"] = len(cleaned_documents)
+    return cleaned_documents
+
+def _preprocess_documents(documents):
     # 문서를 전처리한다.
     # LLM을 이용해서 요약하고 저장한다.
     # 각각의 레이어를 구성해서 단계별로 진행될 수 있도록 한다.
@@ -157,6 +221,10 @@ def preprocess_documents(documents, chunk_size=1000, chunk_overlap=200):
     # 첫번째로 전체 문서에 대한 처리다.
     # 전체 문서에 대한 메타데이터를 생성한다.
     
+    # 표 데이터는 행 블록이 곧 청크이므로 LLM 청킹을 건너뛴다.
+    if documents and documents[0].metadata.get("content_type") == "table":
+        return preprocess_tabular_documents(documents)
+    
     total_count = len(documents)
     logging.info(f"#2 Preprocessing documents, total: {total_count} cnt")
 
@@ -164,20 +232,12 @@ def preprocess_documents(documents, chunk_size=1000, chunk_overlap=200):
     metadata = first_doc.metadata
     file_path = metadata.get("file_path")
     
-    range_start = 0
-    range_list = []
-    for doc in documents:
-        start = range_start
-        end = range_start + len(doc.page_content)
-        print(f"start: {start}, end: {end}")
-        range_list.append([start, end])
-        range_start = end + 1
+    # 페이지 범위 인덱스를 한번만 만들고, 청크 슬라이싱과 메타데이터 생성에서 같이 사용한다.
+    page_index = PageOffsetIndex.from_documents(documents)
+    for doc, content_range in zip(documents, page_index.ranges()):
+        doc.metadata["content_range"] = content_range
         
-        doc.metadata["content_range"] = [start, end]
-    
-    metadatas = [doc.metadata for doc in documents]
-        
-    # 전체 내용을 구성한다.
+    # 전체 내용을 구성한다. (page_index와 같은 기준으로 구분자 없이 이어붙인다.)
     total_content = "".join([doc.page_content for doc in documents])
     
     # LLM을 이용해서 전체내용 요약과 의미를 유지하며 청킹을 진행한다.
@@ -187,25 +247,20 @@ def preprocess_documents(documents, chunk_size=1000, chunk_overlap=200):
     # page_range는 청킹된 문서가 어떤 페이지들에 원래 있었는지를 나타낸다.
     # 완료된 response값을 받아서, 메타데이터를 처리하고 저장한다.
     
+    # 같은 텍스트를 같은 프롬프트/모델로 청킹한 결과가 캐시에 있으면 LLM을 호출하지 않는다.
+    cache = get_chunking_cache()
+    cache_key = content_key(total_content, CHUNKING_PROMPT_VERSION, f"{LLM_PROVIDER}:{CHUNKING_MODEL}")
+    cached = cache.get(cache_key) if cache else None
+    if cached:
+        logging.info(f"Chunking cache hit for {file_path}, skipping LLM call.")
+        json_data, _, _ = set_response_content(cached, total_content, page_index)
+        return set_document_data(documents_json_data=json_data, file_path=file_path, page_index=page_index)
+    
     total_content_text_count = len(total_content)
     prompt = create_summary_prompt(total_content, total_content_text_count)
     
     retries_left = 1
     while True:
-        # # [테스트용]
-        # # 현재 경로에 response.json이 있다면, 그 파일을 사용한다.
-        # if os.path.exists("response.json"):
-        #     with open("response.json", "r") as f:
-        #         response = f.read()
-        # else:
-        #     response = generate_response(prompt, work_type="chunking")
-            
-        #     if response:
-        #     # 현재 실행파일과 동일한 경로에 파일로 저장한다.
-        #         save_path = os.path.join(os.getcwd(), "response.json")
-        #         with open(save_path, "w") as f:
-        #             f.write(response)
-        
         response = generate_response(prompt, work_type="chunking")
         
         # response가 json형식인지 확인한다.
@@ -230,7 +285,7 @@ def preprocess_documents(documents, chunk_size=1000, chunk_overlap=200):
             #     f.write(response)
             raise ValueError("Response is not in JSON format.")
         
-        json_data, total_overlap, last_value = set_response_content(json_data, total_content)      
+        json_data, total_overlap, last_value = set_response_content(json_data, total_content, page_index)      
 
         original_content_count = len(total_content)
         diff = abs(original_content_count - last_value)
@@ -246,8 +301,12 @@ def preprocess_documents(documents, chunk_size=1000, chunk_overlap=200):
                     f.write(response)
                 raise ValueError("Response content is too different from the original content.")
     
+    # 검증을 통과한 결과만 캐시에 저장한다.
+    if cache:
+        cache.put(cache_key, json_data)
+    
     # json_data에 metadata를 추가한다.
-    cleaned_documents = set_document_data(documents_json_data=json_data, file_path=file_path, origin_metadatas=metadatas)
+    cleaned_documents = set_document_data(documents_json_data=json_data, file_path=file_path, page_index=page_index)
     
     # # 기존에 vector로 저장되어있는 파일을 확인해서 각 문서 데이터의 버젼을 관리한다.
     # for doc in cleaned_documents:
@@ -0,0 +1,81 @@
+# /src/query/adaptive_retriever.py
+import logging
+from typing import Any, List
+from pydantic import Field
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.retrievers import BaseRetriever
+from langchain.schema import Document
+from src.embedding.vectorstore_handler import search_by_vector
+from src.config import ADAPTIVE_MIN_SCORE, ADAPTIVE_MAX_SCORE_GAP, ADAPTIVE_KNEE_MIN_DROP, ADAPTIVE_MIN_K
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+
+
+def distance_to_similarity(distance, space="l2"):
+    """
+    Chroma 거리를 코사인 유사도로 변환한다. 임베딩은 정규화되어 있다고 가정한다. (OpenAI/fake 임베딩)
+    l2는 제곱 거리(2 - 2cos), cosine/ip는 1 - cos.
+    """
+    if space == "l2":
+        return 1.0 - distance / 2.0
+    return 1.0 - distance
+
+
+def adaptive_cutoff(scores, min_score=ADAPTIVE_MIN_SCORE, max_gap=ADAPTIVE_MAX_SCORE_GAP,
+                    knee_min_drop=ADAPTIVE_KNEE_MIN_DROP, min_k=ADAPTIVE_MIN_K):
+    """
+    내림차순으로 정렬된 유사도 점수에서 사용할 앞쪽 청크 수를 정합니다.
+
+    1. min_score보다 낮은 청크는 제외한다. (가장 높은 점수도 낮으면 0)
+    2. 가장 높은 점수보다 max_gap 이상 낮은 청크는 제외한다.
+    3. 남은 청크 중 min_k개 이후에서 연속한 점수 차이가 가장 큰 곳(knee)이 knee_min_drop 이상이면 그 앞에서 자른다.
+
+    Returns:
+        int: 사용할 청크 수.
+    """
+    if not scores or scores[0] < min_score:
+        return 0
+
+    n = 0
+    while n < len(scores) and scores[n] >= min_score and scores[0] - scores[n] < max_gap:
+        n += 1
+
+    if n > min_k:
+        drops = [scores[i] - scores[i + 1] for i in range(min_k - 1, n - 1)]
+        largest = max(range(len(drops)), key=drops.__getitem__)
+        if drops[largest] >= knee_min_drop:
+            n = min_k + largest
+    return n
+
+
+class AdaptiveRetriever(BaseRetriever):
+    """
+    최대 k개의 청크를 점수와 함께 검색한 뒤 adaptive_cutoff로 관련 있는 청크만 반환하는 리트리버.
+    관련 있는 청크가 없으면 빈 리스트를 반환하므로, 응답 생성은 LLM 호출 없이 끝난다.
+
+    search_kwargs:
+        k (int): 반환할 최대 청크 수.
+        min_score, max_gap, knee_min_drop, min_k: adaptive_cutoff 참고.
+    """
+    vectorstore: Any
+    search_kwargs: dict = Field(default_factory=dict)
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        k = self.search_kwargs.get("k", 6)
+        space = (self.vectorstore._collection.metadata or {}).get("hnsw:space", "l2")
+
+        embedding = self.vectorstore.embeddings.embed_query(query)
+        hits = search_by_vector(self.vectorstore, embedding, k)
+        scores = [distance_to_similarity(distance, space) for _, distance in hits]
+
+        n = adaptive_cutoff(
+            scores,
+            min_score=self.search_kwargs.get("min_score", ADAPTIVE_MIN_SCORE),
+            max_gap=self.search_kwargs.get("max_gap", ADAPTIVE_MAX_SCORE_GAP),
+            knee_min_drop=self.search_kwargs.get("knee_min_drop", ADAPTIVE_KNEE_MIN_DROP),
+            min_k=self.search_kwargs.get("min_k", ADAPTIVE_MIN_K),
+        )
+        logging.info(f"Adaptive top-k kept {n}/{len(hits)} chunks (best score: {scores[0] if scores else None})")
+        return [doc for doc, _ in hits[:n]]
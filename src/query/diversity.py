@@ -0,0 +1,175 @@
+# /src/query/diversity.py
+import logging
+from typing import Any, List
+import numpy as np
+from pydantic import Field
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.retrievers import BaseRetriever
+from langchain.schema import Document
+from src.embedding.vectorstore_handler import search_by_vector
+from src.config import MMR_LAMBDA, MMR_FETCH_K, MMR_OVERLAP_WEIGHT
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+
+
+def _parse_source_pages(source_pages):
+    """source_pages("3" 또는 "3~5" 또는 3)를 (시작, 끝) 페이지로 변환한다."""
+    if isinstance(source_pages, (int, float)):
+        return int(source_pages), int(source_pages)
+    if isinstance(source_pages, str) and source_pages:
+        parts = source_pages.split("~")
+        try:
+            return int(parts[0]), int(parts[-1])
+        except ValueError:
+            return None
+    return None
+
+
+def chunk_spans(metadatas):
+    """
+    후보 청크의 범위 정보를 범위 중복 패널티 계산용 배열로 변환합니다.
+
+    content_start/content_end가 있으면 글자 범위를, 없으면 source_pages의 페이지 범위를 사용합니다.
+    범위는 같은 doc_id이면서 같은 종류(글자/페이지)끼리만 비교되도록 그룹 코드를 부여합니다.
+
+    Args:
+        metadatas (list[dict]): 후보 청크의 메타데이터 리스트.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: (시작, 끝, 그룹 코드). 범위를 알 수 없으면 그룹 코드는 -1.
+    """
+    n = len(metadatas)
+    starts = np.zeros(n)
+    ends = np.ones(n)
+    groups = np.full(n, -1)
+    group_codes = {}
+
+    for i, m in enumerate(metadatas):
+        if "content_start" in m and "content_end" in m:
+            span = (m["content_start"], m["content_end"])
+            kind = "chars"
+        else:
+            span = _parse_source_pages(m.get("source_pages"))
+            kind = "pages"
+            if span:
+                # 페이지 범위는 끝 페이지를 포함하므로 +1
+                span = (span[0], span[1] + 1)
+
+        if not span or not m.get("doc_id"):
+            continue
+
+        starts[i], ends[i] = span
+        groups[i] = group_codes.setdefault((m["doc_id"], kind), len(group_codes))
+
+    return starts, ends, groups
+
+
+def range_overlap(spans, idx):
+    """
+    idx번째 후보와 나머지 후보들의 범위 중복 비율((겹치는 길이 / 짧은 쪽 길이), 0~1)을 계산합니다.
+
+    Args:
+        spans (tuple): chunk_spans의 결과.
+        idx (int): 기준 후보 인덱스.
+
+    Returns:
+        np.ndarray: (n,) 중복 비율. 같은 그룹이 아니거나 자기 자신이면 0.
+    """
+    starts, ends, groups = spans
+    intersection = np.minimum(ends, ends[idx]) - np.maximum(starts, starts[idx])
+    lengths = np.maximum(ends - starts, 1)
+    ratio = np.clip(intersection, 0, None) / np.minimum(lengths, lengths[idx])
+
+    ratio[(groups != groups[idx]) | (groups < 0)] = 0.0
+    ratio[idx] = 0.0
+    return ratio
+
+
+def mmr_select(query_embedding, candidate_embeddings, k, lambda_mult=MMR_LAMBDA, spans=None, overlap_weight=MMR_OVERLAP_WEIGHT):
+    """
+    Maximal Marginal Relevance로 관련도가 높으면서 서로 겹치지 않는 후보를 고릅니다.
+
+    관련도는 한번의 행렬-벡터 곱으로 계산하고, 선택 단계에서는 선택된 후보의 유사도 행만 벡터 연산으로 계산합니다.
+    (후보 100개 기준 1ms 미만)
+
+    Args:
+        query_embedding (array-like): 쿼리 임베딩 (d,).
+        candidate_embeddings (array-like): 후보 임베딩 행렬 (n, d).
+        k (int): 선택할 개수.
+        lambda_mult (float): 관련도와 다양성의 비율. 1이면 관련도만, 0이면 다양성만 고려.
+        spans (tuple, optional): chunk_spans의 결과. 주어지면 범위 중복 비율을 유사도에 더해 패널티로 사용.
+        overlap_weight (float): 중복 패널티 가중치.
+
+    Returns:
+        list[int]: 선택된 후보의 인덱스 (선택 순서).
+    """
+    embeddings = np.asarray(candidate_embeddings, dtype=np.float32)
+    n = len(embeddings)
+    if n == 0 or k <= 0:
+        return []
+
+    # 행렬 전체를 정규화하지 않고, 내적 결과를 노름으로 나눠 코사인 유사도를 구한다.
+    norms = np.sqrt(np.einsum('ij,ij->i', embeddings, embeddings))
+    norms[norms == 0] = 1.0
+    query = np.asarray(query_embedding, dtype=np.float32)
+    relevance = (embeddings @ query) / (norms * (np.linalg.norm(query) or 1.0))
+
+    def redundancy(idx):
+        # 전체 (n, n) 행렬 대신 선택된 후보의 행만 계산한다.
+        row = (embeddings @ embeddings[idx]) / (norms * norms[idx])
+        if spans is not None:
+            row += overlap_weight * range_overlap(spans, idx)
+        return row
+
+    selected = [int(np.argmax(relevance))]
+    max_redundancy = redundancy(selected[0])
+    is_selected = np.zeros(n, dtype=bool)
+    is_selected[selected[0]] = True
+
+    for _ in range(min(k, n) - 1):
+        scores = lambda_mult * relevance - (1 - lambda_mult) * max_redundancy
+        scores[is_selected] = -np.inf
+        idx = int(np.argmax(scores))
+        selected.append(idx)
+        is_selected[idx] = True
+        np.maximum(max_redundancy, redundancy(idx), out=max_redundancy)
+
+    return selected
+
+
+class MMRRetriever(BaseRetriever):
+    """
+    fetch_k개의 후보를 가져온 뒤 MMR과 범위 중복 패널티로 k개를 다양하게 고르는 리트리버.
+
+    search_kwargs:
+        k (int): 최종적으로 반환할 청크 수.
+        fetch_k (int): MMR 후보로 가져올 청크 수.
+        lambda_mult (float): 관련도와 다양성의 비율.
+        overlap_weight (float): 같은 문서 내 범위 중복 패널티 가중치.
+    """
+    vectorstore: Any
+    search_kwargs: dict = Field(default_factory=dict)
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        k = self.search_kwargs.get("k", 6)
+        fetch_k = max(self.search_kwargs.get("fetch_k", MMR_FETCH_K), k)
+        lambda_mult = self.search_kwargs.get("lambda_mult", MMR_LAMBDA)
+        overlap_weight = self.search_kwargs.get("overlap_weight", MMR_OVERLAP_WEIGHT)
+
+        embedding = self.vectorstore.embeddings.embed_query(query)
+        hits = search_by_vector(self.vectorstore, embedding, fetch_k, include_embeddings=True)
+        if not hits:
+            return []
+
+        docs = [doc for doc, _, _ in hits]
+        selected = mmr_select(
+            embedding,
+            [candidate for _, _, candidate in hits],
+            k,
+            lambda_mult=lambda_mult,
+            spans=chunk_spans([doc.metadata for doc in docs]),
+            overlap_weight=overlap_weight,
+        )
+        return [docs[i] for i in selected]
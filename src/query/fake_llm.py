@@ -0,0 +1,63 @@
+# /src/query/fake_llm.py
+import re
+import json
+import time
+from langchain_core.messages import AIMessage, AIMessageChunk
+from src.config import FAKE_LLM_LATENCY
+
+TEXT_LENGTH_PATTERN = re.compile(r'Text Length: (\d+)')
+DATA_PATTERN = re.compile(r'- Data: (.*)\n\n# Response Template', re.DOTALL)
+
+
+class FakeChatLLM:
+    """
+    외부 API 없이 동작하는 결정적인 LLM 대체 구현 (LLM_PROVIDER=fake).
+
+    - 청킹 프롬프트에는 실제 모델과 같은 형식의 JSON(summary + content_range 청크)을 돌려준다.
+    - 그 외의 프롬프트에는 고정된 형식의 답변을 돌려준다.
+    - 같은 입력에는 항상 같은 출력을 반환하며, latency로 API 호출 지연을 흉내낸다.
+    """
+
+    def __init__(self, latency=FAKE_LLM_LATENCY, chunk_size=450, chunk_overlap=50):
+        self.latency = latency
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+
+    def invoke(self, messages):
+        prompt = messages[-1].content if messages else ""
+        if self.latency:
+            time.sleep(self.latency)
+
+        length_match = TEXT_LENGTH_PATTERN.search(prompt)
+        if length_match:
+            data_match = DATA_PATTERN.search(prompt)
+            content = self._chunking_response(int(length_match.group(1)), data_match.group(1) if data_match else "")
+        else:
+            content = f"요청하신 내용에 대한 답변입니다. (질문 길이: {len(prompt)}자)"
+
+        return AIMessage(
+            content=content,
+            usage_metadata={
+                "input_tokens": len(prompt) // 4,
+                "output_tokens": len(content) // 4,
+                "total_tokens": (len(prompt) + len(content)) // 4,
+            },
+        )
+
+    def stream(self, messages, chunk_chars=20):
+        """invoke와 같은 응답을 chunk_chars 글자씩 나눠서 반환합니다."""
+        content = self.invoke(messages).content
+        for start in range(0, len(content), chunk_chars):
+            yield AIMessageChunk(content=content[start:start + chunk_chars])
+
+    def _chunking_response(self, total_length, data):
+        chunks = []
+        step = max(self.chunk_size - self.chunk_overlap, 1)
+        for i, start in enumerate(range(0, max(total_length, 1), step)):
+            end = min(start + self.chunk_size, total_length)
+            chunks.append({"id": i + 1, "content_range": [start, end], "reasoning": "fixed-size chunk"})
+            if end >= total_length:
+                break
+
+        summary = " ".join(data.split())[:200]
+        return json.dumps({"summary": {"content": summary}, "chunks": chunks}, ensure_ascii=False)
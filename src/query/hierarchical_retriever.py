@@ -0,0 +1,87 @@
+# /src/query/hierarchical_retriever.py
+import logging
+from typing import Any, List
+from pydantic import Field
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.retrievers import BaseRetriever
+from langchain.schema import Document
+from src.embedding.vectorstore_handler import search_by_vector, get_search_executor, document_filter
+from src.config import (
+    HIERARCHICAL_DOC_K,
+    HIERARCHICAL_CHUNK_K,
+    HIERARCHICAL_PARALLEL_MIN_DOCS,
+)
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+
+
+class HierarchicalRetriever(BaseRetriever):
+    """
+    요약 인덱스 -> 청크 순서로 검색하는 2단계(coarse-to-fine) 리트리버.
+
+    1. 문서별 요약만 모아둔 작은 컬렉션에서 doc_k개의 문서를 고른다.
+    2. 선택된 doc_id 안에서만 청크를 검색한다.
+
+    검색 비용이 전체 청크 수가 아니라 (문서 수 + 선택된 몇개 문서의 청크 수)에 비례한다.
+
+    search_kwargs:
+        k (int): 최종적으로 반환할 청크 수.
+        doc_k (int): 1단계에서 선택할 문서 수.
+        chunk_k (int): 2단계에서 문서당 가져올 청크 수.
+    """
+    vectorstore: Any
+    summary_store: Any
+    search_kwargs: dict = Field(default_factory=dict)
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        k = self.search_kwargs.get("k", HIERARCHICAL_DOC_K * HIERARCHICAL_CHUNK_K)
+        doc_k = self.search_kwargs.get("doc_k", HIERARCHICAL_DOC_K)
+        chunk_k = self.search_kwargs.get("chunk_k", HIERARCHICAL_CHUNK_K)
+
+        # 쿼리 임베딩은 한번만 계산해서 두 단계 모두에 사용한다.
+        embedding = self.vectorstore.embeddings.embed_query(query)
+
+        # 1단계: 요약 인덱스에서 관련 문서 선택
+        summary_hits = search_by_vector(self.summary_store, embedding, doc_k)
+        doc_ids = []
+        for doc, _ in summary_hits:
+            doc_id = doc.metadata.get("doc_id")
+            if doc_id and doc_id not in doc_ids:
+                doc_ids.append(doc_id)
+
+        if not doc_ids:
+            # 요약 인덱스가 비어있다면 전체 청크 검색으로 대체한다.
+            logging.info("Summary index is empty. Falling back to flat chunk search.")
+            hits = search_by_vector(self.vectorstore, embedding, k)
+            return [doc for doc, _ in hits]
+
+        # 2단계: 선택된 문서 안에서만 청크 검색
+        hits = self._search_chunks(embedding, doc_ids, chunk_k)
+        hits.sort(key=lambda x: x[1])
+
+        logging.info(f"Hierarchical search selected docs={doc_ids}, chunk hits={len(hits)}")
+        return [doc for doc, _ in hits[:k]]
+
+    def _search_chunks(self, embedding, doc_ids, chunk_k):
+        """선택된 문서들 안에서 청크를 검색한다. 팬아웃이 넓으면 문서별 검색을 병렬로 실행한다."""
+        if len(doc_ids) >= HIERARCHICAL_PARALLEL_MIN_DOCS:
+            executor = get_search_executor()
+            futures = [
+                executor.submit(
+                    search_by_vector,
+                    self.vectorstore,
+                    embedding,
+                    chunk_k,
+                    {"$and": [document_filter([doc_id]), {"content_role": "chunking"}]},
+                )
+                for doc_id in doc_ids
+            ]
+            hits = []
+            for future in futures:
+                hits.extend(future.result())
+            return hits
+
+        where = {"$and": [document_filter(doc_ids), {"content_role": "chunking"}]}
+        return search_by_vector(self.vectorstore, embedding, chunk_k * len(doc_ids), where)
@@ -6,7 +6,10 @@ from langchain_community.chat_models import ChatOpenAI
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.schema import HumanMessage, SystemMessage  # Import HumanMessage
 from src.query.retriever import retrieve_relevant_documents
-from src.config import RETRIEVER_TYPE
+from src.query.query import get_llm
+from src.query.semantic_cache import SemanticAnswerCache, cache_scope
+from src.config import RETRIEVER_TYPE, SEMANTIC_CACHE_ENABLED
+from src.metrics import span
 
 FILE_LIST_PATH = os.path.join(DATA_DIR, "file_list.json")
 
@@ -37,7 +40,9 @@ def fetch_top_documents(query, top_k=5, vectorstore_version=VECTORSTORE_VERSION)
     Returns:
         list: 상위 문서 리스트.
     """
-    documents = retrieve_relevant_documents(query, top_k=top_k, retriever_type=RETRIEVER_TYPE, vectorstore_version=vectorstore_version)
+    with span("retrieve", top_k=top_k, retriever_type=RETRIEVER_TYPE) as retrieve_span:
+        documents = retrieve_relevant_documents(query, top_k=top_k, retriever_type=RETRIEVER_TYPE, vectorstore_version=vectorstore_version)
+        retrieve_span["results"] = len(documents)
     if not documents:
         print("No relevant documents found.")
         return []
@@ -103,9 +108,20 @@ def set_vector_document_data(top_documents):
         documents += (template + "\n")
     return documents
 
-def generate_response(query, top_k=5, system_instruction=None, vectorstore_version=VECTORSTORE_VERSION, max_tokens=None):
+# 관련 문서를 찾지 못했을 때 LLM을 호출하지 않고 반환하는 응답
+NOT_AVAILABLE_ANSWER = "죄송합니다. 등록된 문서에서 질문과 관련된 내용을 찾지 못했습니다. 질문을 바꾸거나 관련 문서를 업로드해 주세요."
+
+DEFAULT_SYSTEM_INSTRUCTION = """
+You are a professional assistant responding to questions in Korean. 
+Use only the information from the provided Documents Data to answer the following question.
+Do not include any references to the source, such as page numbers or document details.
+Provide clear, concise, and natural responses as if you are explaining directly to the user.
+If the information cannot be derived from the provided data, politely inform the user that it is not available.
+"""
+
+def build_messages(query, top_k=5, system_instruction=None, vectorstore_version=VECTORSTORE_VERSION):
     """
-    질의에 대한 응답을 생성합니다.
+    문서를 검색해서 LLM에 보낼 메시지를 구성합니다.
 
     Args:
         query (str): 사용자의 질문.
@@ -113,25 +129,12 @@ def generate_response(query, top_k=5, system_instruction=None, vectorstore_versi
         system_instruction (str, optional): 모델의 동작 지침.
 
     Returns:
-        str: LLM의 응답.
+        tuple[list, list[Document]]: (LLM 메시지 리스트, 검색된 문서 리스트). 검색된 문서가 없으면 메시지는 None.
     """
-    # # LLM 초기화 (ChatOpenAI 사용)
-    # llm = ChatOpenAI(
-    #     temperature=0.8, 
-    #     model="gpt-4o-2024-08-06",  # Chat 모델 이름
-    # )
-    
-    llm = ChatGoogleGenerativeAI(
-        # model="gemini-1.5-flash",
-        model="gemini-2.0-flash-exp",
-        temperature=0.5,
-        max_tokens=None,
-        timeout=None,
-        max_retries=2,
-    )
-
     # 문서 검색
     top_documents = fetch_top_documents(query, top_k, vectorstore_version)
+    if not top_documents:
+        return None, top_documents
     
     # # context를 구성할때 하나씩 ID를 구성해서 처리
     # # doc.id가 아니라 숫자를 하나씩 증가시키는 방법으로 처리
@@ -139,41 +142,108 @@ def generate_response(query, top_k=5, system_instruction=None, vectorstore_versi
     # metadata = "\n".join([f"{i+1}. {doc.metadata}" for i, doc in enumerate(top_documents)])
     
     document_data = set_vector_document_data(top_documents)
-    # print(document_data)
     
     # 프롬프트 생성
     prompt = create_prompt(query, document_data)
     
-    if not system_instruction:
-        # system_instruction = "Please respond to the following question based on the provided Documents Data in Korean."
-        system_instruction = """
-You are a professional assistant responding to questions in Korean. 
-Use only the information from the provided Documents Data to answer the following question.
-Do not include any references to the source, such as page numbers or document details.
-Provide clear, concise, and natural responses as if you are explaining directly to the user.
-If the information cannot be derived from the provided data, politely inform the user that it is not available.
-"""
+    # 메시지 포맷에 맞게 변환 (시스템 메시지 + 사용자 질문 메시지)
+    messages = [
+        SystemMessage(content=system_instruction or DEFAULT_SYSTEM_INSTRUCTION),
+        HumanMessage(content=prompt),
+    ]
+    return messages, top_documents
+
+def lookup_cached_answer(query, top_k=5, system_instruction=None, vectorstore_version=VECTORSTORE_VERSION):
+    """
+    시맨틱 캐시에서 유사한 이전 질문의 응답을 찾습니다. (SEMANTIC_CACHE_ENABLED)
 
-    # 메시지 포맷에 맞게 변환
-    messages = []
-    
-    # print(system_instruction)
+    Returns:
+        tuple[str | None, callable]: (캐시된 응답 또는 None, 새 응답을 캐시에 저장하는 함수 remember(answer, documents))
+    """
+    if not SEMANTIC_CACHE_ENABLED:
+        return None, lambda answer, documents: None
+
+    cache = SemanticAnswerCache.get_instance(vectorstore_version=vectorstore_version)
+    scope = cache_scope(top_k, system_instruction, vectorstore_version)
+    with span("semantic_cache_lookup") as cache_span:
+        answer, embedding = cache.lookup(query, scope)
+        cache_span["hit"] = answer is not None
+    return answer, lambda answer, documents: cache.store(embedding, scope, answer, documents)
 
-    # 시스템 메시지 추가
-    messages.append(SystemMessage(content=system_instruction))
+def generate_response(query, top_k=5, system_instruction=None, vectorstore_version=VECTORSTORE_VERSION, max_tokens=None):
+    """
+    질의에 대한 응답을 생성합니다.
+
+    Args:
+        query (str): 사용자의 질문.
+        top_k (int): 상위 N개의 문서를 사용.
+        system_instruction (str, optional): 모델의 동작 지침.
 
-    # 사용자 질문 메시지 추가
-    messages.append(HumanMessage(content=prompt))
+    Returns:
+        str: LLM의 응답.
+    """
+    # # LLM 초기화 (ChatOpenAI 사용)
+    # llm = ChatOpenAI(
+    #     temperature=0.8, 
+    #     model="gpt-4o-2024-08-06",  # Chat 모델 이름
+    # )
+    
+    # 같은 질문(표현만 다른 질문 포함)이면 검색과 LLM 호출 없이 이전 응답을 반환한다.
+    cached_answer, remember = lookup_cached_answer(query, top_k, system_instruction, vectorstore_version)
+    if cached_answer is not None:
+        return cached_answer
+    
+    # model="gemini-1.5-flash",
+    messages, top_documents = build_messages(query, top_k, system_instruction, vectorstore_version)
+    if messages is None:
+        # 관련 문서가 없으면 LLM을 호출하지 않는다.
+        return NOT_AVAILABLE_ANSWER
+    llm = get_llm(model="gemini-2.0-flash-exp", temperature=0.5)
 
     try:
         # LLM 응답 생성
-        response = llm.invoke(messages)
+        with span("llm_answer", prompt_chars=len(messages[-1].content), documents=len(top_documents)) as llm_span:
+            response = llm.invoke(messages)
+            usage = getattr(response, "usage_metadata", None) or {}
+            llm_span["input_tokens"] = usage.get("input_tokens", 0)
+            llm_span["output_tokens"] = usage.get("output_tokens", 0)
         
         # # 답변을 확인해서 '.'이 있는 곳에 '\n' 추가 
         # content = str(response.content)
         # modified_content = content.replace('.', '.\n')
         # print(modified_content)
         # return modified_content  # LLM 응답 내용
+        remember(response.content, top_documents)
         return response.content
     except Exception as e:
-        return f"An error occurred while generating a response: {e}"
\ No newline at end of file
+        return f"An error occurred while generating a response: {e}"
+
+def stream_response(query, top_k=5, system_instruction=None, vectorstore_version=VECTORSTORE_VERSION):
+    """
+    generate_response와 같은 방식으로 응답을 생성하되, 생성되는 대로 텍스트 조각을 반환합니다.
+
+    Yields:
+        str: 응답 텍스트 조각.
+    """
+    cached_answer, remember = lookup_cached_answer(query, top_k, system_instruction, vectorstore_version)
+    if cached_answer is not None:
+        yield cached_answer
+        return
+    
+    messages, top_documents = build_messages(query, top_k, system_instruction, vectorstore_version)
+    if messages is None:
+        yield NOT_AVAILABLE_ANSWER
+        return
+    llm = get_llm(model="gemini-2.0-flash-exp", temperature=0.5)
+    
+    try:
+        with span("llm_answer_stream", prompt_chars=len(messages[-1].content), documents=len(top_documents)) as llm_span:
+            pieces = []
+            for chunk in llm.stream(messages):
+                if chunk.content:
+                    pieces.append(chunk.content)
+                    yield chunk.content
+            llm_span["output_chars"] = sum(len(piece) for piece in pieces)
+        remember("".join(pieces), top_documents)
+    except Exception as e:
+        yield f"An error occurred while generating a response: {e}"
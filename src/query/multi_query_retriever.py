@@ -0,0 +1,130 @@
+# /src/query/multi_query_retriever.py
+import re
+import hashlib
+import logging
+from typing import Any, List
+from pydantic import Field
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.retrievers import BaseRetriever
+from langchain.schema import Document
+from src.embedding.vectorstore_handler import search_by_vector, get_search_executor
+from src.config import MULTI_QUERY_MAX, MULTI_QUERY_RRF_K, MULTI_QUERY_MIN_CLAUSE_WORDS
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+
+# 복합 질문을 문장 단위로 나누는 기준 (물음표, 세미콜론, 줄바꿈)
+SENTENCE_SPLIT_PATTERN = re.compile(r'\s*[;?\n]\s*')
+
+# 문장 안에서 절을 잇는 접속사/비교 표현. "및"은 명사끼리만 이으므로("해지 및 위약금 조건") 나누지 않는다.
+CONJUNCTION_SPLIT_PATTERN = re.compile(
+    r'\s*(?:그리고|또한|\bvs\.?\b|\bversus\b|\band\b|,)\s*',
+    re.IGNORECASE
+)
+
+
+def _is_clause(part, min_words=MULTI_QUERY_MIN_CLAUSE_WORDS):
+    """혼자서 질의가 될 만큼 긴 조각인지. ("terms", "conditions" 같은 명사 하나는 제외)"""
+    return len(part.split()) >= min_words
+
+
+def _split_clauses(sentence, min_words):
+    """접속사로 이어진 양쪽이 모두 절 길이일 때만 나눈다. 하나라도 짧으면 명사를 이은 것으로 보고 문장을 그대로 둔다."""
+    parts = [part.strip() for part in CONJUNCTION_SPLIT_PATTERN.split(sentence) if part.strip()]
+    if len(parts) > 1 and all(_is_clause(part, min_words) for part in parts):
+        return parts
+    return [sentence]
+
+
+def split_query(query, max_queries=MULTI_QUERY_MAX, min_words=MULTI_QUERY_MIN_CLAUSE_WORDS):
+    """
+    복합 질문을 하위 질의로 나눕니다. 원본 질의는 항상 첫번째로 포함됩니다.
+    나눈 조각이 min_words 단어보다 짧으면 하위 질의로 쓰지 않으므로, 단일 개념의 질의는 원본 하나만 반환됩니다.
+
+    Args:
+        query (str): 사용자 질의.
+        max_queries (int): 원본을 포함한 최대 질의 수.
+        min_words (int): 하위 질의의 최소 단어 수.
+
+    Returns:
+        list[str]: 하위 질의 리스트.
+    """
+    original = query.strip()
+    sub_queries = [original]
+    for sentence in SENTENCE_SPLIT_PATTERN.split(original):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        for part in _split_clauses(sentence, min_words):
+            if part in sub_queries or part.rstrip('?') == original.rstrip('?') or not _is_clause(part, min_words):
+                continue
+            sub_queries.append(part)
+    return sub_queries[:max_queries]
+
+
+def _dedup_key(doc):
+    content_hash = doc.metadata.get("content_hash")
+    if content_hash:
+        return content_hash
+    return hashlib.md5(doc.page_content.encode('utf-8')).hexdigest()
+
+
+def reciprocal_rank_fusion(result_lists, rrf_k=MULTI_QUERY_RRF_K):
+    """
+    여러 검색 결과를 Reciprocal Rank Fusion으로 병합하고 content_hash 기준으로 중복을 제거합니다.
+
+    Args:
+        result_lists (list[list[Document]]): 질의별 검색 결과 (순위순).
+        rrf_k (int): RRF 상수. 클수록 하위 순위의 영향이 커진다.
+
+    Returns:
+        list[Document]: 병합된 점수 순으로 정렬된 문서 리스트.
+    """
+    scores = {}
+    docs = {}
+    for results in result_lists:
+        for rank, doc in enumerate(results, start=1):
+            key = _dedup_key(doc)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (rrf_k + rank)
+            docs.setdefault(key, doc)
+
+    ranked_keys = sorted(scores, key=scores.get, reverse=True)
+    return [docs[key] for key in ranked_keys]
+
+
+class MultiQueryFusionRetriever(BaseRetriever):
+    """
+    복합 질문을 여러 하위 질의로 나눠 동시에 검색하고, RRF로 결과를 병합하는 리트리버.
+
+    하위 질의 임베딩은 embed_documents 한번으로 계산하고, 검색은 공용 스레드풀에서 병렬로 실행하므로
+    전체 소요 시간은 단일 검색과 비슷하게 유지된다.
+
+    search_kwargs:
+        k (int): 최종적으로 반환할 청크 수.
+        fetch_k (int): 하위 질의마다 가져올 후보 수. (기본값: k)
+        max_queries (int): 원본을 포함한 최대 질의 수.
+        rrf_k (int): RRF 상수.
+    """
+    vectorstore: Any
+    search_kwargs: dict = Field(default_factory=dict)
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        k = self.search_kwargs.get("k", 6)
+        fetch_k = self.search_kwargs.get("fetch_k", k)
+        max_queries = self.search_kwargs.get("max_queries", MULTI_QUERY_MAX)
+        rrf_k = self.search_kwargs.get("rrf_k", MULTI_QUERY_RRF_K)
+
+        sub_queries = split_query(query, max_queries=max_queries)
+        embeddings = self.vectorstore.embeddings.embed_documents(sub_queries)
+
+        executor = get_search_executor()
+        futures = [
+            executor.submit(search_by_vector, self.vectorstore, embedding, fetch_k)
+            for embedding in embeddings
+        ]
+        result_lists = [[doc for doc, _ in future.result()] for future in futures]
+
+        fused = reciprocal_rank_fusion(result_lists, rrf_k=rrf_k)
+        logging.info(f"Multi-query search with {len(sub_queries)} sub-queries: {sub_queries}")
+        return fused[:k]
@@ -1,17 +1,32 @@
 # /src/query/query.py
+from functools import lru_cache
 from langchain_community.chat_models import ChatOpenAI
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.schema import HumanMessage, SystemMessage  # Import HumanMessage
+from src.metrics import span
+from src.config import LLM_PROVIDER, CHUNKING_MODEL
 
-def generate_response(prompt, work_type=None, top_k=5):
+@lru_cache(maxsize=None)
+def get_llm(model="gemini-1.5-flash", temperature=0.3):
+    """
+    LLM_PROVIDER 설정에 맞는 채팅 모델을 반환합니다. (gemini | fake)
+    같은 설정의 클라이언트는 프로세스 안에서 재사용합니다.
+    """
+    if LLM_PROVIDER == "fake":
+        from src.query.fake_llm import FakeChatLLM
+        return FakeChatLLM()
     
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-1.5-flash",
-        temperature=0.3,
+    return ChatGoogleGenerativeAI(
+        model=model,
+        temperature=temperature,
         max_tokens=None,
         timeout=None,
         max_retries=2,
     )
+
+def generate_response(prompt, work_type=None, top_k=5):
+    
+    llm = get_llm(model=CHUNKING_MODEL, temperature=0.3)
     
     messages = []
     
@@ -33,7 +48,11 @@ def generate_response(prompt, work_type=None, top_k=5):
         
     try:
         # LLM 응답 생성
-        response = llm.invoke(messages)
+        with span(f"llm_{work_type or 'query'}", prompt_chars=len(prompt)) as llm_span:
+            response = llm.invoke(messages)
+            usage = getattr(response, "usage_metadata", None) or {}
+            llm_span["input_tokens"] = usage.get("input_tokens", 0)
+            llm_span["output_tokens"] = usage.get("output_tokens", 0)
         return response.content
     except Exception as e:
         return f"An error occurred while generating a response: {e}"
\ No newline at end of file
@@ -7,9 +7,14 @@ from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_community.retrievers import BM25Retriever
 from langchain.retrievers import ContextualCompressionRetriever
 from langchain.retrievers.document_compressors import LLMChainExtractor
-from src.embedding.vectorstore_handler import VectorStoreManager
+from src.embedding.vectorstore_handler import VectorStoreManager, hydrate_metadatas
+from src.query.hierarchical_retriever import HierarchicalRetriever
+from src.query.multi_query_retriever import MultiQueryFusionRetriever
+from src.query.diversity import MMRRetriever
+from src.query.shared_retriever import SharedIndexRetriever
+from src.query.adaptive_retriever import AdaptiveRetriever
 from langchain.schema import Document
-from src.config import VECTORSTORE_VERSION
+from src.config import VECTORSTORE_VERSION, ADAPTIVE_TOP_K_ENABLED, INGEST_QUEUE_ENABLED
 logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
 
 PROCESSED_DATA_DIR = "/Users/mini/not_work/playground/rag_protoype/processed_data"
@@ -17,8 +22,6 @@ PROCESSED_DATA_DIR = "/Users/mini/not_work/playground/rag_protoype/processed_dat
 # 전역 변수로 리트리버를 저장
 _retriever = None
 
-vectorstore = VectorStoreManager.get_instance()
-
 def load_corpus_from_directory(directory):
     corpus = []
     if not os.path.exists(directory):
@@ -37,9 +40,50 @@ def load_corpus_from_directory(directory):
                 logging.error(f"Error reading {file_path}: {e}", exc_info=True)
     return corpus
 
-def _create_retriever(vectorstore_version=VECTORSTORE_VERSION, top_k=6):
-    """리트리버 생성 및 초기화"""
-    dense_retriever = vectorstore.as_retriever(search_kwargs={"k": top_k})
+def _create_retriever(vectorstore_version=VECTORSTORE_VERSION, top_k=6, retriever_type="dense"):
+    """
+    리트리버 생성 및 초기화.
+    retriever_type이 shared면 벡터스토어(Chroma)를 열지 않고 임베딩과 공유 인덱스 리트리버만 만든다.
+    """
+    # 공유 인덱스(메모리 맵)에서 검색. 질의 프로세스를 여러개 띄울 때 사용
+    shared_retriever = SharedIndexRetriever(
+        embeddings=VectorStoreManager.get_embeddings(vectorstore_version=vectorstore_version),
+        search_kwargs={"k": top_k},
+    )
+    if retriever_type == "shared":
+        return {"shared": shared_retriever}
+
+    if INGEST_QUEUE_ENABLED:
+        # chromadb는 다른 프로세스(적재 워커)가 쓴 청크를 이미 열린 인덱스에 반영하지 않는다.
+        logging.warning(
+            f"RETRIEVER_TYPE={retriever_type} searches this process's Chroma index, which does not see documents "
+            "ingested or deleted by the ingest worker until restart. Use RETRIEVER_TYPE=shared with the ingest queue."
+        )
+    vectorstore = VectorStoreManager.get_instance(vectorstore_version=vectorstore_version)
+    if ADAPTIVE_TOP_K_ENABLED:
+        # 점수로 관련 없는 청크를 잘라내서 top_k보다 적게 반환할 수 있음 (관련 청크가 없으면 빈 리스트)
+        dense_retriever = AdaptiveRetriever(vectorstore=vectorstore, search_kwargs={"k": top_k})
+    else:
+        dense_retriever = vectorstore.as_retriever(search_kwargs={"k": top_k})
+    
+    # 요약 인덱스로 문서를 먼저 고른 뒤, 해당 문서의 청크만 검색
+    hierarchical_retriever = HierarchicalRetriever(
+        vectorstore=vectorstore,
+        summary_store=VectorStoreManager.get_summary_instance(vectorstore_version=vectorstore_version),
+        search_kwargs={"k": top_k},
+    )
+    
+    # 복합 질문을 하위 질의로 나눠 병렬 검색한 뒤 RRF로 병합
+    multi_query_retriever = MultiQueryFusionRetriever(
+        vectorstore=vectorstore,
+        search_kwargs={"k": top_k},
+    )
+    
+    # 후보를 넉넉히 가져온 뒤 MMR + 범위 중복 패널티로 겹치는 청크를 걸러냄
+    mmr_retriever = MMRRetriever(
+        vectorstore=vectorstore,
+        search_kwargs={"k": top_k},
+    )
 
     # if vectorstore.get()['metadatas'] and vectorstore.get()['metadatas'][0] and vectorstore.get()['metadatas'][0].get('source'):
     #     logging.info("Using metadata from vectorstore for BM25 retriever.")
@@ -63,6 +107,10 @@ def _create_retriever(vectorstore_version=VECTORSTORE_VERSION, top_k=6):
 
     return {
         "dense": dense_retriever,
+        "hierarchical": hierarchical_retriever,
+        "multi_query": multi_query_retriever,
+        "mmr": mmr_retriever,
+        "shared": shared_retriever,
         # "bm25": bm25_retriever,
         # "ensemble": ensemble_retriever,
         # "compression": compression_retriever
@@ -76,14 +124,15 @@ def retrieve_relevant_documents(query, top_k=6, vectorstore_version=VECTORSTORE_
     Args:
         query (str): 사용자 질의
         top_k (int): 상위 검색 문서 개수
-        retriever_type (str): 사용할 리트리버 타입 ("dense", "bm25", "ensemble", "compression")
+        retriever_type (str): 사용할 리트리버 타입 ("dense", "hierarchical", "multi_query", "mmr", "shared", "bm25", "ensemble", "compression")
 
     Returns:
         list[Document]: 상위 top_k 개의 관련 문서 리스트
     """
     global _retriever
-    if _retriever is None:
-        _retriever = _create_retriever(vectorstore_version=vectorstore_version, top_k=top_k)
+    # shared만 만들어 둔 상태에서 다른 리트리버를 요청하면 전체를 다시 만든다.
+    if _retriever is None or (retriever_type not in _retriever and "dense" not in _retriever):
+        _retriever = _create_retriever(vectorstore_version=vectorstore_version, top_k=top_k, retriever_type=retriever_type)
 
     if retriever_type not in _retriever:
         logging.error(f"Retriever type '{retriever_type}' not found.")
@@ -91,7 +140,7 @@ def retrieve_relevant_documents(query, top_k=6, vectorstore_version=VECTORSTORE_
     
     retriever = _retriever[retriever_type]
 
-    if retriever_type in ["dense", "bm25"]:
+    if retriever_type in ["dense", "bm25", "hierarchical", "multi_query", "mmr", "shared"]:
         retriever.search_kwargs["k"] = top_k
     elif retriever_type == "ensemble":
         # EnsembleRetriever는 limit을 직접 설정할 수 없으므로, 내부 리트리버의 k값을 수정
@@ -107,5 +156,9 @@ def retrieve_relevant_documents(query, top_k=6, vectorstore_version=VECTORSTORE_
         logging.info("No relevant documents found.")
         return []
 
+    # 청크에는 doc_key만 저장되어 있으므로 문서 속성(경로, 파일명, 페이지 등)을 합친다. (이미 합친 결과는 그대로)
+    for doc, metadata in zip(results, hydrate_metadatas([doc.metadata for doc in results], vectorstore_version)):
+        doc.metadata = metadata
+
     logging.info(f"Found {len(results)} relevant documents for query: '{query}' (retriever_type={retriever_type})")
     return results
\ No newline at end of file
@@ -0,0 +1,156 @@
+# /src/query/semantic_cache.py
+import time
+import uuid
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from langchain_chroma import Chroma
+from src.embedding.vectorstore_handler import VectorStoreManager
+from src.config import (
+        VECTORSTORE_VERSION,
+        RETRIEVER_TYPE,
+        SEMANTIC_CACHE_THRESHOLD,
+        SEMANTIC_CACHE_MAX_ENTRIES,
+        SEMANTIC_CACHE_TTL,
+        SEMANTIC_CACHE_COLLECTION_NAME,
+    )
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+
+
+def cache_scope(top_k, system_instruction=None, vectorstore_version=VECTORSTORE_VERSION):
+    """같은 질문이라도 응답이 달라지는 설정(top_k, 지침, 벡터스토어, 리트리버)별로 캐시를 나누는 키."""
+    key = f"{vectorstore_version}:{RETRIEVER_TYPE}:{top_k}:{system_instruction or ''}"
+    return hashlib.md5(key.encode("utf-8")).hexdigest()
+
+
+def _document_versions(documents):
+    """응답에 사용된 문서의 doc_id -> [version, last_modified]."""
+    versions = {}
+    for doc in documents:
+        metadata = doc.metadata or {}
+        if metadata.get("doc_id"):
+            versions[metadata["doc_id"]] = [str(metadata.get("version")), metadata.get("last_modified")]
+    return versions
+
+
+class SemanticAnswerCache:
+    """
+    이전 질문의 임베딩과 응답을 저장해두고, 유사도가 threshold 이상인 질문에는 검색/LLM 호출 없이 응답을 반환한다.
+
+    - 질문 임베딩은 메모리 Chroma 컬렉션(HNSW, 코사인)에 저장한다. 프로세스별 캐시이며 재시작하면 비워진다.
+    - 응답마다 사용된 문서의 doc_id와 버전(version, last_modified)을 기록하고, 재사용할 때 카탈로그의 현재 버전과
+      비교해서 문서가 바뀌었거나 삭제되었으면 버린다. (적재 워커 등 다른 프로세스의 변경도 반영됨)
+    - max_entries를 넘으면 가장 오래 사용되지 않은 응답부터, ttl이 지난 응답은 조회할 때 삭제한다.
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls, vectorstore_version=VECTORSTORE_VERSION):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls(vectorstore_version=vectorstore_version)
+        return cls._instance
+
+    def __init__(self, threshold=SEMANTIC_CACHE_THRESHOLD, max_entries=SEMANTIC_CACHE_MAX_ENTRIES, ttl=SEMANTIC_CACHE_TTL,
+                 vectorstore_version=VECTORSTORE_VERSION):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.vectorstore_version = vectorstore_version
+        self.hits = 0
+        self.misses = 0
+
+        # 공유 인덱스 모드에서도 벡터스토어를 열지 않도록 임베딩만 가져온다.
+        self.embeddings = VectorStoreManager.get_embeddings(vectorstore_version=vectorstore_version)
+        # persist_directory 없이 만들면 메모리에만 저장된다.
+        self._store = Chroma(
+            collection_name=SEMANTIC_CACHE_COLLECTION_NAME,
+            embedding_function=self.embeddings,
+            collection_metadata={"hnsw:space": "cosine"},
+        )
+        self._entries = OrderedDict()  # entry_id -> {"answer", "documents", "created_at"}
+        self._lock = threading.Lock()
+
+    def lookup(self, query, scope):
+        """
+        유사한 이전 질문의 응답을 찾습니다.
+
+        Returns:
+            tuple[str | None, list[float]]: (응답 또는 None, 질문 임베딩). 임베딩은 store()에 그대로 넘기면 됩니다.
+        """
+        embedding = self.embeddings.embed_query(query)
+        try:
+            with self._lock:
+                if not self._entries:
+                    self.misses += 1
+                    return None, embedding
+                results = self._store._collection.query(
+                    query_embeddings=[embedding],
+                    n_results=1,
+                    where={"scope": scope},
+                    include=["distances"],
+                )
+            if not results["ids"][0] or 1.0 - results["distances"][0][0] < self.threshold:
+                self.misses += 1
+                return None, embedding
+
+            entry_id = results["ids"][0][0]
+            with self._lock:
+                entry = self._entries.get(entry_id)
+            if entry is None or not self._is_valid(entry):
+                self._evict([entry_id])
+                self.misses += 1
+                return None, embedding
+
+            with self._lock:
+                if entry_id in self._entries:
+                    self._entries.move_to_end(entry_id)
+            self.hits += 1
+            return entry["answer"], embedding
+        except Exception as e:
+            logging.error(f"Error looking up semantic cache: {e}", exc_info=True)
+            return None, embedding
+
+    def store(self, embedding, scope, answer, documents):
+        """
+        응답을 저장합니다. 검색된 문서가 없는 응답은 나중에 문서가 추가되면 달라지므로 저장하지 않습니다.
+
+        Args:
+            embedding (list[float]): lookup()이 반환한 질문 임베딩.
+            scope (str): cache_scope()의 값.
+            answer (str): LLM 응답.
+            documents (list[Document]): 응답에 사용된 문서.
+        """
+        versions = _document_versions(documents)
+        if not versions or not answer:
+            return
+        entry_id = uuid.uuid4().hex
+        try:
+            with self._lock:
+                self._store._collection.add(ids=[entry_id], embeddings=[embedding], metadatas=[{"scope": scope}])
+                self._entries[entry_id] = {"answer": answer, "documents": versions, "created_at": time.time()}
+                overflow = [self._entries.popitem(last=False)[0] for _ in range(len(self._entries) - self.max_entries)]
+                if overflow:
+                    self._store._collection.delete(ids=overflow)
+        except Exception as e:
+            logging.error(f"Error storing semantic cache entry: {e}", exc_info=True)
+
+    def _is_valid(self, entry):
+        if time.time() - entry["created_at"] > self.ttl:
+            return False
+        catalog = VectorStoreManager.get_catalog(vectorstore_version=self.vectorstore_version)
+        current = {
+            document["doc_id"]: [str(document["version"]), document["last_modified"]]
+            for document in catalog.list_documents(entry["documents"])
+        }
+        return current == entry["documents"]
+
+    def _evict(self, entry_ids):
+        with self._lock:
+            for entry_id in entry_ids:
+                self._entries.pop(entry_id, None)
+            self._store._collection.delete(ids=list(entry_ids))
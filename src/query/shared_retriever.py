@@ -0,0 +1,38 @@
+# /src/query/shared_retriever.py
+from typing import Any, List
+from pydantic import Field
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.retrievers import BaseRetriever
+from langchain.schema import Document
+from src.embedding.shared_index import SharedIndex
+from src.query.adaptive_retriever import adaptive_cutoff
+from src.config import SHARED_INDEX_NPROBE, ADAPTIVE_TOP_K_ENABLED
+
+
+class SharedIndexRetriever(BaseRetriever):
+    """
+    발행된 공유 인덱스(src.embedding.shared_index)에서 검색하는 리트리버. (RETRIEVER_TYPE=shared)
+    Chroma 인덱스를 프로세스마다 올리지 않으므로 질의 프로세스를 여러개 띄울 때 사용한다.
+    적재 결과는 다음 세대가 발행된 뒤에 반영된다.
+
+    search_kwargs:
+        k (int): 반환할 청크 수.
+        nprobe (int): 확인할 클러스터 수. 클수록 정확하고 느리다.
+        adaptive (bool): 관련 없는 청크를 점수로 잘라낼지 여부. (adaptive_cutoff, 기본 ADAPTIVE_TOP_K_ENABLED)
+    """
+    embeddings: Any
+    search_kwargs: dict = Field(default_factory=dict)
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        embedding = self.embeddings.embed_query(query)
+        hits = SharedIndex.get_instance().search(
+            embedding,
+            self.search_kwargs.get("k", 4),
+            nprobe=self.search_kwargs.get("nprobe", SHARED_INDEX_NPROBE),
+        )
+        if self.search_kwargs.get("adaptive", ADAPTIVE_TOP_K_ENABLED):
+            # 공유 인덱스의 거리는 1 - 코사인 유사도
+            hits = hits[:adaptive_cutoff([1.0 - distance for _, distance in hits])]
+        return [doc for doc, _ in hits]
@@ -0,0 +1,6 @@
+# /tests/conftest.py
+import os
+import sys
+
+# 저장소 루트에서 pytest를 실행하지 않아도 src 패키지를 불러올 수 있도록 한다.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
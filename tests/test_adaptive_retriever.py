@@ -0,0 +1,41 @@
+# /tests/test_adaptive_retriever.py
+import pytest
+
+pytest.importorskip("langchain_chroma")
+
+from src.query.adaptive_retriever import adaptive_cutoff, distance_to_similarity
+
+
+def cutoff(scores, min_score=0.3, max_gap=1.0, knee_min_drop=0.1, min_k=1):
+    return adaptive_cutoff(scores, min_score=min_score, max_gap=max_gap, knee_min_drop=knee_min_drop, min_k=min_k)
+
+
+def test_no_scores_or_low_best_score_keeps_nothing():
+    assert cutoff([]) == 0
+    assert cutoff([0.2, 0.1]) == 0
+
+
+def test_drops_scores_below_min_score():
+    assert cutoff([0.9, 0.85, 0.2], knee_min_drop=1.0) == 2
+
+
+def test_drops_scores_too_far_from_best():
+    assert cutoff([0.9, 0.7, 0.5], max_gap=0.3, knee_min_drop=1.0) == 2
+
+
+def test_cuts_at_largest_drop():
+    assert cutoff([0.9, 0.88, 0.86, 0.5, 0.48]) == 3
+
+
+def test_small_drops_keep_everything():
+    assert cutoff([0.9, 0.88, 0.86, 0.84]) == 4
+
+
+def test_knee_is_searched_after_min_k():
+    assert cutoff([0.9, 0.4, 0.39], min_k=2) == 3
+
+
+def test_distance_to_similarity():
+    assert distance_to_similarity(0.0) == 1.0
+    assert distance_to_similarity(2.0) == 0.0
+    assert distance_to_similarity(0.25, space="cosine") == 0.75
@@ -0,0 +1,108 @@
+# /tests/test_chunk_catalog.py
+import sqlite3
+import pytest
+
+# src.embedding 패키지를 불러오면 벡터스토어 모듈(langchain_chroma)도 함께 불러온다.
+pytest.importorskip("langchain_chroma")
+
+from src.embedding.chunk_catalog import ChunkCatalog
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    catalog = ChunkCatalog(str(tmp_path / "chunk_catalog.sqlite"))
+    yield catalog
+    catalog.close()
+
+
+def ingest(catalog, doc_id, chunk_ids):
+    """ingest_file과 같은 순서로 문서 전체를 적재한다."""
+    generation = catalog.next_generation(doc_id)
+    catalog.register_document(doc_id, "1", path=f"/data/{doc_id}.pdf", file_name=f"{doc_id}.pdf")
+    catalog.add(doc_id, chunk_ids, generation=generation)
+    catalog.set_generation(doc_id, generation)
+    return generation
+
+
+def test_next_generation_increments_per_document(catalog):
+    assert ingest(catalog, "a", ["a1"]) == 1
+    assert ingest(catalog, "a", ["a1"]) == 2
+    assert ingest(catalog, "b", ["b1"]) == 1
+
+
+def test_reingest_marks_chunks_not_written_again_as_stale(catalog):
+    ingest(catalog, "a", ["a1", "a2"])
+    ingest(catalog, "a", ["a2", "a3"])
+
+    assert catalog.stale_ids(["a1", "a2", "a3"]) == {"a1"}
+
+
+def test_stale_ids_are_scoped_to_their_document(catalog):
+    ingest(catalog, "a", ["a1"])
+    ingest(catalog, "b", ["b1"])
+    ingest(catalog, "b", ["b2"])
+
+    assert catalog.stale_ids(["a1", "b1", "b2"]) == {"b1"}
+
+
+def test_partial_save_does_not_mark_live_chunks_stale(catalog):
+    # 디렉토리 감시처럼 새 청크만 저장하면 적재 번호를 받지 않는다.
+    ingest(catalog, "a", ["a1", "a2"])
+    catalog.register_document("a", "1", path="/data/a.pdf", file_name="a.pdf")
+    catalog.add("a", ["a3"])
+
+    assert catalog.stale_ids(["a1", "a2", "a3"]) == set()
+
+
+def test_add_without_generation_keeps_existing_generation(catalog):
+    # 저널 복구는 적재 번호 없이 청크를 다시 기록한다.
+    ingest(catalog, "a", ["a1"])
+    ingest(catalog, "a", ["a1", "a2"])
+    catalog.add("a", ["a1", "a2"])
+
+    assert catalog.stale_ids(["a1", "a2"]) == set()
+
+
+def test_unfinished_ingest_does_not_mark_chunks_stale(catalog):
+    # 저장 도중(set_generation 전)에는 이전 적재의 청크를 이전 것으로 보지 않는다.
+    ingest(catalog, "a", ["a1"])
+    generation = catalog.next_generation("a")
+    catalog.add("a", ["a2"], generation=generation)
+
+    assert catalog.stale_ids(["a1", "a2"]) == set()
+
+
+def test_has_unfinished_ingest(catalog):
+    # 새 문서의 청크를 나눠서 저장하다가 종료된 경우
+    catalog.register_document("a", "1")
+    catalog.add("a", ["a1"], generation=catalog.next_generation("a"))
+    assert catalog.has_unfinished_ingest("a")
+
+    catalog.set_generation("a", 1)
+    assert not catalog.has_unfinished_ingest("a")
+
+    # 적재 번호 없이 일부 청크만 저장한 경우는 끝나지 못한 적재가 아니다.
+    catalog.add("a", ["a2"])
+    assert not catalog.has_unfinished_ingest("a")
+
+
+def test_legacy_catalog_is_migrated_without_stale_chunks(tmp_path):
+    path = str(tmp_path / "chunk_catalog.sqlite")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE chunks (chunk_id TEXT PRIMARY KEY, doc_id TEXT NOT NULL)")
+    conn.execute(
+        "CREATE TABLE documents (doc_key INTEGER PRIMARY KEY AUTOINCREMENT, doc_id TEXT NOT NULL, version TEXT NOT NULL, "
+        "path TEXT, file_name TEXT, last_modified TEXT, is_latest INTEGER NOT NULL DEFAULT 1, UNIQUE (doc_id, version))"
+    )
+    conn.execute("INSERT INTO chunks VALUES ('a1', 'a')")
+    conn.execute("INSERT INTO documents (doc_id, version) VALUES ('a', '1')")
+    conn.commit()
+    conn.close()
+
+    catalog = ChunkCatalog(path)
+    try:
+        assert catalog.stale_ids(["a1"]) == set()
+        assert catalog.next_generation("a") == 1
+        assert catalog.known_ids(["a1", "missing"]) == {"a1"}
+    finally:
+        catalog.close()
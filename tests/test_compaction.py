@@ -0,0 +1,112 @@
+# /tests/test_compaction.py
+import pytest
+
+pytest.importorskip("langchain_chroma")
+
+from src.embedding.chunk_catalog import ChunkCatalog
+from src.embedding.compaction import scan_vectorstore
+
+
+class FakeCollection:
+    """scan_vectorstore가 사용하는 Chroma 컬렉션 get()만 흉내낸다."""
+
+    def __init__(self, records):
+        self.ids = [chunk_id for chunk_id, _ in records]
+        self.metadatas = [metadata for _, metadata in records]
+
+    def get(self, ids=None, include=None, limit=None, offset=0):
+        if ids is not None:
+            return {"ids": [chunk_id for chunk_id in ids if chunk_id in self.ids]}
+        end = len(self.ids) if limit is None else offset + limit
+        return {"ids": self.ids[offset:end], "metadatas": self.metadatas[offset:end]}
+
+
+class FakeVectorStore:
+    def __init__(self, records):
+        self._collection = FakeCollection(records)
+
+
+def chunk(chunk_id, doc_id, version="1", path=None):
+    # 문서 속성이 청크에 있는 이전 형식의 메타데이터는 카탈로그 조회 없이 그대로 사용된다.
+    return chunk_id, {"doc_id": doc_id, "version": version, "path": path or f"{doc_id}.pdf"}
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    catalog = ChunkCatalog(str(tmp_path / "chunk_catalog.sqlite"))
+    yield catalog
+    catalog.close()
+
+
+def ingest(catalog, doc_id, chunk_ids, version="1"):
+    generation = catalog.next_generation(doc_id)
+    catalog.register_document(doc_id, version)
+    catalog.add(doc_id, chunk_ids, generation=generation)
+    catalog.set_generation(doc_id, generation)
+
+
+def test_superseded_includes_chunks_the_last_ingest_did_not_write(catalog):
+    ingest(catalog, "a", ["a1", "a2"])
+    ingest(catalog, "a", ["a2"])
+    vectorstore = FakeVectorStore([chunk("a1", "a"), chunk("a2", "a")])
+
+    plan = scan_vectorstore(vectorstore, catalog, keep_versions=1, orphan_roots=[])
+
+    assert plan["superseded"] == ["a1"]
+    assert plan["uncatalogued"] == []
+
+
+def test_superseded_keeps_latest_versions(catalog):
+    ingest(catalog, "a", ["v1"], version="1")
+    ingest(catalog, "a", ["v2"], version="2")
+    ingest(catalog, "a", ["v3"], version="3")
+    vectorstore = FakeVectorStore([chunk("v1", "a", "1"), chunk("v2", "a", "2"), chunk("v3", "a", "3")])
+
+    plan = scan_vectorstore(vectorstore, catalog, keep_versions=2, orphan_roots=[])
+
+    assert plan["superseded"] == ["v1"]
+
+
+def test_partially_saved_document_is_not_superseded(catalog):
+    ingest(catalog, "a", ["a1", "a2"])
+    catalog.register_document("a", "1")
+    catalog.add("a", ["a3"])
+    vectorstore = FakeVectorStore([chunk("a1", "a"), chunk("a2", "a"), chunk("a3", "a")])
+
+    plan = scan_vectorstore(vectorstore, catalog, keep_versions=1, orphan_roots=[])
+
+    assert plan["superseded"] == []
+
+
+def test_uncatalogued_skips_chunks_saved_without_doc_id(catalog):
+    ingest(catalog, "a", ["a1"])
+    vectorstore = FakeVectorStore([chunk("a1", "a"), chunk("x1", "x"), ("no-doc", {"content_role": "chunk"})])
+
+    plan = scan_vectorstore(vectorstore, catalog, keep_versions=1, orphan_roots=[])
+
+    assert plan["uncatalogued"] == ["x1"]
+
+
+def test_orphaned_only_checks_absolute_paths_under_roots(catalog, tmp_path):
+    present = tmp_path / "present.pdf"
+    present.write_bytes(b"")
+    for doc_id in ("gone", "present", "upload"):
+        ingest(catalog, doc_id, [f"{doc_id}1"])
+    vectorstore = FakeVectorStore([
+        chunk("gone1", "gone", path=str(tmp_path / "gone.pdf")),
+        chunk("present1", "present", path=str(present)),
+        chunk("upload1", "upload", path="upload.pdf"),
+    ])
+
+    plan = scan_vectorstore(vectorstore, catalog, keep_versions=1, orphan_roots=[str(tmp_path)])
+
+    assert plan["orphaned"] == ["gone"]
+
+
+def test_dangling_lists_catalog_ids_missing_from_collection(catalog):
+    ingest(catalog, "a", ["a1", "a2"])
+    vectorstore = FakeVectorStore([chunk("a1", "a")])
+
+    plan = scan_vectorstore(vectorstore, catalog, keep_versions=1, orphan_roots=[])
+
+    assert plan["dangling"] == ["a2"]
@@ -0,0 +1,96 @@
+# /tests/test_snapshot.py
+import pytest
+
+pytest.importorskip("langchain_chroma")
+
+from src.embedding import snapshot
+from src.embedding.chunk_catalog import ChunkCatalog
+from src.embedding.snapshot import _fetch_documents, _group_by_document
+
+
+class FakeCollection:
+    """_fetch_documents가 사용하는 Chroma 컬렉션 get()만 흉내낸다. get()이 호출될 때마다 조회 전에 on_get을 실행한다."""
+
+    def __init__(self, ids, on_get=None):
+        self.ids = set(ids)
+        self.on_get = on_get or (lambda collection: None)
+
+    def get(self, ids=None, include=None):
+        self.on_get(self)
+        found = [chunk_id for chunk_id in ids if chunk_id in self.ids]
+        return {"ids": found, "embeddings": [[0.0]] * len(found), "documents": [""] * len(found),
+                "metadatas": [{}] * len(found)}
+
+
+class FakeVectorStore:
+    def __init__(self, collection):
+        self._collection = collection
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    catalog = ChunkCatalog(str(tmp_path / "chunk_catalog.sqlite"))
+    yield catalog
+    catalog.close()
+
+
+@pytest.fixture(autouse=True)
+def no_live_writers(monkeypatch):
+    monkeypatch.setattr(snapshot, "_ensure_no_live_writers", lambda vectorstore_version: None)
+
+
+def test_group_by_document_keeps_documents_whole():
+    pinned = {"a": ["a1", "a2", "a3"], "b": ["b1"], "c": ["c1", "c2"]}
+
+    groups = list(_group_by_document(pinned, part_size=2))
+
+    assert groups == [{"a": ["a1", "a2", "a3"]}, {"b": ["b1"], "c": ["c1", "c2"]}]
+
+
+def test_fetch_documents_returns_pinned_chunks(catalog):
+    catalog.add("a", ["a1", "a2"])
+    vectorstore = FakeVectorStore(FakeCollection(["a1", "a2"]))
+
+    records, group = _fetch_documents(vectorstore, catalog, {"a": ["a1", "a2"]}, "v1")
+
+    assert sorted(records["ids"]) == ["a1", "a2"]
+    assert group == {"a": ["a1", "a2"]}
+
+
+def test_fetch_documents_repins_replaced_document(catalog):
+    # 고정한 뒤 a가 교체되어 a1이 a3으로 바뀌었다.
+    catalog.add("a", ["a2", "a3"])
+    catalog.add("b", ["b1"])
+    vectorstore = FakeVectorStore(FakeCollection(["a2", "a3", "b1"]))
+
+    records, group = _fetch_documents(vectorstore, catalog, {"a": ["a1", "a2"], "b": ["b1"]}, "v1")
+
+    assert sorted(records["ids"]) == ["a2", "a3", "b1"]
+    assert sorted(group["a"]) == ["a2", "a3"]
+    assert group["b"] == ["b1"]
+
+
+def test_fetch_documents_reports_deleted_document(catalog):
+    vectorstore = FakeVectorStore(FakeCollection([]))
+
+    records, group = _fetch_documents(vectorstore, catalog, {"a": ["a1"]}, "v1")
+
+    assert records["ids"] == []
+    assert group == {"a": []}
+
+
+def test_fetch_documents_gives_up_when_document_keeps_changing(catalog):
+    catalog.add("a", ["a1"])
+
+    def replace(collection):
+        # 가져오기 직전마다 a가 다시 교체된다.
+        old = catalog.ids_for("a")[0]
+        new = f"a{int(old[1:]) + 1}"
+        catalog.remove_ids([old])
+        catalog.add("a", [new])
+        collection.ids = {new}
+
+    vectorstore = FakeVectorStore(FakeCollection(["a1"], on_get=replace))
+
+    with pytest.raises(RuntimeError):
+        _fetch_documents(vectorstore, catalog, {"a": ["a1"]}, "v1")
@@ -15,24 +15,19 @@ class FileManager:
         """메타데이터에서 필요한 정보만 추출"""
         return {
             "doc_id": metadata.get('doc_id', ""),
-            "filename": metadata.get('file_name', "Unknown")
+            "filename": metadata.get('file_name', "Unknown"),
+            "path": metadata.get('path', "")
         }
 
     def _get_unique_metadatas(self) -> tuple:
-        """벡터스토어에서 고유한 메타데이터 추출"""
-        vectorstore = VectorStoreManager.get_instance()
-        all_metadatas = vectorstore.get()['metadatas']
-        
-        unique_metadatas = []
-        unique_doc_ids = []
-        
-        for metadata in all_metadatas:
+        """카탈로그의 문서 테이블에서 문서별 메타데이터 추출 (벡터스토어 조회 없음)"""
+        unique_metadatas = {}
+        for metadata in VectorStoreManager.get_catalog().list_documents():
             doc_id = metadata.get('doc_id')
-            if doc_id not in unique_doc_ids:
-                unique_metadatas.append(metadata)
-                unique_doc_ids.append(doc_id)
+            if doc_id not in unique_metadatas:
+                unique_metadatas[doc_id] = metadata
                 
-        return unique_metadatas, unique_doc_ids
+        return list(unique_metadatas.values()), list(unique_metadatas.keys())
 
     def create_file_list(self) -> List[Dict]:
         """새로운 파일 목록 생성"""
@@ -53,27 +48,24 @@ class FileManager:
             raise ValueError("file_list.json should contain a list of file entries.")
             
         # VectorDB와 동기화
-        _, unique_doc_ids = self._get_unique_metadatas()
-        file_list = self._sync_with_vectorstore(file_list, unique_doc_ids)
+        unique_metadatas, _ = self._get_unique_metadatas()
+        file_list = self._sync_with_vectorstore(file_list, unique_metadatas)
         
         # 중복 제거
         return self._remove_duplicates(file_list)
 
-    def _sync_with_vectorstore(self, file_list: List[Dict], unique_doc_ids: List[str]) -> List[Dict]:
+    def _sync_with_vectorstore(self, file_list: List[Dict], unique_metadatas: List[Dict]) -> List[Dict]:
         """VectorDB와 파일 목록 동기화"""
+        metadata_by_doc_id = {metadata.get('doc_id'): metadata for metadata in unique_metadatas}
+        
         # 벡터스토어에 없는 항목 제거
-        file_list = [f for f in file_list if f.get("doc_id") in unique_doc_ids]
+        file_list = [f for f in file_list if f.get("doc_id") in metadata_by_doc_id]
         
         # 새로운 항목 추가
-        exist_doc_ids = [f.get("doc_id") for f in file_list]
-        unique_metadatas, _ = self._get_unique_metadatas()
-        
-        for doc_id in unique_doc_ids:
+        exist_doc_ids = {f.get("doc_id") for f in file_list}
+        for doc_id, metadata in metadata_by_doc_id.items():
             if doc_id not in exist_doc_ids:
-                for metadata in unique_metadatas:
-                    if metadata.get('doc_id') == doc_id:
-                        file_list.append(self._set_file_metadata(metadata))
-                        break
+                file_list.append(self._set_file_metadata(metadata))
                         
         return file_list
 
@@ -95,14 +87,14 @@ class FileManager:
         with open(self.file_list_path, 'w', encoding='utf-8') as f:
             json.dump(file_list, f, ensure_ascii=False, indent=4)
 
-    def remove_file(self, file_id: str) -> None:
-        """파일 삭제"""
+    def remove_file(self, file_id: str, remove_from_store: bool = True) -> None:
+        """파일 삭제 (remove_from_store가 False면 목록에서만 제거하고, 벡터스토어 삭제는 작업 큐에 맡긴다)"""
         file_list = self.load_file_list()
         file_to_remove = next((f for f in file_list if f.get("doc_id") == file_id), None)
 
         if file_to_remove:
             doc_id = file_to_remove.get("doc_id")
-            if doc_id:
+            if doc_id and remove_from_store:
                 remove_from_vectorstore(doc_id=file_to_remove.get("doc_id"), remove_all_versions=True)
             
             file_list = [f for f in file_list if f.get("doc_id") != file_id]
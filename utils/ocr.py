@@ -1,10 +1,33 @@
 import os
+import threading
 import numpy as np
 from PIL import Image
 import pytesseract
 import easyocr
 from easyocr import Reader
 from pdf2image import convert_from_path
+from src.config import OCR_USE_GPU
+
+# EasyOCR Reader는 모델 로드 비용이 크므로 언어 조합별로 한번만 생성해서 재사용한다.
+_easyocr_readers = {}
+_easyocr_lock = threading.Lock()
+
+def get_easyocr_reader(lang_list=("ko", "en")):
+    """
+    언어 조합별로 프로세스에 상주하는 EasyOCR Reader를 반환합니다.
+
+    Args:
+        lang_list (tuple): EasyOCR 언어 리스트.
+
+    Returns:
+        easyocr.Reader: 재사용되는 Reader 객체.
+    """
+    key = tuple(lang_list)
+    if key not in _easyocr_readers:
+        with _easyocr_lock:
+            if key not in _easyocr_readers:
+                _easyocr_readers[key] = Reader(list(key), gpu=OCR_USE_GPU)
+    return _easyocr_readers[key]
 
 def extract_text_with_tesseract(file_path, lang=None):
     """
@@ -50,7 +73,7 @@ def extract_text_with_easyocr(file_path, lang_list=None):
         # lang_list = ["sk"]  # 기본 언어 설정
         lang_list = ["ko"]
 
-    reader = easyocr.Reader(lang_list)
+    reader = get_easyocr_reader(lang_list)
     extracted_text = ""
 
     # PDF 파일 처리
@@ -68,7 +91,7 @@ def extract_text_with_easyocr(file_path, lang_list=None):
     return extracted_text
 
 def extract_text_with_easyocr_image(image):
-    reader = Reader(['ko', 'en'], gpu=True)
+    reader = get_easyocr_reader(("ko", "en"))
 
     # Pillow 이미지라면 numpy array로 변환
     if isinstance(image, Image.Image):
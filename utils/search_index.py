@@ -0,0 +1,178 @@
+# search_index.py
+
+import os
+import re
+import bisect
+import unicodedata
+from typing import Dict, List, Optional
+from src.config import FILE_SEARCH_FUZZY_THRESHOLD
+
+# 한글 음절의 초성 (가 ~ 힣, 초성 19개 x 중성 21개 x 종성 28개)
+CHOSUNG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_CHOSUNG_SET = set(CHOSUNG)
+
+# 색인에 저장하는 n-gram 길이 (1~3). 3글자 이하의 검색어는 바로 찾고, 긴 검색어는 3-gram 교집합으로 후보를 줄인다.
+MAX_GRAM = 3
+
+_STRIP_PATTERN = re.compile(r'[^a-z0-9가-힣]')
+
+
+def normalize_text(text: str) -> str:
+    """
+    검색용 정규화. NFC로 합친 뒤(macOS에서 올린 파일명은 자모가 분리된 NFD) 소문자로 바꾸고
+    영문/숫자/완성형 한글만 남긴다. (입력 중인 낱자 자모는 제외됨)
+    """
+    return _STRIP_PATTERN.sub('', unicodedata.normalize('NFC', text or '').lower())
+
+
+def to_chosung(text: str) -> str:
+    """정규화된 문자열의 한글 음절을 초성으로 바꾼다. (영문/숫자는 그대로)"""
+    return ''.join(
+        CHOSUNG[(ord(ch) - 0xAC00) // 588] if '가' <= ch <= '힣' else ch
+        for ch in text
+    )
+
+
+def _grams(text: str, n: int) -> set:
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+def _all_grams(text: str) -> set:
+    grams = set()
+    for n in range(1, MAX_GRAM + 1):
+        grams |= _grams(text, n)
+    return grams
+
+
+class FileSearchIndex:
+    """
+    문서 목록 검색용 메모리 색인. 파일명과 문서 메타데이터(경로의 마지막 이름)를 정규화해서 n-gram(1~3) 역색인과
+    정렬된 파일명 리스트로 저장한다. 경로의 디렉터리(업로드 스풀 디렉터리 등)는 모든 문서에 걸리므로 색인하지 않는다.
+
+    - 접두어 검색: 정렬된 파일명 리스트에서 bisect로 찾는다.
+    - 부분 문자열 검색: n-gram 역색인의 교집합으로 후보를 줄인 뒤 확인한다.
+    - 초성 검색: 검색어가 초성(ㄱ~ㅎ)으로만 되어 있으면 파일명의 초성 문자열에서 찾는다. ("ㄱㅇㅅ" -> "계약서")
+    - 오타 검색: 정확히 일치하는 문서가 없으면 2-gram이 fuzzy_threshold 비율 이상 겹치는 문서를 반환한다.
+    - sync()로 바뀐 문서(추가/삭제/파일명 변경)만 반영하므로 목록을 다시 불러와도 전체를 다시 색인하지 않는다.
+    """
+
+    def __init__(self, fuzzy_threshold: float = FILE_SEARCH_FUZZY_THRESHOLD):
+        self.fuzzy_threshold = fuzzy_threshold
+        self._entries: Dict[str, dict] = {}     # key -> {"name", "text", "chosung", "grams", "source"}
+        self._order: Dict[str, int] = {}        # key -> 추가된 순서 (검색 결과는 목록 순서로 반환)
+        self._postings: Dict[str, set] = {}     # n-gram -> key 집합
+        self._sorted_names: List[tuple] = []    # (정규화된 파일명, key) 정렬 리스트
+        self._seq = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def add(self, key: str, filename: str, path: Optional[str] = None) -> None:
+        """문서를 색인에 추가합니다. 이미 있으면 새 값으로 바꿉니다."""
+        if key in self._entries:
+            self.remove(key)
+
+        name = normalize_text(filename)
+        base = normalize_text(os.path.basename(path or ''))
+        text = name + '\n' + base if base and base != name else name
+        chosung = to_chosung(name)
+        grams = _all_grams(name) | _all_grams(base) | {'#' + g for g in _all_grams(chosung)}
+
+        self._entries[key] = {
+            "name": name, "text": text, "chosung": chosung, "grams": grams, "source": (filename, path),
+        }
+        self._order[key] = self._seq
+        self._seq += 1
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(key)
+        bisect.insort(self._sorted_names, (name, key))
+
+    def remove(self, key: str) -> None:
+        """문서를 색인에서 제거합니다."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        del self._order[key]
+        for gram in entry["grams"]:
+            keys = self._postings.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._postings[gram]
+        i = bisect.bisect_left(self._sorted_names, (entry["name"], key))
+        if i < len(self._sorted_names) and self._sorted_names[i] == (entry["name"], key):
+            del self._sorted_names[i]
+
+    def sync(self, file_list: List[Dict]) -> None:
+        """파일 목록({"doc_id", "filename", "path"})과 비교해서 추가/삭제되거나 파일명/경로가 바뀐 문서만 반영합니다."""
+        current = {f.get("doc_id"): f for f in file_list if f.get("doc_id")}
+        for key in [key for key in self._entries if key not in current]:
+            self.remove(key)
+        for key, f in current.items():
+            source = (f.get("filename", ""), f.get("path"))
+            entry = self._entries.get(key)
+            if entry is None or entry["source"] != source:
+                self.add(key, *source)
+
+    def _candidates(self, query: str, prefix: str = '') -> set:
+        """query의 n-gram을 모두 가진 문서 key 집합. (가장 작은 posting부터 교집합)"""
+        grams = {query} if len(query) <= MAX_GRAM else _grams(query, MAX_GRAM)
+        postings = sorted((self._postings.get(prefix + gram, set()) for gram in grams), key=len)
+        if not postings or not postings[0]:
+            return set()
+        candidates = set(postings[0])
+        for keys in postings[1:]:
+            candidates &= keys
+            if not candidates:
+                break
+        return candidates
+
+    def _prefix_matches(self, query: str) -> List[str]:
+        i = bisect.bisect_left(self._sorted_names, (query, ''))
+        keys = []
+        while i < len(self._sorted_names) and self._sorted_names[i][0].startswith(query):
+            keys.append(self._sorted_names[i][1])
+            i += 1
+        return keys
+
+    def _fuzzy_matches(self, query: str) -> List[str]:
+        query_grams = _grams(query, 2) or {query}
+        counts = {}
+        for gram in query_grams:
+            for key in self._postings.get(gram, ()):
+                counts[key] = counts.get(key, 0) + 1
+        scored = [
+            (count / len(query_grams), key) for key, count in counts.items()
+            if count / len(query_grams) >= self.fuzzy_threshold
+        ]
+        scored.sort(key=lambda item: (-item[0], self._order[item[1]]))
+        return [key for _, key in scored]
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[str]:
+        """
+        검색어와 일치하는 문서 key 리스트를 반환합니다.
+        파일명 접두어 일치 -> 부분 문자열 일치(파일명, 경로의 파일명) 순서이며, 일치하는 문서가 없으면 오타 검색 결과를 반환합니다.
+        """
+        raw = unicodedata.normalize('NFC', query or '').replace(' ', '')
+        if raw and all(ch in _CHOSUNG_SET for ch in raw):
+            keys = [key for key in self._candidates(raw, prefix='#') if raw in self._entries[key]["chosung"]]
+            return sorted(keys, key=self._order.__getitem__)[:limit]
+
+        query = normalize_text(query)
+        if not query:
+            return []
+
+        prefix = sorted(self._prefix_matches(query), key=self._order.__getitem__)
+        # 3글자 이하는 n-gram 자체가 검색어이므로 후보가 곧 결과다.
+        substring = self._candidates(query).difference(prefix)
+        if len(query) > MAX_GRAM:
+            substring = [key for key in substring if query in self._entries[key]["text"]]
+        substring = sorted(substring, key=self._order.__getitem__)
+
+        keys = prefix + substring
+        if not keys:
+            keys = self._fuzzy_matches(query)
+        return keys[:limit]